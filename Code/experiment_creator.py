@@ -5,6 +5,9 @@ import os
 import shutil
 from datetime import datetime
 from datasketch import MinHash
+import hashlib
+import numpy as np
+from itertools import chain
 import re
 import random
 
@@ -18,7 +21,7 @@ import random
 def run_script(raw_or_hashed, seed, current_compress, permutation, 
                num_objs, length_of_path, threshold, depth, 
                help_for_jaccard, choice_place, run_once, repeat_experiment,
-               limitN, Experiment_for_Repetition):
+               limitN, Experiment_for_Repetition, lattice_threshold=0):
     """
     Launches 'homopa.py' as a subprocess with the specified parameters, capturing 
     real-time output and returning the last integer printed by 'homopa.py' if any.
@@ -37,6 +40,8 @@ def run_script(raw_or_hashed, seed, current_compress, permutation,
     :param repeat_experiment: 1 => we are re-running a previous experiment folder
     :param limitN: A large recursion or object limit used internally by 'homopa.py'
     :param Experiment_for_Repetition: The folder name referencing a past experiment
+    :param lattice_threshold: Lowest threshold of the sweep (fraction). If > 0, homopa.py mines each
+                              region once at this threshold and filters the result for 'threshold'
     :return: The last integer printed by 'homopa.py' if the script completes successfully
              and prints an integer. Otherwise, returns None.
     """
@@ -50,7 +55,8 @@ def run_script(raw_or_hashed, seed, current_compress, permutation,
             str(raw_or_hashed), str(seed), str(current_compress), str(permutation),
             str(num_objs), str(length_of_path), str(threshold), str(depth), 
             str(help_for_jaccard), str(choice_place), str(run_once), 
-            str(repeat_experiment), str(limitN), str(Experiment_for_Repetition)
+            str(repeat_experiment), str(limitN), str(Experiment_for_Repetition),
+            str(lattice_threshold)
         ],
         stdout=subprocess.PIPE,  # Capture stdout
         stderr=subprocess.PIPE,  # Capture stderr
@@ -90,56 +96,347 @@ def run_script(raw_or_hashed, seed, current_compress, permutation,
         return None
 
 
-def hash_data(file_path, num_perm, seed, File_4_sensors_HASHED_FILE, threshold):
+##############################################################################
+#                       V E C T O R I Z E D   M I N H A S H
+##############################################################################
+#
+# The numpy engine of hash_data produces exactly the signatures of datasketch.MinHash, but
+# instead of one MinHash per edge updated object by object, it
+#   1) hashes every distinct object id once (sha1, first 4 bytes, as datasketch's sha1_hash32),
+#   2) applies all permutations to those hashes at once as array arithmetic,
+#   3) takes the minimum per edge with a grouped reduction (np.minimum.reduceat).
+#
+# Two permutation schemes of datasketch are reproduced bit for bit:
+#   "legacy"   => (a*h + b) mod (2^61 - 1), truncated to 32 bits (datasketch < 2.0.0)
+#   "affine32" => a*fmix32(h) + b mod 2^32                       (datasketch >= 2.0.0 default)
+# and a truncatable variant of the second one:
+#   "prefix32" => the "affine32" map, but the (a, b) pairs are drawn one permutation after the
+#                 other, so the k-permutation signature is the first k columns of any longer one
+#
+# "affine32" draws all a's before all b's, so its signatures of different lengths share nothing.
+# "legacy" and "prefix32" are truncatable: hash_data caches the longest signature table of a
+# sensor file and serves every shorter num_perm (every compression level) as a slice of it.
+
+_MINHASH_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MINHASH_MAX_HASH = np.uint64((1 << 32) - 1)
+
+TRUNCATABLE_MINHASH_SCHEMES = ("legacy", "prefix32")
+
+# File of an experiment folder holding the MinHash scheme its hashed files were written with
+MINHASH_SCHEME_FILE = "MinHash_Scheme.txt"
+
+# (sensor file, modification time, size, seed, scheme) => (edges, longest signature table so far).
+# Only the latest sensor file is kept.
+_signature_prefix_cache = {}
+
+
+def minhash_default_scheme():
     """
-    Reads sensor data from 'file_path' (e.g. '4_sensors.txt'), converts each line's 
-    object IDs into a MinHash signature, and writes hashed results to 
-    'File_4_sensors_HASHED_FILE'.
+    Returns the permutation scheme datasketch.MinHash uses when none is given, so that the
+    numpy engine matches the hashed files written by the installed datasketch version.
+    """
+    return getattr(MinHash(num_perm=1), 'scheme', 'legacy')
+
+
+def minhash_permutations(num_perm, seed, scheme):
+    """
+    Draws the permutation parameters (a, b) from 'seed' in the same order as datasketch.MinHash.
+
+    :param num_perm: Number of permutations
+    :param seed: MinHash seed
+    :param scheme: "legacy", "affine32" or "prefix32"
+    :return: (a, b) arrays of length num_perm (uint64 for "legacy", uint32 otherwise)
+    """
+    gen = np.random.RandomState(seed)
+    if scheme == "legacy":
+        # One (a, b) pair per permutation, drawn alternately
+        ab = np.array([(gen.randint(1, _MINHASH_MERSENNE_PRIME, dtype=np.uint64),
+                        gen.randint(0, _MINHASH_MERSENNE_PRIME, dtype=np.uint64))
+                       for _ in range(num_perm)], dtype=np.uint64).reshape(num_perm, 2)
+        return ab[:, 0], ab[:, 1]
+    if scheme == "affine32":
+        # All the (odd) a's first, then all the b's
+        a = gen.randint(0, 1 << 31, num_perm, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+        b = gen.randint(0, 1 << 32, num_perm, dtype=np.uint32)
+        return a, b
+    if scheme == "prefix32":
+        # One (a, b) pair per permutation, drawn alternately; forcing the lowest bit keeps a odd
+        ab = gen.randint(0, 1 << 32, 2 * num_perm, dtype=np.uint32)
+        return ab[0::2] | np.uint32(1), ab[1::2]
+    raise ValueError(f"Unknown MinHash scheme: {scheme}")
+
+
+def minhash_object_hashes(obj_ids):
+    """
+    32-bit hash of every object id (a string), identical to datasketch's sha1_hash32 of its utf8 bytes.
+
+    :param obj_ids: Iterable of distinct object ids
+    :return: uint64 array with one hash per object id
+    """
+    return np.fromiter((int.from_bytes(hashlib.sha1(obj.encode('utf8')).digest()[:4], 'little')
+                        for obj in obj_ids), dtype=np.uint64)
+
+
+def minhash_permute(hashes, a, b, scheme):
+    """
+    Applies every permutation to every object hash.
+
+    :param hashes: uint64 array of object hashes (see minhash_object_hashes)
+    :param a, b: Permutation parameters (see minhash_permutations)
+    :param scheme: "legacy", "affine32" or "prefix32"
+    :return: uint32 array of shape (len(a), len(hashes)); column i is object i under all permutations
+    """
+    if scheme == "legacy":
+        # uint64 arithmetic wraps around exactly like datasketch's (a * hv + b) does
+        permuted = (a[:, None] * hashes + b[:, None]) % _MINHASH_MERSENNE_PRIME
+        return (permuted & _MINHASH_MAX_HASH).astype(np.uint32)
+    # MurmurHash3 finalizer (fmix32), then a*h + b with uint32 wrap-around
+    h = hashes.astype(np.uint32)
+    h = h ^ (h >> np.uint32(16))
+    h = h * np.uint32(0x85EBCA6B)
+    h = h ^ (h >> np.uint32(13))
+    h = h * np.uint32(0xC2B2AE35)
+    h = h ^ (h >> np.uint32(16))
+    return a[:, None] * h + b[:, None]
+
+
+def minhash_signatures(object_lists, num_perm, seed, scheme=None, block_cells=1 << 22, first_perm=0):
+    """
+    Vectorized MinHash of many object sets at once.
+
+    :param object_lists: One list of object ids (strings) per edge; every list must be non-empty.
+                         Repeated ids inside a list are allowed (the set of the list is hashed).
+    :param num_perm: Number of permutations (signature length)
+    :param seed: MinHash seed
+    :param scheme: "legacy", "affine32", "prefix32" or None (=> the default scheme of the installed datasketch)
+    :param block_cells: Upper bound on the signature cells held in memory per step
+    :param first_perm: Only the permutations first_perm .. num_perm-1 are computed (used to extend
+                       a cached table of a truncatable scheme)
+    :return: uint32 array of shape (len(object_lists), num_perm - first_perm); row i equals the
+             hashvalues of a datasketch.MinHash(seed=seed, num_perm=num_perm) updated with
+             object_lists[i] (columns first_perm onwards)
+    """
+    if scheme is None:
+        scheme = minhash_default_scheme()
+    a, b = minhash_permutations(num_perm, seed, scheme)
+    a, b = a[first_perm:], b[first_perm:]
+    num_perm = len(a)
+
+    # 1) Every distinct object id gets a column index and is hashed once
+    distinct_objects = dict.fromkeys(chain.from_iterable(object_lists))
+    column_of_object = {obj: column for column, obj in enumerate(distinct_objects)}
+    flat_columns = np.array(list(map(column_of_object.__getitem__, chain.from_iterable(object_lists))),
+                            dtype=np.intp)
+    hashes = minhash_object_hashes(column_of_object)
+
+    # 2) All permutations of every distinct object, permutation-major so that each edge is a
+    #    contiguous segment per permutation (in column blocks to bound the uint64 temporaries)
+    columns_per_block = max(1, block_cells // num_perm)
+    permuted = np.empty((num_perm, len(hashes)), dtype=np.uint32)
+    for start in range(0, len(hashes), columns_per_block):
+        permuted[:, start:start + columns_per_block] = minhash_permute(
+            hashes[start:start + columns_per_block], a, b, scheme)
+
+    # 3) Minimum per edge: gather the columns of consecutive edges and reduce each edge's segment
+    lengths = np.fromiter((len(obj_ids) for obj_ids in object_lists), dtype=np.intp,
+                          count=len(object_lists))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    signatures = np.empty((len(object_lists), num_perm), dtype=np.uint32)
+    first = 0
+    while first < len(object_lists):
+        # As many edges as fit into one block, but at least one
+        last = max(first + 1, int(np.searchsorted(ends, starts[first] + columns_per_block, side='right')))
+        low, high = starts[first], ends[last - 1]
+        gathered = np.take(permuted, flat_columns[low:high], axis=1)
+        signatures[first:last] = np.minimum.reduceat(gathered, starts[first:last] - low, axis=1).T
+        first = last
+    return signatures
+
+
+def read_sensor_edges(file_path):
+    """
+    Reads a raw sensor file in the order hash_data writes it.
 
     :param file_path: The file containing sensor data (edge_id, obj1, obj2, ...)
-    :param num_perm: Number of permutations (hash functions) used by MinHash
-    :param seed: Random seed to initialize MinHash for reproducibility
-    :param File_4_sensors_HASHED_FILE: Output file name for hashed sensor data
-    :param threshold: (Not used internally here, but included for traceability)
-    :return: The list of hashed data rows for optional debugging
+    :return: List of (sensor_id, number of raw object IDs, object IDs) for every line with objects
     """
 
     # Read lines from the raw sensor file
     with open(file_path, 'r') as file:
         lines = file.readlines()
 
-    # Sort lines by the second element (some logic to ensure consistent ordering)
-    lines_with_values = [(line, [int(value) for value in line.strip().split(',')]) 
-                         for line in lines]
-    sorted_lines_with_values = sorted(lines_with_values, key=lambda x: x[1][1])
-    sorted_lines = [line for line, _ in sorted_lines_with_values]
-    lines = sorted_lines
+    # Sort lines by the second element (some logic to ensure consistent ordering);
+    # only that field is parsed, the object IDs themselves are hashed as strings
+    lines = sorted(lines, key=lambda line: int(line.split(',', 2)[1]))
 
-    hashed_data = []
-    
+    edges = []
     for line in lines:
         line = line.strip().split(',')
         sensor_id = line[0]
         obj_ids = line[1:]
         number_of_Raw_ObjIDS = len(obj_ids)
-        new_m = []
 
         # Only proceed if there's at least 1 object
         if len(obj_ids) >= 1:
+            edges.append((sensor_id, number_of_Raw_ObjIDS, obj_ids))
+    return edges
+
+
+def cached_minhash_signatures(file_path, num_perm, seed, scheme):
+    """
+    Signatures of a truncatable scheme, served from the signature table cached for 'file_path'.
+    If the table is shorter than num_perm it is extended by the missing permutations only
+    (at least doubling it, so that an incrementing search over num_perm hashes a few times).
+
+    :param file_path: The raw sensor file
+    :param num_perm: Number of permutations (signature length)
+    :param seed: MinHash seed
+    :param scheme: One of TRUNCATABLE_MINHASH_SCHEMES
+    :return: (edges as read_sensor_edges returns them, uint32 array len(edges) x num_perm)
+    """
+    status = os.stat(file_path)
+    key = (os.path.abspath(file_path), status.st_mtime_ns, status.st_size, seed, scheme)
+    if key in _signature_prefix_cache:
+        edges, signatures = _signature_prefix_cache[key]
+    else:
+        _signature_prefix_cache.clear()
+        edges = read_sensor_edges(file_path)
+        signatures = np.empty((len(edges), 0), dtype=np.uint32)
+
+    computed_perms = signatures.shape[1]
+    if num_perm > computed_perms:
+        longest = max(num_perm, 2 * computed_perms)
+        extension = minhash_signatures([obj_ids for _, _, obj_ids in edges], longest, seed, scheme,
+                                       first_perm=computed_perms)
+        signatures = np.hstack((signatures, extension))
+        _signature_prefix_cache[key] = (edges, signatures)
+    return edges, signatures[:, :num_perm]
+
+
+# Decimal digits of a signature value v: 1 + the number of these powers of ten that are <= v
+_POWERS_OF_TEN = np.array([10 ** i for i in range(1, 10)], dtype=np.uint32)
+
+
+def hashed_file_size(edges, signatures):
+    """
+    Exact size in bytes of the file hash_data writes for these signatures, computed in memory.
+    Every line is "<edge>,<number of objects>,<v1>,...,<vk>" followed by the line separator the
+    text-mode file gets on this platform.
+
+    :param edges: As returned by read_sensor_edges
+    :param signatures: Array len(edges) x k (k >= 1) of 32-bit signature values
+    :return: The size os.path.getsize would report for the written file
+    """
+    fixed = sum(len(sensor_id) + len(str(number_of_Raw_ObjIDS)) + 2
+                for sensor_id, number_of_Raw_ObjIDS, _ in edges)
+    digits = int(np.searchsorted(_POWERS_OF_TEN, signatures.ravel(), side='right').sum()) + signatures.size
+    commas = len(edges) * (signatures.shape[1] - 1)
+    return fixed + digits + commas + len(edges) * len(os.linesep)
+
+
+def search_permutation_for_compress(file_path, raw_file_size, first_permutation,
+                                    max_accepted_real_compress, seed, scheme=None):
+    """
+    Finds the smallest permutation >= first_permutation whose hashed file has a real compress
+    (raw_file_size / hashed file size) not above max_accepted_real_compress, the permutation the
+    one-by-one search of main_function stops at. Every permutation adds bytes to every line, so
+    the real compress falls with the permutation: a galloping search (first_permutation, +1, +3,
+    +7, ...) brackets it and a binary search narrows the bracket down. Candidates are measured
+    with hashed_file_size, no hashed file is written.
+
+    :param file_path: The raw sensor file
+    :param raw_file_size: Size of the raw sensor file in bytes
+    :param first_permutation: Smallest permutation to consider (>= 1)
+    :param max_accepted_real_compress: Upper end of the accepted compress range
+    :param seed: MinHash seed
+    :param scheme: MinHash permutation scheme (truncatable schemes re-use the cached signature table)
+    :return: (permutation, number of evaluated candidates)
+    """
+    edges = None if scheme in TRUNCATABLE_MINHASH_SCHEMES else read_sensor_edges(file_path)
+    evaluations = 0
+
+    def real_compress(num_perm):
+        nonlocal evaluations
+        evaluations += 1
+        if edges is None:
+            signature_edges, signatures = cached_minhash_signatures(file_path, num_perm, seed, scheme)
+        else:
+            signature_edges = edges
+            signatures = minhash_signatures([obj_ids for _, _, obj_ids in edges], num_perm, seed, scheme)
+        return raw_file_size / hashed_file_size(signature_edges, signatures)
+
+    # Galloping: 'low' compresses too much (first_permutation - 1 stands for "none yet"), 'high' does not
+    low, high, step = first_permutation - 1, first_permutation, 1
+    while real_compress(high) > max_accepted_real_compress:
+        low, high, step = high, high + step, step * 2
+
+    # Binary search in (low, high]
+    while high - low > 1:
+        middle = (low + high) // 2
+        if real_compress(middle) > max_accepted_real_compress:
+            low = middle
+        else:
+            high = middle
+    return high, evaluations
+
+
+def hash_data(file_path, num_perm, seed, File_4_sensors_HASHED_FILE, threshold,
+              engine="numpy", scheme=None):
+    """
+    Reads sensor data from 'file_path' (e.g. '4_sensors.txt'), converts each line's 
+    object IDs into a MinHash signature, and writes hashed results to 
+    'File_4_sensors_HASHED_FILE'.
+
+    :param file_path: The file containing sensor data (edge_id, obj1, obj2, ...)
+    :param num_perm: Number of permutations (hash functions) used by MinHash
+    :param seed: Random seed to initialize MinHash for reproducibility
+    :param File_4_sensors_HASHED_FILE: Output file name for hashed sensor data
+    :param threshold: (Not used internally here, but included for traceability)
+    :param engine: "numpy" => vectorized engine (minhash_signatures),
+                   "datasketch" => one datasketch.MinHash per line, updated object by object.
+                   Both write identical files for the same seed and scheme.
+    :param scheme: MinHash permutation scheme ("legacy", "affine32", "prefix32"), None => datasketch's
+                   default. With a truncatable scheme the numpy engine slices a cached signature table.
+    :return: The list of hashed data rows for optional debugging
+    """
+
+    hashed_data = []
+
+    if engine == "numpy" and scheme in TRUNCATABLE_MINHASH_SCHEMES:
+        # Prefix of the signature table cached for this file
+        edges, signatures = cached_minhash_signatures(file_path, num_perm, seed, scheme)
+        signatures = signatures.tolist()
+    elif engine == "numpy":
+        # All signatures at once, one row per edge
+        edges = read_sensor_edges(file_path)
+        signatures = minhash_signatures([obj_ids for _, _, obj_ids in edges],
+                                        num_perm, seed, scheme).tolist()
+    elif engine == "datasketch":
+        edges = read_sensor_edges(file_path)
+        signatures = []
+        if scheme == "prefix32":
+            # datasketch has no such scheme, but takes its permutations as "affine32" ones
+            scheme_args = {'scheme': "affine32",
+                           'permutations': np.array(minhash_permutations(num_perm, seed, scheme))}
+        else:
+            scheme_args = {} if scheme is None else {'scheme': scheme}
+        for _, _, obj_ids in edges:
             data = set(obj_ids)  # Unique object IDs
             # Initialize MinHash object
-            m = MinHash(seed=seed, num_perm=num_perm)
+            m = MinHash(seed=seed, num_perm=num_perm, **scheme_args)
 
             # Update MinHash with each object
             for d in data:
                 m.update(d.encode('utf8'))
             
             # Convert each X-bit hashvalue to 32-bit (if needed)
-            for value in m.hashvalues:
-                value64 = int(value) & ((1 << 32) - 1)
-                new_m.append(value64)
-            
-            hashed_data.append((sensor_id, number_of_Raw_ObjIDS, new_m))
+            signatures.append([int(value) & ((1 << 32) - 1) for value in m.hashvalues])
+    else:
+        raise ValueError(f"Unknown MinHash engine: {engine}")
+
+    for (sensor_id, number_of_Raw_ObjIDS, _), new_m in zip(edges, signatures):
+        hashed_data.append((sensor_id, number_of_Raw_ObjIDS, new_m))
     
     # Write hashed data to the specified output file
     with open(File_4_sensors_HASHED_FILE, 'w') as out_file:
@@ -149,6 +446,45 @@ def hash_data(file_path, num_perm, seed, File_4_sensors_HASHED_FILE, threshold):
     return hashed_data
 
 
+def remove_homopath_lattices():
+    """
+    Deletes the "Regional_Lattice_*.json" files homopa.py wrote during a threshold sweep.
+    They hold the object lists of every path at the lowest threshold of the sweep and are
+    keyed by region, input files and permutation count, so they are only worth keeping
+    until the sweep is over.
+
+    :return: Number of deleted files
+    """
+    removed = 0
+    for file in os.listdir():
+        if file.startswith("Regional_Lattice_") and file.endswith(".json") and os.path.isfile(file):
+            os.remove(file)
+            removed += 1
+    return removed
+
+
+def write_minhash_scheme(folder, scheme):
+    """
+    Records in an experiment folder the MinHash scheme of its hashed files (the default scheme
+    of the installed datasketch if 'scheme' is None), next to the permutation counts that
+    copy_files(...) reads back when the experiment is repeated.
+    """
+    with open(os.path.join(folder, MINHASH_SCHEME_FILE), 'w') as scheme_file:
+        scheme_file.write((scheme or minhash_default_scheme()) + "\n")
+
+
+def read_minhash_scheme(folder):
+    """
+    Returns the MinHash scheme recorded in an experiment folder by write_minhash_scheme(...),
+    or None (the default scheme of the installed datasketch) for folders without one.
+    """
+    scheme_path = os.path.join(folder, MINHASH_SCHEME_FILE)
+    if not os.path.exists(scheme_path):
+        return None
+    with open(scheme_path, 'r') as scheme_file:
+        return scheme_file.read().strip() or None
+
+
 def copy_file(source_file, destination_file):
     #print("In copyFile function")
     try:
@@ -582,12 +918,31 @@ def main_function():
         # my_threshold_levels = [80,75,70,65,60,55,50,45,40,35,30,25,20,15,10]
         my_threshold_levels = [30, 45, 60]
 
+        # If 1, homopa.py mines every region once at the lowest threshold of the sweep and keeps
+        # the support of every path ("Regional_Lattice_*.json"); the other thresholds are
+        # answered by filtering that lattice instead of mining again.
+        use_homopath_lattice = 1
+        lattice_threshold = min(my_threshold_levels) * 0.01 if use_homopath_lattice == 1 else 0
+
         # Number of objects tested in sensor data
         my_numo_objs_levels = [1000, 2500, 5000, 10000, 25000, 50000]
 
         # The base random seed for raw or hashed runs
         seed = 12345
 
+        # MinHash engine of hash_data: "numpy" (vectorized, every object id hashed once) or
+        # "datasketch" (one MinHash per edge). Both write identical hashed files for a seed.
+        minhash_engine = "numpy"
+
+        # MinHash permutation scheme. None => the default scheme of the installed datasketch, as the
+        # earlier experiments. "prefix32" (or "legacy") is truncatable, i.e. the signature of every
+        # compression level is a prefix of one cached signature table, so the search for the
+        # permutation count of each compression level and each threshold re-uses it instead of
+        # hashing the sensor file again; "prefix32" writes other hashed files than the default
+        # "affine32" (so other permutation counts and results). The scheme is recorded in every
+        # experiment folder (MinHash_Scheme.txt) and a repeated experiment uses the recorded one.
+        minhash_scheme = None
+
         # 2) Logic to handle re-running a previous experiment folder:
         #    We can replicate the same scenario but with a new seed or different thresholds
         folders_for_specific_repetition_for_checking_pairs = [
@@ -641,6 +996,9 @@ def main_function():
                 dictionaryWithComprAndPermut = copy_files(
                     Experiment_for_Repetition, file1, file2, file3
                 )
+                # The permutation counts were found with the scheme of that experiment
+                minhash_scheme = read_minhash_scheme(Experiment_for_Repetition)
+                print(f"MinHash scheme of {Experiment_for_Repetition}: {minhash_scheme or minhash_default_scheme()}")
                 print("User must put files for Motion and Sensor. If it fails, please check file availability.")
 
             # 5) Now we loop through each place
@@ -691,6 +1049,9 @@ def main_function():
                         # 7) Now loop over each threshold in percentages
                         for threshold in my_threshold_levels:
                             start_time1 = time.time()
+                            # Nominal seconds of the removed sleep between compress levels (see below):
+                            # the duration it was set to, not a measurement
+                            removed_sleep_time = 0
 
                             threshold_real = threshold * 0.01  # Convert to fraction
 
@@ -745,7 +1106,8 @@ def main_function():
                                 raw_or_hashed, seed, current_compress, permutation,
                                 numo_objs, length_of_path, threshold_real, depth,
                                 help_for_jaccard, choice_place, run_once,
-                                repeat_experiment, limitN, Experiment_for_Repetition
+                                repeat_experiment, limitN, Experiment_for_Repetition,
+                                lattice_threshold
                             )
                             run_once = 1
 
@@ -800,7 +1162,7 @@ def main_function():
                                             if current_compress == int(compr):
                                                 permutation = dictionaryWithComprAndPermut[compr]
                                                 # Hash the data with that known permutation
-                                                hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold)
+                                                hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold, minhash_engine, minhash_scheme)
                                                 hashed_file_size = os.path.getsize(File_4_sensors_HASHED_FILE)
                                                 real_compress = (raw_file_size / hashed_file_size)
                                                 experiment_run = True
@@ -809,32 +1171,33 @@ def main_function():
                                             continue
                                 else:
                                     # Not repeating => we find the needed permutations now
-                                    hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold)
+                                    if not permutations_calculated:
+                                        # If we are above max => we need a longer signature. The smallest one that is
+                                        # not above max is searched on the exact size model of the hashed file
+                                        # (galloping + binary search) instead of writing the file for every
+                                        # permutation in turn.
+                                        first_permutation = permutation
+                                        permutation, evaluations = search_permutation_for_compress(
+                                            File_4_sensors, raw_file_size, first_permutation,
+                                            max_accepted_real_compress, seed, minhash_scheme)
+                                        if permutation > first_permutation:
+                                            print(f"Attempting compress {current_compress} with MinHashSignature= {permutation} "
+                                                  f"({evaluations} signature lengths evaluated from {first_permutation})")
+
+                                    hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold, minhash_engine, minhash_scheme)
                                     hashed_file_size = os.path.getsize(File_4_sensors_HASHED_FILE)
                                     real_compress = (raw_file_size / hashed_file_size)
 
                                     if not permutations_calculated:
                                         # Check if we are within ±10%
-                                        if real_compress > max_accepted_real_compress or real_compress < min_accepted_real_compress:
-                                            if real_compress < min_accepted_real_compress:
+                                        if real_compress < min_accepted_real_compress:
+                                            retain_numberOfPermutation = True
+                                            if permutation == first_permutation:
                                                 # Over-compressed => skip
-                                                retain_numberOfPermutation = True
                                                 experiment_run = False
                                                 print(f"Cannot achieve compress {current_compress} with MinHashSig= {permutation}. Next compression goal.")
                                                 continue
-                                            else:
-                                                # If we are above max => increment 'permutation' 
-                                                while real_compress > max_accepted_real_compress:
-                                                    permutation += 1
-                                                    print(f"Attempting compress {current_compress} with MinHashSignature= {permutation}")
-                                                    hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold)
-                                                    hashed_file_size = os.path.getsize(File_4_sensors_HASHED_FILE)
-                                                    real_compress = (raw_file_size / hashed_file_size)
-                                                    if real_compress < min_accepted_real_compress:
-                                                        retain_numberOfPermutation = True
-                                                        experiment_run = False
-                                                        print(f"Overstepped min compress rate for {current_compress} with signature length {permutation}. Adjust or skip.")
-                                                        break
+                                            print(f"Overstepped min compress rate for {current_compress} with signature length {permutation}. Adjust or skip.")
 
                                         # If we succeeded in a valid compress, store in CompressDict
                                         if current_compress not in CompressDict:
@@ -855,7 +1218,7 @@ def main_function():
                                             continue
 
                                         # Re-hash with the known permutation
-                                        hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold)
+                                        hash_data(File_4_sensors, permutation, seed, File_4_sensors_HASHED_FILE, threshold, minhash_engine, minhash_scheme)
                                         hashed_file_size = os.path.getsize(File_4_sensors_HASHED_FILE)
                                         real_compress = (raw_file_size / hashed_file_size)
                                     # If we get here, experiment_run = True
@@ -881,7 +1244,8 @@ def main_function():
                                         raw_or_hashed, seed, current_compress, permutation,
                                         numo_objs, length_of_path, threshold_real, depth,
                                         help_for_jaccard, choice_place, run_once,
-                                        repeat_experiment, limitN, Experiment_for_Repetition
+                                        repeat_experiment, limitN, Experiment_for_Repetition,
+                                        lattice_threshold
                                     )
 
                                     # If last threshold, copy region hashed sensor files as well
@@ -913,8 +1277,9 @@ def main_function():
                                     # If not feasible, skip
                                     continue
 
-                                # Some artificial sleep to simulate time or reduce CPU usage
-                                time.sleep(2 + (numo_objs / (current_compress ** threshold) * (1 - run_once) / 1000))
+                                # An artificial sleep used to be here. run_script(...) only returns once
+                                # homopa.py has exited, so the next compress level can start right away.
+                                removed_sleep_time += 2 + (numo_objs / (current_compress ** threshold) * (1 - run_once) / 1000)
                                 num_objects_dict[numo_objs][current_compress] =  current_compress
 
                                 
@@ -924,7 +1289,13 @@ def main_function():
                                 permutations_calculated = True
 
                             end_time1 = time.time()
-                            print(f"Execution time for threshold {threshold}%: {end_time1 - start_time1:.2f} seconds")
+                            print(f"Execution time for threshold {threshold}%: {end_time1 - start_time1:.2f} seconds "
+                                  f"(removed fixed sleeps between compress levels (nominal): {removed_sleep_time:.2f} seconds)")
+
+                        # The homopath lattices of this sweep are not used by the next one
+                        removed_lattices = remove_homopath_lattices()
+                        if removed_lattices:
+                            print(f"Removed {removed_lattices} homopath lattice file(s) of the threshold sweep.")
 
                         # 8) If we found permutations for all compress levels, we finalize
                         if permutations_calculated:
@@ -954,6 +1325,7 @@ def main_function():
                                 folder_name = f"Experiment_{numOfEdges}_{numo_objs}_{threshold}_{length_of_path}_{choice_place}_{timestamp}"
 
                             os.mkdir(folder_name)
+                            write_minhash_scheme(folder_name, minhash_scheme)
 
                             # Move relevant logs and files into the new folder
                             for file in os.listdir():
@@ -990,6 +1362,8 @@ def main_function():
                                     file == "Current_Experiment_Top_Leader_Reg_Leader_edges_costs.txt" or
                                     file == "Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt" or
                                     file == "seeds.txt" or
+                                    file == "Current_Experiment_Timing_Report.txt" or
+                                    file == "Current_Experiment_Pruning_Report.txt" or
                                     file == "4_sensors_HASHED.txt" or
                                     file == "4_sensors.txt" or
                                     file == "3_Motions.txt" or
@@ -8,6 +8,14 @@ import threading
 import sys
 import shutil
 import queue
+import selectors
+import asyncio
+import struct
+import itertools
+from collections import OrderedDict
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Third-party/data-science-related imports
 import pandas as pd
@@ -36,6 +44,146 @@ from preparation import (
 # Maximum hash value used in certain minhash or Cohen-based cardinality computations
 _max_hash = np.uint32((1 << 32) - 1)
 
+# Engine used by calculate_obj_id_intersection to grow homopaths by one edge per level:
+#   - "adjacency": each path only looks at the successors of its tail edge (dict indexes by path/edge)
+#   - "matrix":    the original dense Boolean_HoMoPathway_Matrix, kept to compare results
+# Both engines produce the same HoMoPaths_Dictionary.
+expansion_engine = "adjacency"
+
+# Representation of raw object sets in the adjacency engine:
+#   - "list":   Python lists and sets (original behaviour)
+#   - "array":  sorted uint32 arrays of dense object IDs
+#   - "bitset": packed bitsets of dense object IDs, counted with a popcount table
+#   - "auto":   array or bitset for every set, depending on its density
+object_set_backend = "auto"
+
+# Test used by the adjacency engine to extend hashed paths (MinHash signatures):
+#   - "list":        element-by-element loop over the signature lists (original behaviour)
+#   - "membership":  same result as "list", computed on a (edges x permutations) signature matrix;
+#                    every path keeps a packed bitmask over the positions of its base signature
+#   - "positional":  a position agrees only if all edges of the path have the same minhash there
+#                    (classic MinHash agreement, cheaper but not identical to "list")
+signature_agreement = "membership"
+
+# Longest homopath (number of edges) searched by homopath_levels, on top of limitN.
+# Levels are computed in a loop, so any value works; None => only limitN applies.
+# A path may repeat its tail edge (tail == next edge is not a loop), so such a path keeps
+# its support forever; this cap is what stops it (100 was the original hard-coded value).
+max_homopath_length = 100
+
+# Apriori-style pruning in the adjacency engine (the support of a path can only shrink as it grows):
+#   - successors that are not frequent single edges are never tried,
+#   - raw data only: a candidate is skipped when its (n-1)-suffix was not found at level n-1
+#     (exact for raw object sets; hashed paths keep the signature of their first edge, so not used there).
+# (A bound min(support of the path, support of the edge) is not used: both are frequent by construction.)
+# With apriori_pruning, the counts of every level of the adjacency engine are appended to
+# "Current_Experiment_Pruning_Report.txt"; the matrix engine does not prune and writes no report.
+# With lattice_threshold, the rows are those of the lattice mining (threshold = lattice_threshold);
+# the thresholds filtered from the lattice add no rows.
+apriori_pruning = True
+
+# Lowest threshold of a threshold sweep (15th command-line argument, 0 => not used).
+# If 0 < lattice_threshold <= threshold, every region is mined once at lattice_threshold and the
+# exact support of every path is kept in "Regional_Lattice_<region>_<key>.json"; the homopaths of
+# any higher threshold are then filtered from that lattice instead of being mined again.
+lattice_threshold = 0
+
+# Regional computation (process_region) runs in a pool of worker processes, so that the regions
+# are computed in parallel on different cores. The socket serving stays in the regional threads.
+#   - use_process_pool:      False => the original behaviour (one region at a time under function_lock)
+#   - regional_workers:      number of worker processes (None => one per region, at most one per core)
+#   - pool_start_method:     "spawn" starts clean interpreters, safe while the Top Leader thread runs
+use_process_pool = True
+regional_workers = None
+pool_start_method = "spawn"
+
+# Connections between the Top Leader and the Regional Leaders. A connection stays open for the
+# whole run; every message is one binary frame (see 4.2.2) carrying a request id, so several
+# requests can be in flight on the same connection (answers are matched by their id).
+#   - connections_per_region: size of the Top Leader's pool of connections to each region
+#     (a new connection is only opened when all the open ones are waiting for an answer)
+#   - wire_protocol_version:  version byte of every frame; frames of another version are refused
+#   - regional_response_timeout: seconds a request waits for its answer before it is given up
+#     like a lost connection (None => wait as long as the connection is alive)
+connections_per_region = 2
+wire_protocol_version = 1
+regional_response_timeout = 600
+
+# Server of the Regional Leaders (answers the requests of the Top Leader):
+#   - "asyncio":   an asyncio server; every request is answered by its own task, so a slow or large
+#                  answer does not hold up the other requests, on the same connection or on the others
+#   - "selectors": one selectors loop over all the connections, answering one request at a time
+regional_server = "asyncio"
+
+# Cache of the object sets fetched by the Top Leader during the spanning detection: the objects of a
+# path (request 1) and of an edge (request 2) are asked for again and again across the pairs.
+#   - object_set_cache_entries: size of the LRU cache keyed by (region, path) and (region, edge);
+#     identical requests in flight are sent once. 0 => no cache (every pair fetches its sets again).
+# Only the answers actually sent by a region are counted in the transmission costs.
+object_set_cache_entries = 100000
+
+# Bulk requests (request 6): for every pair of regions, the Top Leader asks once for the objects of all
+# the paths it will join, of every length (to the first region), and of the first edges of the paths
+# they meet (to the second region), instead of one request per path and one per first edge of the join.
+#   - True:  one exchange per region and pair of regions; the next edges of a path2 are fetched by the
+#            join while the threshold holds, so the same object sets are sent (and counted) as with False
+#   - False: one request per path / edge, as they are reached by the join
+bulk_object_requests = True
+
+# Compute pushdown (request 7): instead of fetching the objects of every edge of the paths2, the Top
+# Leader sends the objects of the paths1 to the second region, which runs the join of the paths1 with
+# its paths2 itself (join_candidate_paths) and answers, for every pair, how many edges of path2 stay
+# above the threshold and the objects of the spanning homopath (only when one is stored).
+#   - True:  one pushdown exchange per pair of regions (the paths1 are fetched with a bulk request)
+#   - False: the Top Leader intersects the objects of the edges itself
+compute_pushdown = True
+
+# Bloom-filter semi-join (requests 8 and 9) before the exact join of a pair of regions: the second
+# region sends a Bloom filter of the objects of the first edge of every candidate path2, the first
+# region counts how many objects of every path1 pass the filter of each of its candidates. This count
+# is never lower than the intersection the join computes at the first edge, so the pairs whose count
+# can not clear the threshold are not joined (and their object sets are not fetched) and the
+# homopaths are the same. The pruned pairs, the false positives (pairs that passed the filters but not
+# the first edge of the exact join), the bytes of the filters and the bytes of the object sets avoided
+# are printed and written to Current_Experiment_Info.txt.
+#   - bloom_prescreen:              True => pre-screen every pair of regions with Bloom filters
+#   - bloom_filter_bits_per_object: size of a filter (bits per object of the edge, at least 64 bits)
+#   - bloom_filter_hashes:          number of hash functions of a filter
+bloom_prescreen = False
+bloom_filter_bits_per_object = 10
+bloom_filter_hashes = 7
+
+# Homopath publication of the Regional Leaders (answer to the "Homopath_list" request):
+#   - "full":     the whole homopath dictionary of the region
+#   - "boundary": only the homopaths that can take part in a spanning homopath, i.e. whose last edge
+#                 leaves the region or whose first edge enters it (the boundary edges of
+#                 create_RegionConnections_for_Top_Leader, given to every region at startup), plus the
+#                 number of the other ("interior") homopaths per length (request 10). The spanning
+#                 detection of the Top Leader only joins the published homopaths. The whole
+#                 dictionary of every region is sent apart (request 13) for the output files and
+#                 all_HOMOPATHS: its bytes are reported as output bytes, not in C2Base_Total_Bytes.
+#                 The Top Leader stores the interior homopaths after the join, skipping the keys it
+#                 already stored, so the spanning homopaths and total_sum are the same as "full".
+homopath_publication = "full"
+
+# Unique objects of the regions ("Homopath_NumberOfObjs"), used by the Top Leader for the number of
+# unique objects of the experiment and, with raw data, for the overlap of every pair of regions
+# (numberOfObjects of the spanning thresholds):
+#   - "exact":  every region sends its whole set of unique objects (request 4)
+#   - "sketch": every region sends a KMV sketch of its objects (request 11: the k smallest 63-bit
+#               hashes); the Top Leader merges the sketches to estimate the global and pairwise
+#               numbers of objects. A sketch of a region with fewer than k objects holds all of
+#               them, so the numbers are then exact (up to hash collisions).
+#               With hashed data, every region sends the column-wise minima of its minhash signatures
+#               instead (request 12: one value per permutation, in place of its unique signature
+#               values), which the Top Leader merges for Cohen's estimate of the number of objects.
+#               The number of unique objects of seeds.txt and of the costs files is then this
+#               estimate of the raw objects, not the number of distinct signature values of
+#               "exact"; Current_Experiment_Info.txt says which one a run wrote.
+#   - object_sketch_relative_error: relative standard error of the estimates, k = 1 / error^2 + 2
+object_count_mode = "exact"
+object_sketch_relative_error = 0.01
+
 
 # -------------------------------------------------------------------------
 # GLOBAL VARIABLES & SHARED DATA STRUCTURES (for thread coordination)
@@ -60,6 +208,27 @@ all_regions_counter = []
 # A threading.Lock to ensure we don't simultaneously modify shared structures:
 function_lock = threading.Lock()
 
+# The settings of the top of the file used by the regional computation: they are handed to every
+# worker process of the pool, so that a value changed at runtime also applies to the regions
+_REGION_WORKER_SETTINGS = ("expansion_engine", "object_set_backend", "signature_agreement",
+                           "max_homopath_length", "apriori_pruning", "lattice_threshold")
+
+# The pool of worker processes used by the regional leaders (created in main, None => no pool),
+# and the lock guarding the shared log files (replaced by a multiprocessing.Lock in the workers)
+regional_process_pool = None
+region_log_lock = threading.Lock()
+
+# Pool of open connections of the Top Leader: region ID -> list of connections (see 4.2.1)
+regional_connection_pool = {}
+regional_connection_pool_lock = threading.Lock()
+
+# Object-set cache of the Top Leader (see 4.2.3):
+#   (requestPathORedge, region, edges) -> object IDs, the requests in flight, hit/miss counters
+object_set_cache = OrderedDict()
+object_set_cache_in_flight = {}
+object_set_cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+object_set_cache_lock = threading.Lock()
+
 # A placeholder for global homopath data. May be used to store or pass 
 # homopath info across threads (not always required).
 all_HOMOPATHS = None
@@ -68,6 +237,11 @@ all_HOMOPATHS = None
 completed_threads = 0
 lock = threading.Lock()  # Lock to guard the 'completed_threads' counter.
 
+# The fixed time.sleep(...) calls of the pipeline are replaced by events and the condition variable.
+# The seconds they were set to (their nominal durations, not a measurement) are summed here per
+# place, for the timing report of a run.
+removed_sleep_seconds = {}
+
 
 # -------------------------------------------------------------------------
 # HELPER FUNCTIONS FOR THREAD MANAGEMENT
@@ -106,6 +280,62 @@ def clear_lists():
         regions_without_Homopa_counter.clear()
         all_regions_counter.clear()
 
+def record_removed_sleep(place, seconds):
+    """
+    Adds the nominal 'seconds' of a removed fixed sleep to 'removed_sleep_seconds' under 'place'.
+    """
+    with lock:
+        removed_sleep_seconds[place] = removed_sleep_seconds.get(place, 0) + seconds
+
+def write_timing_report(wall_time, raw_or_hashed, threshold, current_compress, permutations):
+    """
+    Prints the measured wall time of the run and the nominal seconds of the fixed sleeps removed
+    from it (the constants they were set to, summed per place; they were not measured), and appends
+    the same numbers to "Current_Experiment_Timing_Report.txt":
+        raw_or_hashed,threshold,current_compress,permutations,wall_time,removed_sleeps_nominal,[place:seconds;...]
+    """
+    removed_time = sum(removed_sleep_seconds.values())
+    places = ";".join(f"{place}:{seconds}" for place, seconds in removed_sleep_seconds.items())
+
+    print(f"\tTiming report: run took {wall_time:.2f}s (measured), removed fixed sleeps (nominal): "
+          f"{removed_time}s => {removed_sleep_seconds}")
+    with open("Current_Experiment_Timing_Report.txt", 'a') as timing_file:
+        timing_file.write(f"{raw_or_hashed},{threshold},{current_compress},{permutations},"
+                          f"{round(wall_time, 4)},{removed_time},[{places}]\n")
+
+def _region_worker_settings():
+    """
+    The module settings read by the regional computation besides its arguments
+    (see the top of the file), as {name: value}, for the workers of 'regional_process_pool'.
+    """
+    return {name: globals()[name] for name in _REGION_WORKER_SETTINGS}
+
+def _init_region_worker(worker_raw_or_hashed, worker_current_compress, worker_log_lock, worker_settings):
+    """
+    Initializer of every worker process of 'regional_process_pool'.
+    A spawned worker imports this module without running its __main__ block, so the
+    module globals read by prepare_data_from_file and calculate_obj_id_intersection
+    are set here (raw_or_hashed, current_compress and the settings of _region_worker_settings()
+    in the main process), together with the lock shared by all workers for the log files.
+    """
+    global raw_or_hashed
+    global current_compress
+    global region_log_lock
+    raw_or_hashed = worker_raw_or_hashed
+    current_compress = worker_current_compress
+    region_log_lock = worker_log_lock
+    globals().update(worker_settings)
+
+def _compute_region_in_worker(*compute_region_args):
+    """
+    Runs compute_region(...) in a worker process and also returns the nominal seconds of the
+    sleeps removed from it, so that the regional thread can add them to the timing report of
+    the main process.
+    """
+    removed_sleep_seconds.clear()
+    result = compute_region(*compute_region_args)
+    return result, dict(removed_sleep_seconds)
+
 
 
 
@@ -168,8 +398,13 @@ def start_Top_leader(regionids, all_connections, threshold,
 
     # Data structures to hold homopaths, object sets, etc.
     all_hot_paths = {}         # Will store the homopaths from each region
+    interior_homopaths = {}    # Boundary-only publication: {region: {length: number of interior homopaths}}
+    output_hot_paths = {}      # Boundary-only publication: {region: whole homopath dictionary} (output files)
+    output_bytes = 0           # Boundary-only publication: bytes of the whole dictionaries (request 13)
     objOfRegion = {}           # For each region, a set of its local unique objects (if raw data used)
     totalUniqObjs = set()      # Union set of objects from all regions
+    region_sketches = {}       # object_count_mode "sketch": {region: KMV sketch of its objects}
+    sketch_size = None         # k of the KMV sketches (the smallest one received)
     top_leader_integers_raw = 0
     top_leader_integers_hashed = 0
     first_level_total_integers = 0
@@ -183,13 +418,24 @@ def start_Top_leader(regionids, all_connections, threshold,
     # Stage 1: Collect data from each region:
     #   - If a region has homopaths, we request them (mode=3).
     #   - Otherwise, we only request the number of objects (mode=4).
+    # The requests go to all regions at once (one collecting thread per region, see
+    # collect_region_data), and the answers are merged here as they arrive, so the collection
+    # takes as long as the slowest region instead of the sum of all regions.
     # --------------------------------------------------------------------------
-    for region_id in all_regions_counter:
-        local_unique_objs = set()
-        with function_lock:  # Acquire a lock to ensure thread-safety on shared resources
+    with ThreadPoolExecutor(max_workers=max(len(all_regions_counter), 1)) as collection_pool:
+        region_futures = {
+            collection_pool.submit(collect_region_data, region_id, region_id in regions_ready_counter,
+                                   raw_or_hashed, object_count_mode, homopath_publication): region_id
+            for region_id in all_regions_counter
+        }
+        for region_future in as_completed(region_futures):
+            region_id = region_futures[region_future]
+            (received_data_chunk_dict, received_data_chunk_Objs, received_data_transmitted_integers,
+             received_interior_counts, received_output_dict) = region_future.result()
+            local_unique_objs = set()
+
             if region_id in regions_ready_counter:
-                # Region that has homopaths: request actual homopath data
-                received_data_chunk_dict = send_request_to_regional_leader(3, region_id, 3)  
+                # Region that has homopaths: the actual homopath data
                 # get_size(...) = calculate the size of the payload in mbytes as json .
                 size = get_size(received_data_chunk_dict)
 
@@ -201,81 +447,99 @@ def start_Top_leader(regionids, all_connections, threshold,
                     top_leader_integers_raw += size
                 else:
                     top_leader_integers_hashed += size
-            else:
-                # Region that has NO homopaths: only request the number-of-objects info (mode=4).
-                received_data_chunk_Objs = send_request_to_regional_leader(4, region_id, 4)
-                size = get_size(received_data_chunk_Objs)
-
-                # The data comes back presumably as a string like "[1,2,3,...]"
-                # so we parse that to get a set of integer objects.
-                values_list = received_data_chunk_Objs[1:-1].split(',')
-                received_data_chunk_Objs_set = {int(value.strip()) for value in values_list}
-
-                # For raw data, we add those objects to local + global sets.
-                # For hashed data, we also add them, but the usage might differ.
-                for element in received_data_chunk_Objs_set:
-                    if raw_or_hashed == 0:
-                        totalUniqObjs.add(element)
-                        local_unique_objs.add(element)
-                    else:
-                        totalUniqObjs.add(element)
-                # After we retrieve data from a region that has no homopath, 
-                # we might optionally send a "shutdown" or "no further action" request 
-                # using "send_request_to_regional_leader('[-1]', region_id, '[-1]')".
 
-            # If this region DOES have homopaths:
-            if region_id in regions_ready_counter:
                 # Convert dictionary keys from string to int
                 received_data_chunk_dict_int_keys = {int(k): v for k, v in received_data_chunk_dict.items()}
                 all_hot_paths[region_id] = received_data_chunk_dict_int_keys
 
-                # For debugging, also request the number of objects in that region (mode=4).
+                # Boundary-only publication: the homopaths of the region that were not sent
+                if received_interior_counts:
+                    C2Base_Total_Bytes += calculate_transmission_cost(received_interior_counts)
+                    interior_homopaths[region_id] = received_interior_counts
+
+                # ... and its whole dictionary, only for the output files
+                if received_output_dict is not None and received_output_dict != -1:
+                    output_bytes += calculate_transmission_cost(received_output_dict)
+                    output_hot_paths[region_id] = {int(k): v for k, v in received_output_dict.items()}
+
+                # The number of objects in that region (mode=4).
                 # This helps unify object sets across the entire system.
-                received_data_chunk_Objs = send_request_to_regional_leader(4, region_id, 4)
                 size = get_size(received_data_chunk_Objs)
 
                 # If we are dealing with raw data, add the cost for these transmissions.
                 # If hashed, we might not strictly need them for union of objects, 
                 # but here it’s also done for debugging.
-                if raw_or_hashed == 0:
-                    C2Base_Total_Bytes += calculate_transmission_cost(received_data_chunk_Objs)
+                # The cost model stays the size of the JSON text of the set ("{1, 2, ...}"),
+                # so that the costs remain comparable with earlier experiments.
+                # A KMV sketch is counted as its packed size (8 bytes per hash), and so are the
+                # minima of the signatures of hashed data (4 bytes per permutation).
+                if raw_or_hashed == 0 and received_data_chunk_Objs is not None:
+                    if object_count_mode == "sketch":
+                        C2Base_Total_Bytes += 8 * (1 + len(received_data_chunk_Objs[1]))
+                    else:
+                        C2Base_Total_Bytes += calculate_transmission_cost(str(received_data_chunk_Objs))
+                elif object_count_mode == "sketch" and received_data_chunk_Objs is not None:
+                    C2Base_Total_Bytes += 4 * len(received_data_chunk_Objs)
 
-                time.sleep(1)  # to mimic real-time network delay or avoid concurrency issues
+                # (A fixed 1s delay used to be here; every request already waits for its response)
+                record_removed_sleep("Top Leader requests", 1)
 
-                if region_id in regions_ready_counter:
-                    top_leader_integers_raw += size
+                top_leader_integers_raw += size
 
-                # This request (mode=5) presumably asks for total number of transmitted integers
-                # that region had from 1st-level sensors. Used for debugging/performance metrics.
-                received_data_transmitted_integers = send_request_to_regional_leader(5, region_id, 5)
-                # received_data_transmitted_integers has not UNIQUE objs , dont worry
+                # received_data_transmitted_integers (mode=5) has not UNIQUE objs , dont worry
                 # has the total number of integers that the regional leaderX from 1st level  received from its corresponding sensors
-                # received_data_transmitted_integers is coming as response from through other functions .
                 # start function which produce the functitotal_information_integers is function prepare_data 
                 # which returns here "total_information_integers += topic_information_integers" 
                 
-                
                 # Multiply by 4 to convert 'count of integers' to approximate bytes
-                first_level_total_integers += received_data_transmitted_integers * 4
-                time.sleep(1)
+                if received_data_transmitted_integers is not None:
+                    first_level_total_integers += received_data_transmitted_integers * 4
+                record_removed_sleep("Top Leader requests", 1)
+            else:
+                # Region that has NO homopaths: only the number-of-objects info (mode=4).
+                size = get_size(received_data_chunk_Objs)
 
-                # Parse again the object info for local+global sets:
-                values_list = received_data_chunk_Objs[1:-1].split(',')
-                received_data_chunk_Objs_set = {int(value.strip()) for value in values_list}
-        
-                for element in received_data_chunk_Objs_set:
-                    if raw_or_hashed == 0:
-                        totalUniqObjs.add(element)
-                        local_unique_objs.add(element)
-                    else:
-                        totalUniqObjs.add(element)
+            # The objects of the region (or their sketch, or the minima of its signatures) did not
+            # arrive, e.g. the connection was lost: nothing is merged, and the region is left out of
+            # the spanning detection, as its overlap with the other regions is unknown
+            if received_data_chunk_Objs is None:
+                print(f"\tTop Leader : no objects received from Regional Leader {region_id}")
+                all_hot_paths.pop(region_id, None)
+                interior_homopaths.pop(region_id, None)
+                output_hot_paths.pop(region_id, None)
+                continue
+
+            # Hashed data: the minima of the signatures are merged below, they replace the set of objects
+            if object_count_mode == "sketch" and raw_or_hashed == 1:
+                region_sketches[region_id] = received_data_chunk_Objs
+                continue
+
+            # KMV sketches: they are merged below, the sketch of the region replaces its set of objects
+            if object_count_mode == "sketch" and raw_or_hashed == 0:
+                region_sketch_size, region_sketches[region_id] = received_data_chunk_Objs
+                sketch_size = region_sketch_size if sketch_size is None else min(sketch_size, region_sketch_size)
+                if region_id in regions_ready_counter:
+                    objOfRegion[region_id] = region_sketches[region_id]
+                continue
 
+            # The data comes back as the set of integer objects (packed array, nothing to parse).
+            # For raw data, we add those objects to local + global sets.
+            # For hashed data, we also add them, but the usage might differ.
+            for element in received_data_chunk_Objs:
+                if raw_or_hashed == 0:
+                    totalUniqObjs.add(element)
+                    local_unique_objs.add(element)
+                else:
+                    totalUniqObjs.add(element)
+
+            if region_id in regions_ready_counter:
                 # Keep track of what objects belong to which region
                 objOfRegion[region_id] = local_unique_objs
-            else:
-                # If the region had no homopaths, we can send a final "no further action" request 
-                # or finalize the communication with that region.
-                send_request_to_regional_leader("[-1]", region_id, "[-1]")
+
+    # The regions answered in any order; the spanning detection visits them in the order of
+    # all_regions_counter, as before, so its results do not depend on who answered first.
+    all_hot_paths = {region_id: all_hot_paths[region_id]
+                     for region_id in all_regions_counter if region_id in all_hot_paths}
 
     # At this point, we have:
     #   1) homopath data from all regions that have them in `all_hot_paths`
@@ -285,11 +549,46 @@ def start_Top_leader(regionids, all_connections, threshold,
 
     # Convert the global set of unique objects to a list for later operations
     totalUniqObjs = list(totalUniqObjs)
+    number_of_unique_objects = len(totalUniqObjs)
+
+    # Hashed data: Cohen's estimate from the merged minima of the signatures of all the regions.
+    # It estimates the number of (raw) objects, where "exact" counts the distinct signature values.
+    if object_count_mode == "sketch" and raw_or_hashed == 1:
+        number_of_unique_objects = 0
+        if region_sketches:
+            number_of_unique_objects = int(cohen_cardinality(
+                merge_cohen_minima(list(region_sketches.values())), num_of_permutations))
+        print(f"\tTop Leader unique objects (Cohen, merged minima) : {number_of_unique_objects}")
+        with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
+            fileofexperiments.write(f"TOP LEADER\nUnique objects (Cohen, merged minima) : {number_of_unique_objects}"
+                                    f"\n(the number of unique objects of seeds.txt and of the costs files is this "
+                                    f"estimate of the raw objects, not the number of unique signature values)\n\n")
+
+    # KMV sketches: the number of unique objects of the experiment is estimated from their union
+    elif object_count_mode == "sketch":
+        number_of_unique_objects = 0
+        if sketch_size is not None:
+            number_of_unique_objects = int(round(kmv_cardinality(
+                kmv_union(list(region_sketches.values()), sketch_size), sketch_size)))
+        print(f"\tTop Leader unique objects (KMV sketches, k = {sketch_size}) : {number_of_unique_objects}")
+        with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
+            fileofexperiments.write(f"TOP LEADER\nUnique objects (KMV sketches, k = {sketch_size}) : "
+                                    f"{number_of_unique_objects}\n\n")
+
+    # Boundary-only publication: the output files list the whole dictionary of every region
+    # (request 13), not only the homopaths published for the join
+    homopaths_for_output = {region_id: output_hot_paths.get(region_id, c_hot_paths)
+                            for region_id, c_hot_paths in all_hot_paths.items()}
+    if homopath_publication == "boundary":
+        with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
+            fileofexperiments.write(f"TOP LEADER\nInterior homopaths per region (not published) : "
+                                    f"{interior_homopaths}\nOutput bytes (whole homopath dictionaries) : "
+                                    f"{output_bytes}\n\n")
 
     # Write the raw or hashed homopath data + total unique objects to a file 
     # (for debugging, logging, or offline analysis).
     write_results_from_Top_Leader_to_file(
-        raw_or_hashed, all_hot_paths, len(totalUniqObjs), current_compress,
+        raw_or_hashed, homopaths_for_output, number_of_unique_objects, current_compress,
         threshold, total_edges, num_of_permutations,
         "Current_Experiment_Top_Leader_flat_visualization_all_together.txt",
         "Current_Experiment_Top_Leader_flat_visualization_per_Region_brackets.txt"
@@ -305,6 +604,32 @@ def start_Top_leader(regionids, all_connections, threshold,
     if len(all_hot_paths) > 1:
         list_of_span_homopaths = []
         all_HOMOPATHS = {}
+
+        # Boundary-indexed join: the hot paths of every region and length are indexed by their
+        # first and last edge, so for two regions only the pairs (path1, path2) whose ends meet
+        # across a boundary connection are visited (the last edge of path1 is connected to the
+        # first edge of path2 in all_connections), instead of every pair of paths.
+        boundary_index = build_boundary_index(all_hot_paths)
+
+        # The objects of a path or an edge are fetched once and then taken from the cache
+        clear_object_set_cache()
+
+        # Counters of the Bloom-filter semi-join (bloom_prescreen)
+        bloom_stats = {"pairs": 0, "pruned": 0, "false_positives": 0, "sketch_bytes": 0, "avoided_bytes": 0}
+
+        # If raw data, intersection of real object sets for threshold ratio, computed once per region pair.
+        # If hashed, we might rely on permutations count for approximate usage
+        region_overlap = {}
+        if raw_or_hashed == 0:
+            for region_id in all_hot_paths:
+                for region_id2 in all_hot_paths:
+                    if object_count_mode == "sketch":
+                        region_overlap[(region_id, region_id2)] = int(round(kmv_intersection_cardinality(
+                            objOfRegion[region_id], objOfRegion[region_id2], sketch_size)))
+                    else:
+                        region_overlap[(region_id, region_id2)] = len(
+                            set(objOfRegion[region_id]).intersection(set(objOfRegion[region_id2])))
+
         # `all_HOMOPATHS` is a dictionary structure to store results of discovered spanning homopaths
         for region_id, c_hot_paths1 in all_hot_paths.items():
             if region_id not in all_HOMOPATHS:
@@ -312,18 +637,118 @@ def start_Top_leader(regionids, all_connections, threshold,
             if region_id not in all_HOMOPATHS[region_id]:
                 all_HOMOPATHS[region_id][region_id] = {}
 
+            # The exchanges with every other region are prepared once for all the lengths of the
+            # paths of region_id: one Bloom screening, one bulk request of object sets per region
+            # and one compute pushdown for every pair of regions
+            region_pairs = {}
+            for region_id2, c_hot_paths2 in all_hot_paths.items():
+                if region_id2 == region_id:
+                    continue
+                if raw_or_hashed == 0:
+                    numberOfObjects = region_overlap[(region_id, region_id2)]
+                else:
+                    numberOfObjects = num_of_permutations
+
+                # Boundary connections of region_id -> region_id2: {last edge: [first edges]}
+                boundary = all_connections.get(region_id, {}).get(region_id2, {})
+
+                # Number of paths of every length of region_id2, the interior ones included
+                number_of_paths2 = {length2: len(hot_paths2) + interior_homopaths.get(region_id2, {}).get(length2, 0)
+                                    for length2, hot_paths2 in c_hot_paths2.items()}
+
+                # For each length of path1 and of path2, only the pairs whose ends meet across the
+                # boundary, in the order of the paths (path1, then path2), as the full double loop did
+                # (with the boundary-only publication, a length may only have interior paths)
+                boundary_pairs_of_lengths = {}
+                for length, hot_paths1 in c_hot_paths1.items():
+                    if length > 0 and hot_paths1:
+                        for length2, hot_paths2 in c_hot_paths2.items():
+                            if length2 > 0 and (hot_paths2 or number_of_paths2[length2]):
+                                boundary_pairs_of_lengths[(length, length2)] = find_boundary_pairs(
+                                    boundary_index[region_id][length]["last"], boundary,
+                                    boundary_index[region_id2][length2]["first"])
+
+                # Compute pushdown: region_id2 runs the join of the paths1 with its paths2,
+                # so the objects of the edges of the paths2 are not fetched at all.
+                # (numberOfObjects == 0 is left to the join below, as before)
+                use_pushdown = compute_pushdown and numberOfObjects > 0
+
+                # Bloom-filter semi-join: only the pairs whose path1 may have enough objects
+                # in the first edge of path2 are joined, the others can not clear the threshold.
+                # (boundary_pairs_of_lengths keeps all the pairs for the unconnected paths below)
+                joined_pairs_of_lengths = boundary_pairs_of_lengths
+                bloom_screened = False
+                if bloom_prescreen and numberOfObjects > 0 and boundary_pairs_of_lengths:
+                    screen = bloom_prescreen_pairs(
+                        region_id, region_id2, threshold, numberOfObjects, c_hot_paths1,
+                        c_hot_paths2, boundary_pairs_of_lengths, use_pushdown)
+                    if screen is not None:
+                        joined_pairs_of_lengths, screen_counters = screen
+                        for counter, value in screen_counters.items():
+                            bloom_stats[counter] += value
+                        C2Base_Total_Bytes += screen_counters["sketch_bytes"]
+                        bloom_screened = True
+
+                # Bulk requests: the objects of all the paths1 of these pairs (one exchange with
+                # region_id) and of the first edges of their paths2 (one exchange with region_id2),
+                # counted in the transmission costs when they are sent. The join always reads the
+                # first edge of path2; the next edges are fetched by the join itself, only as long
+                # as the threshold holds, as without the bulk requests.
+                pair_object_sets = {}
+                pushdown_results = {}
+                if bulk_object_requests or use_pushdown:
+                    paths_request = []
+                    edges_request = []
+                    for (length, length2), boundary_pairs in joined_pairs_of_lengths.items():
+                        for position1, positions2 in boundary_pairs:
+                            paths_request.append((1, c_hot_paths1[length][position1]))
+                            if not use_pushdown:
+                                for position2 in positions2:
+                                    edges_request.append((2, [c_hot_paths2[length2][position2][0]]))
+
+                    # Object sets sent between the Top Leader and the regions
+                    transferred_object_sets = []
+                    for object_request, region in ((paths_request, region_id), (edges_request, region_id2)):
+                        if not object_request:
+                            continue
+                        fetched = fetch_object_sets(region, object_request)
+                        for object_key, (obj_ids, transmitted) in fetched.items():
+                            pair_object_sets[object_key] = obj_ids
+                            if transmitted:
+                                transferred_object_sets.append(obj_ids)
+
+                    # The objects of the paths1 go to region_id2, the results of the joins come back
+                    if use_pushdown:
+                        pushdown_results, pushed_object_sets = push_down_join(
+                            region_id2, threshold, numberOfObjects, c_hot_paths1, c_hot_paths2,
+                            joined_pairs_of_lengths, pair_object_sets)
+                        transferred_object_sets.extend(pushed_object_sets)
+
+                    for obj_ids in transferred_object_sets:
+                        if obj_ids is not None:
+                            C2Base_Total_Bytes += calculate_transmission_cost(obj_ids)
+                            if raw_or_hashed == 0:
+                                top_leader_integers_raw += 4 * (1 + len(obj_ids))
+                            else:
+                                top_leader_integers_hashed += 4 * (1 + len(obj_ids))
+
+                region_pairs[region_id2] = (number_of_paths2, boundary_pairs_of_lengths, joined_pairs_of_lengths,
+                                            bloom_screened, pair_object_sets, pushdown_results)
+
             # For each (length, hot_paths1) in region_id's homopath dictionary
             for length, hot_paths1 in c_hot_paths1.items():
                 if length > 0:
                     if not hot_paths1:
                         continue  # If no actual homopath data, skip
 
+                    # Positions of the paths (of this length) not yet stored in region_id's dictionary
+                    # because every path of the other regions met them so far (see below)
+                    waiting_for_unconnected = list(range(len(hot_paths1)))
+
                     # Compare with another region's homopath data
                     for region_id2, c_hot_paths2 in all_hot_paths.items():
-                        # If raw data, intersection of real object sets for threshold ratio
-                        # If hashed, we might rely on permutations count for approximate usage
                         if raw_or_hashed == 0:
-                            numberOfObjects = len(set(objOfRegion[region_id]).intersection(set(objOfRegion[region_id2])))
+                            numberOfObjects = region_overlap[(region_id, region_id2)]
                         else:
                             numberOfObjects = num_of_permutations
 
@@ -336,30 +761,33 @@ def start_Top_leader(regionids, all_connections, threshold,
                             all_HOMOPATHS[region_id2][region_id2] = {}
 
                         if region_id2 != region_id:
+                            # The pairs of this length of path1 with every length of path2 (see above)
+                            (number_of_paths2, boundary_pairs_of_lengths, joined_pairs_of_lengths,
+                             bloom_screened, pair_object_sets, pushdown_results) = region_pairs[region_id2]
+                            boundary_pairs_of_length2 = {length2: boundary_pairs
+                                                         for (length1, length2), boundary_pairs
+                                                         in boundary_pairs_of_lengths.items() if length1 == length}
+                            joined_pairs_of_length2 = {length2: joined_pairs
+                                                       for (length1, length2), joined_pairs
+                                                       in joined_pairs_of_lengths.items() if length1 == length}
+
                             # For each path in region_id2's homopath dictionary
                             for length2, hot_paths2 in c_hot_paths2.items():
-                                if length2 > 0:
-                                    if not hot_paths2:
-                                        continue
+                                if length2 in boundary_pairs_of_length2:
+                                    boundary_pairs = boundary_pairs_of_length2[length2]
 
-                                    # Attempt to link each path from region_id with each from region_id2
-                                    for hot_path__1 in hot_paths1:
-                                        hot_path1 = tuple(hot_path__1)  
-                                        for hot_path2 in hot_paths2:
+                                    for position1, positions2 in joined_pairs_of_length2[length2]:
+                                        hot_path1 = tuple(hot_paths1[position1])
+                                        for position2 in positions2:
+                                            hot_path2 = hot_paths2[position2]
                                             hot_path_2 = tuple(hot_path2)
-
-                                            # We check if there's a known adjacency between the last node 
-                                            # of hot_path1 and the first node of hot_path2 across regions 
-                                            # (region_id and region_id2) in all_connections.
                                             for_sure_intersected_objs = []
-                                            if (region_id in all_connections 
-                                                and region_id2 in all_connections[region_id]
-                                                and hot_path1[-1] in all_connections[region_id][region_id2]
-                                                and hot_path2[0] in all_connections[region_id][region_id2][hot_path1[-1]]):
-                                                
-                                                # If the paths are connected across the boundary of region_id -> region_id2,
-                                                # we fetch the actual objects for path1
-                                                objIDs_ofPath1 = send_request_to_regional_leader(1, region_id, hot_path1)
+
+                                            # If the paths are connected across the boundary of region_id -> region_id2,
+                                            # we fetch the actual objects for path1
+                                            # (from the object-set cache if it was already sent)
+                                            objIDs_ofPath1, transmitted = fetch_object_set(1, region_id, hot_path1, pair_object_sets)
+                                            if transmitted:
                                                 size = get_size(objIDs_ofPath1)
                                                 C2Base_Total_Bytes += calculate_transmission_cost(objIDs_ofPath1)
 
@@ -375,18 +803,35 @@ def start_Top_leader(regionids, all_connections, threshold,
                                                     else:
                                                         top_leader_integers_hashed += 4
 
-                                                intersected_objs = []
-                                                edges_to_append = []
-                                                not_appendedEdges2 = []
-                                                count = 0
-
-                                                # Now we iterate over each edge in path2 to progressively 
-                                                # check intersection with the objects from path1.
-                                                for edge_of_path2 in hot_path2:
-                                                    new_intersected_objs = []
-                                                    counter_substraction_path2 = 0
-
-                                                    objIDs_ofEdge2 = send_request_to_regional_leader(2, region_id2, [edge_of_path2])
+                                            intersected_objs = []
+                                            edges_to_append = []
+                                            not_appendedEdges2 = []
+                                            count = 0
+
+                                            # With the compute pushdown, region_id2 already ran the loop below
+                                            # for this pair: we only store its result, as the loop would have
+                                            edges_of_path2_to_join = hot_path2
+                                            if (hot_path1, hot_path_2) in pushdown_results:
+                                                edges_of_path2_to_join = ()
+                                                accepted_edges, recorded_objs = pushdown_results[(hot_path1, hot_path_2)]
+                                                edges_to_append = list(hot_path2[:accepted_edges])
+                                                if accepted_edges > 0:
+                                                    all_HOMOPATHS[region_id2][region_id2][hot_path_2] = -1
+                                                if recorded_objs is not None:
+                                                    key_hot_path1 = tuple(list(hot_path1) + edges_to_append)
+                                                    all_HOMOPATHS[region_id][region_id2][key_hot_path1] = recorded_objs
+                                                    number_of_HoMoPaths += 1
+                                                    list_of_span_homopaths.append(key_hot_path1)
+
+                                            # Now we iterate over each edge in path2 to progressively 
+                                            # check intersection with the objects from path1.
+                                            for edge_of_path2 in edges_of_path2_to_join:
+                                                new_intersected_objs = []
+                                                counter_substraction_path2 = 0
+
+                                                objIDs_ofEdge2, transmitted = fetch_object_set(2, region_id2, [edge_of_path2],
+                                                                                              pair_object_sets)
+                                                if transmitted:
                                                     size = get_size(objIDs_ofEdge2)
                                                     C2Base_Total_Bytes += calculate_transmission_cost(objIDs_ofEdge2)
 
@@ -401,83 +846,117 @@ def start_Top_leader(regionids, all_connections, threshold,
                                                         else:
                                                             top_leader_integers_hashed += 4
 
-                                                    # If it's the first edge in path2, we intersect with entire objIDs_ofPath1
-                                                    # If not the first edge, we intersect with whatever intersection we had so far.
-                                                    if count < 1:
-                                                        ObjIDS_Path1 = objIDs_ofPath1
-                                                    else:
-                                                        ObjIDS_Path1 = intersected_objs
-
-                                                    # Perform intersection between region1's path1 objects 
-                                                    # and region2's current edge objects
-                                                    for obj_of_path1 in ObjIDS_Path1:
-                                                        for obj_of_edge2 in objIDs_ofEdge2:
-                                                            if obj_of_path1 == obj_of_edge2:
-                                                                new_intersected_objs.append(obj_of_path1)
-                                                                intersected_objs = new_intersected_objs
-                                                                break
-
-                                                    
-                                                    intersection = len(intersected_objs)
-                                                    intersectionPercentage = (intersection / numberOfObjects)
-
-                                                    # Decide whether the threshold is met to keep expanding
-                                                    if intersectionPercentage >= threshold:
-                                                        all_HOMOPATHS[region_id2][region_id2][hot_path_2] = -1
-                                                        counter_substraction_path2 += 1
-                                                        edges_to_append.append(edge_of_path2)
-                                                        for_sure_intersected_objs = intersected_objs
-
-                                                        # If we are at the last edge in path2, 
-                                                        # then we have found a "spanning homopath" 
-                                                        # that extends from region1 path to region2 path.
-                                                        if edge_of_path2 == hot_path2[-1]:
-                                                            key_hot_path1 = list(hot_path1) + edges_to_append
-                                                            key_hot_path1 = tuple(key_hot_path1)
-                                                            if key_hot_path1 not in all_HOMOPATHS[region_id][region_id2]:
-                                                                all_HOMOPATHS[region_id][region_id2][key_hot_path1] = {}
-
-                                                            all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
-                                                            number_of_HoMoPaths += 1
-                                                            list_of_span_homopaths.append(key_hot_path1)
+                                                # If it's the first edge in path2, we intersect with entire objIDs_ofPath1
+                                                # If not the first edge, we intersect with whatever intersection we had so far.
+                                                if count < 1:
+                                                    ObjIDS_Path1 = objIDs_ofPath1
+                                                else:
+                                                    ObjIDS_Path1 = intersected_objs
+
+                                                # Perform intersection between region1's path1 objects 
+                                                # and region2's current edge objects
+                                                for obj_of_path1 in ObjIDS_Path1:
+                                                    for obj_of_edge2 in objIDs_ofEdge2:
+                                                        if obj_of_path1 == obj_of_edge2:
+                                                            new_intersected_objs.append(obj_of_path1)
+                                                            intersected_objs = new_intersected_objs
                                                             break
-                                                        else:
-                                                            # If not the last edge, continue to next edge in the path
-                                                            count = 1
-                                                    else:
-                                                        # If threshold is not met, we break out. 
-                                                        # But first we might store partial intersection
-                                                        # if some edges were valid up until now.
-                                                        if for_sure_intersected_objs:
-                                                            key_hot_path1 = list(hot_path1) + edges_to_append
-                                                            key_hot_path1 = tuple(key_hot_path1)
-                                                            if key_hot_path1 not in all_HOMOPATHS[region_id][region_id2]:
-                                                                all_HOMOPATHS[region_id][region_id2][key_hot_path1] = {}
-                                                            all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
-                                                            number_of_HoMoPaths += 1
-                                                            list_of_span_homopaths.append(key_hot_path1)
-                                                        break
 
-                                                # If we appended some edges for path2 but not all:
-                                                if edges_to_append:
-                                                    for edge_2 in hot_path2:
-                                                        if edge_2 not in edges_to_append:
-                                                            not_appendedEdges2.append(edge_2)
-
-                                                    if not_appendedEdges2:
-                                                        not_appendedEdges_2 = tuple(not_appendedEdges2)
-                                                        if not_appendedEdges_2 not in all_HOMOPATHS[region_id2][region_id2]:
-                                                            all_HOMOPATHS[region_id2][region_id2][not_appendedEdges_2] = {}
-                                                        all_HOMOPATHS[region_id2][region_id2][not_appendedEdges_2] = 0
-                                            else:
-                                                # If the last node of path1 does not connect to the first node of path2,
-                                                # we simply store path1 in region_id's dictionary (no spanning path).
-                                                if hot_path1 not in all_HOMOPATHS[region_id][region_id]:
-                                                    all_HOMOPATHS[region_id][region_id][hot_path1] = {}
-                                                    all_HOMOPATHS[region_id][region_id][hot_path1] = list(hot_path1)
+                                                
+                                                intersection = len(intersected_objs)
+                                                intersectionPercentage = (intersection / numberOfObjects)
+
+                                                # Decide whether the threshold is met to keep expanding
+                                                if intersectionPercentage >= threshold:
+                                                    all_HOMOPATHS[region_id2][region_id2][hot_path_2] = -1
+                                                    counter_substraction_path2 += 1
+                                                    edges_to_append.append(edge_of_path2)
+                                                    for_sure_intersected_objs = intersected_objs
+
+                                                    # If we are at the last edge in path2, 
+                                                    # then we have found a "spanning homopath" 
+                                                    # that extends from region1 path to region2 path.
+                                                    if edge_of_path2 == hot_path2[-1]:
+                                                        key_hot_path1 = list(hot_path1) + edges_to_append
+                                                        key_hot_path1 = tuple(key_hot_path1)
+                                                        if key_hot_path1 not in all_HOMOPATHS[region_id][region_id2]:
+                                                            all_HOMOPATHS[region_id][region_id2][key_hot_path1] = {}
+
+                                                        all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
+                                                        number_of_HoMoPaths += 1
+                                                        list_of_span_homopaths.append(key_hot_path1)
+                                                        break
+                                                    else:
+                                                        # If not the last edge, continue to next edge in the path
+                                                        count = 1
+                                                else:
+                                                    # If threshold is not met, we break out. 
+                                                    # But first we might store partial intersection
+                                                    # if some edges were valid up until now.
+                                                    if for_sure_intersected_objs:
+                                                        key_hot_path1 = list(hot_path1) + edges_to_append
+                                                        key_hot_path1 = tuple(key_hot_path1)
+                                                        if key_hot_path1 not in all_HOMOPATHS[region_id][region_id2]:
+                                                            all_HOMOPATHS[region_id][region_id2][key_hot_path1] = {}
+                                                        all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
+                                                        number_of_HoMoPaths += 1
+                                                        list_of_span_homopaths.append(key_hot_path1)
+                                                    break
+
+                                            # A pair kept by the Bloom filters that does not clear the first edge
+                                            if bloom_screened and not edges_to_append:
+                                                bloom_stats["false_positives"] += 1
+
+                                            # If we appended some edges for path2 but not all:
+                                            if edges_to_append:
+                                                for edge_2 in hot_path2:
+                                                    if edge_2 not in edges_to_append:
+                                                        not_appendedEdges2.append(edge_2)
+
+                                                if not_appendedEdges2:
+                                                    not_appendedEdges_2 = tuple(not_appendedEdges2)
+                                                    if not_appendedEdges_2 not in all_HOMOPATHS[region_id2][region_id2]:
+                                                        all_HOMOPATHS[region_id2][region_id2][not_appendedEdges_2] = {}
+                                                    all_HOMOPATHS[region_id2][region_id2][not_appendedEdges_2] = 0
+
+                                    # If the last edge of path1 does not connect to the first edge of some path2,
+                                    # we simply store path1 in region_id's dictionary (no spanning path).
+                                    # Only this dictionary is written here, so it does not matter that
+                                    # it happens after the joins of this block.
+                                    connected_counts = {position1: len(positions2)
+                                                        for position1, positions2 in boundary_pairs}
+                                    still_waiting = []
+                                    for position1 in waiting_for_unconnected:
+                                        if connected_counts.get(position1, 0) < number_of_paths2[length2]:
+                                            hot_path1 = tuple(hot_paths1[position1])
+                                            if hot_path1 not in all_HOMOPATHS[region_id][region_id]:
+                                                all_HOMOPATHS[region_id][region_id][hot_path1] = {}
+                                                all_HOMOPATHS[region_id][region_id][hot_path1] = list(hot_path1)
+                                        else:
+                                            still_waiting.append(position1)
+                                    waiting_for_unconnected = still_waiting
 
         end_time1 = time.time()  # End of the homopath spanning detection portion
 
+        # Boundary-only publication: the interior homopaths of a region never meet a path of another
+        # region, so the join of the whole dictionaries stores each of them in the dictionary of its
+        # region (as a path1 without partner) as soon as another region has paths. The keys already
+        # stored there (the rest of a path entering the region, a path recorded twice) are skipped.
+        number_of_interior_homopaths = 0
+        for region_id, c_hot_paths in output_hot_paths.items():
+            if not any(hot_paths for region_id2, c_hot_paths2 in output_hot_paths.items() if region_id2 != region_id
+                       for length2, hot_paths in c_hot_paths2.items() if length2 > 0):
+                continue
+            stored_paths = all_HOMOPATHS.setdefault(region_id, {}).setdefault(region_id, {})
+            for length, hot_paths in c_hot_paths.items():
+                if length > 0:
+                    published_paths = {tuple(hot_path) for hot_path in all_hot_paths[region_id].get(length, [])}
+                    for hot_path in hot_paths:
+                        hot_path1 = tuple(hot_path)
+                        if hot_path1 not in published_paths and hot_path1 not in stored_paths:
+                            stored_paths[hot_path1] = list(hot_path1)
+                            number_of_interior_homopaths += 1
+
         # total_sum is the sum of all discovered paths in all_HOMOPATHS
         total_sum = 0
         for regions in all_HOMOPATHS.values():
@@ -490,10 +969,28 @@ def start_Top_leader(regionids, all_connections, threshold,
             all_HOMOPATHS, end_time1, start_time1, threshold, current_compress)
 
         # Additional logging
+        cache_counters = (f"Object-set cache : hits {object_set_cache_stats['hits']} , "
+                          f"misses {object_set_cache_stats['misses']} , "
+                          f"coalesced {object_set_cache_stats['coalesced']}")
+        if bloom_prescreen:
+            # False-positive rate: pairs kept by the filters that the exact join rejects at the
+            # first edge, over all the pairs that do not clear the first edge
+            bloom_negatives = bloom_stats["false_positives"] + bloom_stats["pruned"]
+            false_positive_rate = bloom_stats["false_positives"] / bloom_negatives if bloom_negatives else 0.0
+            cache_counters += (f"\nBloom semi-join : pairs {bloom_stats['pairs']} , pruned {bloom_stats['pruned']} , "
+                               f"false positives {bloom_stats['false_positives']} "
+                               f"(rate {round(false_positive_rate, 4)}) , "
+                               f"filter bytes {bloom_stats['sketch_bytes']} , "
+                               f"object-set bytes avoided {bloom_stats['avoided_bytes']} , "
+                               f"bytes saved {bloom_stats['avoided_bytes'] - bloom_stats['sketch_bytes']}")
+        if homopath_publication == "boundary":
+            cache_counters += (f"\nBoundary-only publication : interior homopaths {number_of_interior_homopaths} , "
+                               f"output bytes {output_bytes}")
+        print(f"\tTop Leader {cache_counters}")
         with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
             fileofexperiments.write(
                 f"TOP LEADER\nSpan-HoMoPaths {number_of_HoMoPaths} , "
-                f"Exec Time : {end_time1 - start_time1}\n{all_HOMOPATHS}\n\n\n"
+                f"Exec Time : {end_time1 - start_time1}\n{cache_counters}\n{all_HOMOPATHS}\n\n\n"
             )
 
         # (Optional) The code after the triple quotes is commented out but presumably
@@ -587,7 +1084,7 @@ def start_Top_leader(regionids, all_connections, threshold,
     # Format them in bracketed style for one of the experiment logs
     list_strings = ['[' + ','.join(map(str, sublist)) + ']' for sublist in list_of_span_homopaths]
     combinded_list_with_brackets = [
-        str(len(totalUniqObjs)), str(threshold), str(total_edges),
+        str(number_of_unique_objects), str(threshold), str(total_edges),
         str(num_of_permutations), str(current_compress), str(0)] + list_strings
     line_to_write_with_brackets = ",".join(combinded_list_with_brackets)
     
@@ -599,7 +1096,7 @@ def start_Top_leader(regionids, all_connections, threshold,
     # plus the first level total integers from region leaders.
     list_strings = ['[' + ','.join(map(str, sublist)) + ']' for sublist in list_of_span_homopaths]
     combinded_list_with_brackets = [
-        str(len(totalUniqObjs)), str(C2Base_Total_Bytes), str(first_level_total_integers),
+        str(number_of_unique_objects), str(C2Base_Total_Bytes), str(first_level_total_integers),
         str(threshold), str(total_edges), str(num_of_permutations), str(current_compress),
         str(0) ] + list_strings
     line_to_write_with_brackets = ",".join(combinded_list_with_brackets)
@@ -618,13 +1115,13 @@ def start_Top_leader(regionids, all_connections, threshold,
     # (for further experiment metrics).
     with open("Current_Experiment_Top_Leader_Reg_Leader_edges_costs.txt", "a") as all_values_file:
         line_values_all_together = [
-            str(len(totalUniqObjs)), str(C2Base_Total_Bytes), str(first_level_total_integers),
+            str(number_of_unique_objects), str(C2Base_Total_Bytes), str(first_level_total_integers),
             str(threshold), str(total_edges), str(num_of_permutations), str(current_compress),
             str(0)]
         dict_values_temp = []
 
-        # Flatten out the nested lists in `all_hot_paths` to find all edges
-        for key, value in all_hot_paths.items():
+        # Flatten out the nested lists in `homopaths_for_output` to find all edges
+        for key, value in homopaths_for_output.items():
             for sub_values in value.values():
                 for item in sub_values:
                     if all(isinstance(i, int) for i in item):
@@ -648,6 +1145,7 @@ def start_Top_leader(regionids, all_connections, threshold,
     # After collecting all final data, signal each region that we are done
     for region_id in regions_ready_counter:
         send_request_to_regional_leader("[-1]", region_id, "[-1]")
+    close_regional_connections()
     # Potentially also signal regions without homopaths if needed
     # for region_id in regions_without_Homopa_counter:
     #     send_request_to_regional_leader("[-1]" , region_id , "[-1]")
@@ -658,12 +1156,127 @@ def start_Top_leader(regionids, all_connections, threshold,
     result_queue.put(result)  # Put the result in the queue for whoever is listening
 
 
+# 4.1.1
+def collect_region_data(region_id, has_homopaths, raw_or_hashed, object_count_mode, homopath_publication):
+    """
+    Collecting thread of the Top Leader for one region (stage 1 of start_Top_leader).
+    The settings are passed by the Top Leader, so the thread does not read the module globals.
+
+    :param has_homopaths: True if the region is in regions_ready_counter
+    :param raw_or_hashed, object_count_mode, homopath_publication: those of the Top Leader
+    :return:
+        (homopath dictionary or None, set of unique objects (or (k, KMV sketch), or the minima of
+         the signatures, see object_count_mode), total_information_integers or None,
+         {length: number of interior homopaths} or None, whole homopath dictionary or None).
+        A region without homopaths only sends its objects and is then told to shut down.
+    """
+    # The whole set of unique objects (mode=4) or, with raw data, its KMV sketch (mode=11) and,
+    # with hashed data, the minima of its signatures (mode=12)
+    objects_request = 4
+    if object_count_mode == "sketch":
+        objects_request = 11 if raw_or_hashed == 0 else 12
+
+    if has_homopaths:
+        # Region that has homopaths: request actual homopath data (mode=3),
+        # the number of objects (mode=4) and the total number of transmitted integers (mode=5)
+        received_data_chunk_dict = send_request_to_regional_leader(3, region_id, 3)
+        received_data_chunk_Objs = send_request_to_regional_leader(objects_request, region_id, objects_request)
+        received_data_transmitted_integers = send_request_to_regional_leader(5, region_id, 5)
+
+        # With the boundary-only publication, the number of the homopaths not sent (mode=10),
+        # and the whole dictionary for the output files (mode=13)
+        received_interior_counts = None
+        received_output_dict = None
+        if homopath_publication == "boundary":
+            received_interior_counts = send_request_to_regional_leader(10, region_id, 10)
+            received_output_dict = send_request_to_regional_leader(13, region_id, 13)
+        return (received_data_chunk_dict, received_data_chunk_Objs, received_data_transmitted_integers,
+                received_interior_counts, received_output_dict)
+
+    # Region that has NO homopaths: only request the number-of-objects info (mode=4),
+    # then send a final "no further action" request to finalize the communication with that region.
+    received_data_chunk_Objs = send_request_to_regional_leader(objects_request, region_id, objects_request)
+    send_request_to_regional_leader("[-1]", region_id, "[-1]")
+    return None, received_data_chunk_Objs, None, None, None
+
+
+# 4.1.2
+def build_boundary_index(all_hot_paths):
+    """
+    Indexes the hot paths of every region and length by their first and last edge.
+
+    :param all_hot_paths: {region: {length: [[edges], ...]}} as collected by the Top Leader
+    :return: {region: {length: {"first": {edge: [positions]}, "last": {edge: [positions]}}}}
+             (positions in the list of paths, increasing)
+    """
+    boundary_index = {}
+    for region_id, c_hot_paths in all_hot_paths.items():
+        boundary_index[region_id] = {}
+        for length, hot_paths in c_hot_paths.items():
+            first_edges = {}
+            last_edges = {}
+            for position, hot_path in enumerate(hot_paths):
+                if hot_path:
+                    first_edges.setdefault(hot_path[0], []).append(position)
+                    last_edges.setdefault(hot_path[-1], []).append(position)
+            boundary_index[region_id][length] = {"first": first_edges, "last": last_edges}
+    return boundary_index
+
+
+def find_boundary_pairs(last_edges1, boundary, first_edges2):
+    """
+    The pairs (path1, path2) where the last edge of path1 is connected to the first edge of path2.
+
+    :param last_edges1: {last edge: [positions]} of the paths of region_id
+    :param boundary: {last edge: [first edges]}, the connections region_id -> region_id2
+    :param first_edges2: {first edge: [positions]} of the paths of region_id2
+    :return: [(position1, [positions2 increasing]), ...] by increasing position1
+    """
+    boundary_pairs = []
+    # Visit the smaller of the two dictionaries
+    if len(boundary) < len(last_edges1):
+        meeting_edges = [edge for edge in boundary if edge in last_edges1]
+    else:
+        meeting_edges = [edge for edge in last_edges1 if edge in boundary]
+
+    for edge in meeting_edges:
+        positions2 = sorted(position2
+                            for first_edge in set(boundary[edge])
+                            for position2 in first_edges2.get(first_edge, ()))
+        if positions2:
+            for position1 in last_edges1[edge]:
+                boundary_pairs.append((position1, positions2))
+
+    boundary_pairs.sort(key=lambda pair: pair[0])
+    return boundary_pairs
+
+
+# 4.1.3
+def find_regional_boundary_edges(all_connections):
+    """
+    Boundary edges of every region, from the connections of create_RegionConnections_for_Top_Leader
+    ({region: {other region: {last edge: [first edges]}}}). They are given to the Regional Leaders
+    at startup for the boundary-only publication (see homopath_publication).
+
+    :return: {region: (edges leaving the region, edges entering the region)}
+    """
+    regional_boundary_edges = {}
+    for region_id, connections in all_connections.items():
+        for region_id2, boundary in connections.items():
+            for last_edge, first_edges in boundary.items():
+                if not first_edges:
+                    continue
+                regional_boundary_edges.setdefault(region_id, (set(), set()))[0].add(last_edge)
+                regional_boundary_edges.setdefault(region_id2, (set(), set()))[1].update(first_edges)
+    return regional_boundary_edges
+
+
 # 4.2
 def send_request_to_regional_leader(requestPathORedge, region, path_edge_ID):
     """
-    This function establishes a socket connection to a given regional leader (identified by 'region'),
-    sends a request about a path or edge, or requests specific data (homopath list, number of objects, etc.),
-    and then receives and returns the appropriate response.
+    This function sends a request to a given regional leader (identified by 'region') over one of
+    the pooled connections of the Top Leader, about a path or edge, or requests specific data
+    (homopath list, number of objects, etc.), and then returns the appropriate response.
 
     :param requestPathORedge:
         - Could be an integer in {1,2,3,4,5} or the string "[-1]".
@@ -671,173 +1284,877 @@ def send_request_to_regional_leader(requestPathORedge, region, path_edge_ID):
         - 3       => requesting the entire homopaths dictionary (Homopath_list)
         - 4       => requesting the set of unique objects (Homopath_NumberOfObjs)
         - 5       => requesting the total_information_integers for that region
+        - 6       => bulk request of the objects of several paths and edges (see path_edge_ID)
+        - 7       => compute pushdown: the region joins paths1 with its paths2 (see path_edge_ID)
+        - 8       => Bloom filters of the objects of edges (see path_edge_ID)
+        - 9       => Bloom-filter screening of paths (see path_edge_ID)
+        - 10      => number of interior homopaths per length (boundary-only publication)
+        - 11      => KMV sketch of the unique objects (object_count_mode "sketch")
+        - 12      => column-wise minima of the minhash signatures (hashed data, object_count_mode "sketch")
+        - 13      => the entire homopaths dictionary, for the output files (boundary-only publication)
         - "[-1]"  => signals to the region that we want to end communication
     :param region:
         The region ID used to compute the port for that regional leader.
     :param path_edge_ID:
         If (requestPathORedge == 1 or 2), this typically contains the list or single edge ID(s).
+        For request 6, a list of (1 or 2, path or [edge]) requests.
+        For request 7, (threshold, numberOfObjects, [(objects of path1, [paths2]), ...]).
+        For request 8, (edges to filter, edges whose transmission cost is asked).
+        For request 9, (filters, [(path, [indexes of the filters]), ...]).
         Otherwise, it might be irrelevant or unused for requests 3,4,5.
 
     :return:
         - Varies depending on the request:
             For requests 1 or 2 (PATH/EDGE), returns a list of object IDs (or None if not found).
             For requests 3,4,5, returns the data relevant to that request (dictionary, string, or integer).
+            For request 6, returns a list with the object IDs of every requested path/edge (None if not found).
+            For request 7, returns per path1 the list of (accepted edges, stored objects or None) of its paths2.
+            For request 8, returns (filters or None, transmission costs of the object sets, -1 if not found).
+            For request 9, returns per path ((transmission cost of its objects, or -1), [counts per filter]).
+            For request 10, returns {length: number of interior homopaths}.
+            For request 11, returns (k, the sorted hashes of the sketch as an int64 array).
+            For request 12, returns the minima as a NumPy array.
+            For requests 4, 11 and 12, returns None if the answer is not of the kind asked for.
+            For request 13, returns the dictionary as for request 3.
             For "[-1]" or on error, returns None.
     """
 
-    # Construct the port the regional leader is listening on:
-    port = region + 5000 + 11
-    host = 'localhost'
-
     # Check that we're not sending a shutdown request ("[-1]"). 
     # If requestPathORedge is 1/2/3/4/5, it means we have valid data to request.
     if (requestPathORedge != "[-1]" 
         and (requestPathORedge == 1 or requestPathORedge == 2 
              or requestPathORedge == 3 or requestPathORedge == 4 
-             or requestPathORedge == 5)):
+             or requestPathORedge == 5 or requestPathORedge == 6
+             or requestPathORedge == 7 or requestPathORedge == 8
+             or requestPathORedge == 9 or requestPathORedge == 10
+             or requestPathORedge == 11 or requestPathORedge == 12
+             or requestPathORedge == 13)):
 
         try:
-            # Create a TCP socket and connect to the regional leader's server
-            regional_leader_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            regional_leader_socket.connect((host, port))
-
-            # Prepare data to send if we are requesting a path or edge (requests 1 or 2)
-            data_to_send = {
-                'path_edge_ID': path_edge_ID,
-                'requestPathORedge': requestPathORedge
-            }
-            chunk_size = 1024
-
             # -------------------------------------------------------------------
             # CASE 1 or 2 => We request a specific path (1) or edge (2)
             # -------------------------------------------------------------------
             if requestPathORedge == 1 or requestPathORedge == 2:
+                # The edges of the path (or the single edge) go as a packed integer array
                 if requestPathORedge == 1:
-                    string = "PRIMARY"
-                    edge_path = "path"
+                    request_kind = _MSG_PATH
                 else:
-                    string = "SECONDARY"
-                    edge_path = "edge"
-
-                # Example print statement for debugging:
-                # print(f"Sending {string} request to region {int(region)} on port {port} for {edge_path}: {path_edge_ID}")
-
-                # Serialize our dictionary into a JSON-formatted string
-                json_string = json.dumps(data_to_send)
-
-                # Send the JSON data in chunks
-                for i in range(0, len(json_string), chunk_size):
-                    chunk = json_string[i:i + chunk_size]
-                    regional_leader_socket.send(chunk.encode('utf-8'))
-
-                # Signal the end of our transmission with an empty byte string
-                regional_leader_socket.send(b"")
-
-                # Now we receive the JSON response from the regional leader in chunks
-                received_data = b""
-                while True:
-                    chunk = regional_leader_socket.recv(1024)
-                    if not chunk:
-                        # If no more data is coming from the server, break
-                        break
-                    received_data += chunk
+                    request_kind = _MSG_EDGE
+                response_kind, payload = _send_regional_message(
+                    region, request_kind, encode_int_array(path_edge_ID))
 
-                # Convert the received bytes into a Python object via JSON
-                response_data = json.loads(received_data.decode('utf-8'))
-                return response_data
+                # The answer is the packed array of object IDs, or "not found"
+                if response_kind != request_kind:
+                    return None
+                return decode_int_array(payload)
 
             # -------------------------------------------------------------------
             # CASE 3 => Requesting the entire homopaths dictionary (Homopath_list)
             # -------------------------------------------------------------------
-            elif requestPathORedge == 3:
-                string = "Homopath_list"
-                # print(f"Sending {string} request to region {int(region)} on port {port}")
-                regional_leader_socket.send(json.dumps(string).encode('utf-8'))
-
-                received_data = ""
-                while True:
-                    chunk = regional_leader_socket.recv(1024).decode('utf-8')
-                    if chunk == "-1":
-                        # The region indicates no homopaths exist
-                        received_data_chunk_dict = -1
-                        break
-                    else:
-                        if not chunk:
-                            # If nothing more is received, break
-                            break
-                        received_data += chunk
-
-                        # If the data we have so far begins with '{' and ends with '}',
-                        # we assume we've got a complete JSON object.
-                        if received_data.endswith('}') and received_data.startswith('{'):
-                            received_data_chunk_dict = json.loads(received_data)
-                            break
+            elif requestPathORedge == 3 or requestPathORedge == 13:
+                # CASE 13 => the same dictionary, whole (boundary-only publication)
+                request_kind = _MSG_HOMOPATH_LIST if requestPathORedge == 3 else _MSG_OUTPUT_HOMOPATH_LIST
+                response_kind, payload = _send_regional_message(region, request_kind)
+                if response_kind == _MSG_NO_HOMOPATHS:
+                    # The region indicates no homopaths exist
+                    received_data_chunk_dict = -1
+                else:
+                    received_data_chunk_dict = decode_homopath_list(payload)
                 return received_data_chunk_dict
 
             # -------------------------------------------------------------------
             # CASE 4 => Requesting the set of unique objects (Homopath_NumberOfObjs)
             # -------------------------------------------------------------------
             elif requestPathORedge == 4:
-                string = "Homopath_NumberOfObjs"
-                # print(f"Sending {string} request to region {int(region)} on port {port}")
-                regional_leader_socket.send(json.dumps(string).encode('utf-8'))
-
-                received_data = ""
-                while True:
-                    chunk = regional_leader_socket.recv(1024).decode('utf-8')
-                    if not chunk:
-                        break
-                    received_data += chunk
-
-                # We return the raw string (which might look like "[obj1, obj2, ...]")
-                return received_data
+                # We return the set of unique objects of the region
+                response_kind, payload = _send_regional_message(region, _MSG_OBJECTS)
+                if response_kind != _MSG_OBJECTS:
+                    return None
+                return set(decode_int_array(payload))
 
             # -------------------------------------------------------------------
             # CASE 5 => Requesting the total_information_integers
             # -------------------------------------------------------------------
             elif requestPathORedge == 5:
-                string = "total_information_integers"
-                # print(f"Sending {string} request to region {int(region)} on port {port}")
-                regional_leader_socket.send(json.dumps(string).encode('utf-8'))
-
-                received_data = ""
-                while True:
-                    chunk = regional_leader_socket.recv(1024).decode('utf-8')
-                    if not chunk:
-                        break
-                    received_data += chunk
+                response_kind, payload = _send_regional_message(region, _MSG_INTEGERS)
+                if response_kind == _MSG_NO_HOMOPATHS:
+                    return -1
 
-                # Convert the received string into an integer before returning
-                received_integer = int(received_data)
+                # A single integer, sent as an array of length 1
+                received_integer = decode_int_array(payload)[0]
                 return received_integer
 
+            # -------------------------------------------------------------------
+            # CASE 6 => Bulk request of the objects of many paths and edges
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 6:
+                response_kind, payload = _send_regional_message(
+                    region, _MSG_BULK, encode_bulk_request(path_edge_ID))
+                if response_kind != _MSG_BULK:
+                    return None
+                return [None if obj_payload is None else decode_int_array(obj_payload)
+                        for obj_payload in decode_bulk_response(payload)]
+
+            # -------------------------------------------------------------------
+            # CASE 7 => Compute pushdown of the join of paths1 with the region's paths2
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 7:
+                threshold, numberOfObjects, joins = path_edge_ID
+                response_kind, payload = _send_regional_message(
+                    region, _MSG_PUSHDOWN, encode_pushdown_request(threshold, numberOfObjects, joins))
+                if response_kind != _MSG_PUSHDOWN:
+                    return None
+                return decode_pushdown_response(payload, [len(paths2) for _, paths2 in joins])
+
+            # -------------------------------------------------------------------
+            # CASE 8 => Bloom filters of the objects of edges (and costs of the edges)
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 8:
+                filter_edges, cost_edges = path_edge_ID
+                response_kind, payload = _send_regional_message(
+                    region, _MSG_BLOOM_FILTERS,
+                    encode_int_array([len(filter_edges)] + list(filter_edges) + list(cost_edges)))
+                if response_kind != _MSG_BLOOM_FILTERS:
+                    return None
+                entries = decode_bulk_response(payload)
+                return entries[:-1], decode_int_array(entries[-1])
+
+            # -------------------------------------------------------------------
+            # CASE 9 => Counts of the objects of paths that pass Bloom filters
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 9:
+                filters, screens = path_edge_ID
+                flat = [len(screens)]
+                for path, filter_indexes in screens:
+                    flat.append(len(path))
+                    flat.extend(path)
+                    flat.append(len(filter_indexes))
+                    flat.extend(filter_indexes)
+                response_kind, payload = _send_regional_message(
+                    region, _MSG_BLOOM_SCREEN, encode_bulk_response(list(filters) + [encode_int_array(flat)]))
+                if response_kind != _MSG_BLOOM_SCREEN:
+                    return None
+                flat = decode_int_array(payload)
+                answers = []
+                position = 0
+                for _, filter_indexes in screens:
+                    answers.append((flat[position], flat[position + 1:position + 1 + len(filter_indexes)]))
+                    position += 1 + len(filter_indexes)
+                return answers
+
+            # -------------------------------------------------------------------
+            # CASE 10 => Number of interior homopaths per length
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 10:
+                response_kind, payload = _send_regional_message(region, _MSG_INTERIOR_COUNTS)
+                if response_kind != _MSG_INTERIOR_COUNTS:
+                    return {}
+                flat = decode_int_array(payload)
+                return {flat[position]: flat[position + 1] for position in range(1, 1 + 2 * flat[0], 2)}
+
+            # -------------------------------------------------------------------
+            # CASE 11 => KMV sketch of the unique objects
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 11:
+                response_kind, payload = _send_regional_message(region, _MSG_OBJECT_SKETCH)
+                if response_kind != _MSG_OBJECT_SKETCH:
+                    return None
+                flat = np.frombuffer(payload, dtype=_INT_ARRAY_DTYPES[bytes(payload[:1])], offset=1)
+                return int(flat[0]), flat[1:].astype(np.int64)
+
+            # -------------------------------------------------------------------
+            # CASE 12 => Column-wise minima of the minhash signatures
+            # -------------------------------------------------------------------
+            elif requestPathORedge == 12:
+                response_kind, payload = _send_regional_message(region, _MSG_COHEN_MINIMA)
+                if response_kind != _MSG_COHEN_MINIMA:
+                    return None
+                return np.frombuffer(payload, dtype=_INT_ARRAY_DTYPES[bytes(payload[:1])], offset=1)
+
         except Exception as e:
             # If any error occurs, we catch it and return None
             # print(f"Error: {e}")
             return None
 
-        finally:
-            # Always close the socket in a finally block
-            regional_leader_socket.close()
-
     else:
         # -----------------------------------------------------------------------
         # If requestPathORedge == "[-1]" => Top Leader is signaling 'FINISH'
         # -----------------------------------------------------------------------
-        # print(f"Top Leader signal-FINISH to {port}")
-        regional_leader_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        regional_leader_socket.connect((host, port))
-        # Send the "[-1]" shutdown command
-        regional_leader_socket.send(json.dumps("[-1]").encode('utf-8'))
-        regional_leader_socket.close()
+        # The region does not answer, it closes its server (and our connections to it)
+        _send_regional_message(region, _MSG_SHUTDOWN, wait_for_response=False)
+        return None
+
+
+# 4.2.1
+# Pooled, persistent connections of the Top Leader.
+# A connection is a dict {"socket", "send_lock", "pending", "pending_lock", "next_id", "alive"};
+# a reader thread per connection receives the response frames and wakes up the request waiting
+# for that id in "pending" (id -> [threading.Event(), (kind, payload)]). "pending" and "alive" are
+# changed under "pending_lock" only, so a request is never registered after the reader has woken
+# up the waiters of a lost connection.
+def _send_regional_message(region, request_kind, payload=b"", wait_for_response=True):
+    """
+    Sends one request frame to a regional leader over a pooled connection and waits for its answer.
+
+    :param request_kind: one of the _MSG_... request kinds
+    :param payload: the packed payload of the request (edges of a path/edge request)
+    :return: (response kind, response payload); (None, b"") if the connection was lost
+             or if not waited for
+    """
+    connection = _get_regional_connection(region)
+    request_id = next(connection["next_id"]) & 0xFFFFFFFF
+    slot = [threading.Event(), (None, b"")]
+    if wait_for_response:
+        with connection["pending_lock"]:
+            if not connection["alive"]:
+                # The reader thread has already given up this connection
+                return slot[1]
+            connection["pending"][request_id] = slot
+
+    frame = _pack_frame(request_kind, request_id, payload)
+    try:
+        with connection["send_lock"]:
+            connection["socket"].sendall(frame)
+    except OSError:
+        with connection["pending_lock"]:
+            connection["pending"].pop(request_id, None)
+        raise
+
+    if not wait_for_response:
+        return slot[1]
+    if not slot[0].wait(regional_response_timeout):
+        with connection["pending_lock"]:
+            connection["pending"].pop(request_id, None)
+    return slot[1]
+
+
+def _get_regional_connection(region):
+    """
+    Returns an open connection to the region: an idle one if possible, otherwise a new one
+    (up to connections_per_region), otherwise the one with the fewest requests in flight.
+    """
+    with regional_connection_pool_lock:
+        connections = [connection for connection in regional_connection_pool.get(region, [])
+                       if connection["alive"]]
+        regional_connection_pool[region] = connections
+
+        idle = [connection for connection in connections if not connection["pending"]]
+        if idle:
+            return idle[0]
+        if len(connections) < max(connections_per_region, 1):
+            connection = _open_regional_connection(region)
+            connections.append(connection)
+            return connection
+        return min(connections, key=lambda connection: len(connection["pending"]))
+
+
+def _open_regional_connection(region):
+    """Connects to the regional leader's server and starts the reader thread of the connection."""
+    # Construct the port the regional leader is listening on:
+    port = region + 5000 + 11
+    host = 'localhost'
+
+    regional_leader_socket = socket.create_connection((host, port))
+    regional_leader_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    connection = {
+        "socket": regional_leader_socket,
+        "send_lock": threading.Lock(),
+        "pending": {},
+        "pending_lock": threading.Lock(),
+        "next_id": itertools.count(),
+        "alive": True,
+    }
+    threading.Thread(target=_read_regional_responses, args=(connection,), daemon=True).start()
+    return connection
+
+
+def _read_regional_responses(connection):
+    """Reader thread of a connection: hands every answer to the request waiting for its id."""
+    try:
+        with connection["socket"].makefile('rb') as responses:
+            while True:
+                frame = _read_frame(responses)
+                if frame is None:
+                    break
+                response_kind, request_id, payload = frame
+                with connection["pending_lock"]:
+                    slot = connection["pending"].pop(request_id, None)
+                if slot is not None:
+                    slot[1] = (response_kind, payload)
+                    slot[0].set()
+    except (OSError, ValueError):
+        pass
+
+    # The region closed the connection (shutdown) or it broke: wake up whoever still waits
+    with connection["pending_lock"]:
+        connection["alive"] = False
+        waiting = list(connection["pending"].values())
+        connection["pending"].clear()
+    for slot in waiting:
+        slot[0].set()
+
+
+def close_regional_connections():
+    """Closes every pooled connection of the Top Leader (end of the run)."""
+    with regional_connection_pool_lock:
+        for connections in regional_connection_pool.values():
+            for connection in connections:
+                with connection["pending_lock"]:
+                    connection["alive"] = False
+                try:
+                    connection["socket"].close()
+                except OSError:
+                    pass
+        regional_connection_pool.clear()
+
+
+# 4.2.3
+def fetch_object_set(requestPathORedge, region, path_edge_ID, prefetched=None):
+    """
+    Objects of a path (requestPathORedge == 1) or an edge (2) of a region, through the bounded
+    LRU object-set cache of the Top Leader. A request already in flight for the same key is not
+    sent again: the caller waits for its answer.
+
+    :param prefetched:
+        Optional {(requestPathORedge, tuple(path_edge_ID)): object IDs} already received
+        (by fetch_object_sets); these are returned as they are.
+
+    :return:
+        (object IDs or None, True if the region sent them for this call, False if they came
+         from the cache or from an identical request in flight)
+    """
+    if prefetched is not None and (requestPathORedge, tuple(path_edge_ID)) in prefetched:
+        return prefetched[(requestPathORedge, tuple(path_edge_ID))], False
+
+    if object_set_cache_entries <= 0:
+        return send_request_to_regional_leader(requestPathORedge, region, path_edge_ID), True
+
+    key = (requestPathORedge, region, tuple(path_edge_ID))
+    sender = False
+    with object_set_cache_lock:
+        if key in object_set_cache:
+            object_set_cache.move_to_end(key)
+            object_set_cache_stats["hits"] += 1
+            return object_set_cache[key], False
+
+        slot = object_set_cache_in_flight.get(key)
+        if slot is not None:
+            object_set_cache_stats["coalesced"] += 1
+        else:
+            # We send the request; others asking for the same key wait for our answer
+            slot = [threading.Event(), None]
+            object_set_cache_in_flight[key] = slot
+            object_set_cache_stats["misses"] += 1
+            sender = True
+
+    if not sender:
+        slot[0].wait()
+        return slot[1], False
+
+    obj_ids = None
+    try:
+        obj_ids = send_request_to_regional_leader(requestPathORedge, region, path_edge_ID)
+        with object_set_cache_lock:
+            object_set_cache[key] = obj_ids
+            # Evict the least recently used object sets
+            while len(object_set_cache) > object_set_cache_entries:
+                object_set_cache.popitem(last=False)
+    finally:
+        # Waiters are released even if the request failed (they get None)
+        with object_set_cache_lock:
+            object_set_cache_in_flight.pop(key, None)
+        slot[1] = obj_ids
+        slot[0].set()
+    return obj_ids, True
+
+
+def fetch_object_sets(region, object_requests):
+    """
+    Objects of several paths and edges of one region in a single bulk request (request 6).
+    The sets already in the object-set cache, or in flight, are not asked for again; the others
+    are sent in one frame and stored in the cache.
+
+    :param object_requests:
+        list of (1 or 2, path or [edge]); duplicates are asked for once.
+    :return:
+        {(1 or 2, tuple(path or [edge])): (object IDs or None, True if sent by this call)}
+    """
+    use_cache = object_set_cache_entries > 0
+    results = {}
+    to_send = {}   # key -> slot of the requests we send
+    to_wait = {}   # key -> slot of the requests already in flight
+
+    with object_set_cache_lock:
+        for requestPathORedge, path_edge_ID in object_requests:
+            result_key = (requestPathORedge, tuple(path_edge_ID))
+            if result_key in results or result_key in to_send or result_key in to_wait:
+                continue
+            key = (requestPathORedge, region, result_key[1])
+            if use_cache and key in object_set_cache:
+                object_set_cache.move_to_end(key)
+                object_set_cache_stats["hits"] += 1
+                results[result_key] = (object_set_cache[key], False)
+            elif use_cache and key in object_set_cache_in_flight:
+                object_set_cache_stats["coalesced"] += 1
+                to_wait[result_key] = object_set_cache_in_flight[key]
+            else:
+                slot = [threading.Event(), None]
+                if use_cache:
+                    object_set_cache_in_flight[key] = slot
+                    object_set_cache_stats["misses"] += 1
+                to_send[result_key] = slot
+
+    if to_send:
+        answers = None
+        try:
+            answers = send_request_to_regional_leader(6, region, [[request_kind, list(ids)]
+                                                                  for request_kind, ids in to_send])
+        finally:
+            if answers is None:
+                answers = [None] * len(to_send)
+            with object_set_cache_lock:
+                for (result_key, slot), obj_ids in zip(to_send.items(), answers):
+                    key = (result_key[0], region, result_key[1])
+                    if use_cache:
+                        object_set_cache[key] = obj_ids
+                        object_set_cache_in_flight.pop(key, None)
+                    slot[1] = obj_ids
+                    slot[0].set()
+                    results[result_key] = (obj_ids, True)
+                # Evict the least recently used object sets
+                while len(object_set_cache) > max(object_set_cache_entries, 0):
+                    object_set_cache.popitem(last=False)
+
+    for result_key, slot in to_wait.items():
+        slot[0].wait()
+        results[result_key] = (slot[1], False)
+    return results
+
+
+# 4.2.4
+def push_down_join(region_id2, threshold, numberOfObjects, c_hot_paths1, c_hot_paths2,
+                   boundary_pairs_of_lengths, pair_object_sets):
+    """
+    Compute pushdown of the joins of one pair of regions: the objects of every path1 (already in
+    pair_object_sets) are sent once to region_id2 with the paths2 they meet, and region_id2 runs the
+    join of the Top Leader for every pair (join_candidate_paths).
+
+    :param boundary_pairs_of_lengths: {(length of path1, length of path2): [(position1, [positions2])]}
+    :return:
+        ({(path1, path2): (number of accepted edges of path2, objects of the stored homopath or None)},
+         [object sets sent or received, for the transmission costs])
+        The dictionary is empty if the region could not answer (the Top Leader then joins itself).
+    """
+    # path1 -> its paths2 (each once), in the order of the pairs
+    paths2_of_path1 = {}
+    for (length, length2), boundary_pairs in boundary_pairs_of_lengths.items():
+        for position1, positions2 in boundary_pairs:
+            hot_path1 = tuple(c_hot_paths1[length][position1])
+            if pair_object_sets.get((1, hot_path1)) is None:
+                continue
+            paths2 = paths2_of_path1.setdefault(hot_path1, {})
+            for position2 in positions2:
+                paths2[tuple(c_hot_paths2[length2][position2])] = None
+
+    if not paths2_of_path1:
+        return {}, []
+
+    joins = [(pair_object_sets[(1, hot_path1)], list(paths2)) for hot_path1, paths2 in paths2_of_path1.items()]
+    answers = send_request_to_regional_leader(7, region_id2, (threshold, numberOfObjects, joins))
+    if answers is None:
+        return {}, []
+
+    pushdown_results = {}
+    transferred_object_sets = [objIDs_ofPath1 for objIDs_ofPath1, _ in joins]
+    for (hot_path1, paths2), answers_of_path1 in zip(paths2_of_path1.items(), answers):
+        for hot_path2, (accepted_edges, recorded_objs) in zip(paths2, answers_of_path1):
+            pushdown_results[(hot_path1, hot_path2)] = (accepted_edges, recorded_objs)
+            if recorded_objs is not None:
+                transferred_object_sets.append(recorded_objs)
+    return pushdown_results, transferred_object_sets
+
+
+# 4.2.5
+def bloom_prescreen_pairs(region_id, region_id2, threshold, numberOfObjects, c_hot_paths1, c_hot_paths2,
+                          boundary_pairs_of_lengths, use_pushdown):
+    """
+    Bloom-filter semi-join of the pairs (path1, path2) of one pair of regions:
+      1. region_id2 sends the Bloom filter of the objects of the first edge of every candidate path2,
+      2. region_id counts, for every path1, its objects that pass the filters of its candidates.
+    A count is never lower than the intersection of the join at the first edge of path2 (a Bloom
+    filter has no false negatives), so a pair whose count / numberOfObjects is below the threshold
+    can not add anything and is not joined.
+
+    :param boundary_pairs_of_lengths: {(length of path1, length of path2): [(position1, [positions2])]}
+    :return:
+        ({(length, length2): [(position1, [positions2 kept])]}, counters for bloom_stats), or None if
+        a region could not answer (then every pair is joined).
+        The counters are the screened and pruned pairs, the bytes of the filters and of the counts
+        ("sketch_bytes") and the transmission costs of the object sets that are not fetched any more
+        because of the pruned pairs ("avoided_bytes", without the sets already in the cache; of the
+        edges, only the first edges of the paths2 are counted, the join fetches the next ones only
+        while the threshold holds).
+    """
+    # The first edges of the paths2 (one filter each); without pushdown, the join fetches their objects
+    first_edges = {}
+    for (length, length2), boundary_pairs in boundary_pairs_of_lengths.items():
+        for position1, positions2 in boundary_pairs:
+            for position2 in positions2:
+                first_edges.setdefault(c_hot_paths2[length2][position2][0], len(first_edges))
+    fetched_edges = [] if use_pushdown else list(first_edges)
+
+    answer = send_request_to_regional_leader(8, region_id2, (list(first_edges), fetched_edges))
+    if answer is None:
+        return None
+    filters, edge_costs = answer
+    edge_costs = dict(zip(fetched_edges, edge_costs))
+    # A first edge without objects gets an empty filter (nothing passes it)
+    filters = [bloom_filter if bloom_filter is not None else build_bloom_filter([]) for bloom_filter in filters]
+
+    # The filter of the first edge of every candidate of every path1
+    screens = {}
+    for (length, length2), boundary_pairs in boundary_pairs_of_lengths.items():
+        for position1, positions2 in boundary_pairs:
+            filter_indexes = screens.setdefault(tuple(c_hot_paths1[length][position1]), {})
+            for position2 in positions2:
+                filter_indexes.setdefault(first_edges[c_hot_paths2[length2][position2][0]], None)
+    screens = [(list(path1), list(filter_indexes)) for path1, filter_indexes in screens.items()]
+
+    answers = send_request_to_regional_leader(9, region_id, (filters, screens))
+    if answers is None:
+        return None
+
+    counts = {}
+    path_costs = {}
+    for (path1, filter_indexes), (path_cost, path_counts) in zip(screens, answers):
+        path_costs[tuple(path1)] = path_cost
+        for filter_index, count in zip(filter_indexes, path_counts):
+            counts[(tuple(path1), filter_index)] = count
+
+    counters = {"pairs": 0, "pruned": 0, "false_positives": 0, "avoided_bytes": 0,
+                "sketch_bytes": 2 * sum(len(bloom_filter) for bloom_filter in filters)
+                                + calculate_transmission_cost([path_counts for _, path_counts in answers])}
+
+    # Keep the pairs whose count can clear the threshold
+    joined_pairs_of_lengths = {}
+    kept_paths1 = set()
+    kept_edges = set()
+    for (length, length2), boundary_pairs in boundary_pairs_of_lengths.items():
+        joined_pairs = []
+        for position1, positions2 in boundary_pairs:
+            hot_path1 = tuple(c_hot_paths1[length][position1])
+            kept_positions2 = []
+            for position2 in positions2:
+                hot_path2 = c_hot_paths2[length2][position2]
+                counters["pairs"] += 1
+                if counts[(hot_path1, first_edges[hot_path2[0]])] / numberOfObjects >= threshold:
+                    kept_positions2.append(position2)
+                    kept_edges.update(hot_path2)
+                else:
+                    counters["pruned"] += 1
+            if kept_positions2:
+                joined_pairs.append((position1, kept_positions2))
+                kept_paths1.add(hot_path1)
+        joined_pairs_of_lengths[(length, length2)] = joined_pairs
+
+    # Object sets the exact join does not transfer any more (the paths1 are also pushed to region_id2)
+    for hot_path1, path_cost in path_costs.items():
+        if (hot_path1 not in kept_paths1 and path_cost >= 0
+                and (1, region_id, hot_path1) not in object_set_cache):
+            counters["avoided_bytes"] += path_cost * (2 if use_pushdown else 1)
+    for edge_of_path2, edge_cost in edge_costs.items():
+        if (edge_of_path2 not in kept_edges and edge_cost >= 0
+                and (2, region_id2, (edge_of_path2,)) not in object_set_cache):
+            counters["avoided_bytes"] += edge_cost
+
+    return joined_pairs_of_lengths, counters
+
+
+def clear_object_set_cache():
+    """Empties the object-set cache and its counters (start of a spanning detection)."""
+    with object_set_cache_lock:
+        object_set_cache.clear()
+        object_set_cache_in_flight.clear()
+        for counter in object_set_cache_stats:
+            object_set_cache_stats[counter] = 0
+
+
+# 4.2.2
+# Wire protocol between the Top Leader and the Regional Leaders.
+# Every message is one frame: a header "<BBII" (version, kind, request id, payload length)
+# followed by the payload. All payloads are packed integer arrays (encode_int_array):
+#   - path/edge request:    the edges;             answer: the object IDs, or _MSG_NOT_FOUND
+#   - Homopath_list:        (empty);               answer: encode_homopath_list, or _MSG_NO_HOMOPATHS
+#   - Homopath_NumberOfObjs (empty);               answer: the unique objects of the region
+#   - total_information_integers (empty);          answer: [total], or _MSG_NO_HOMOPATHS
+#   - bulk (encode_bulk_request);                  answer: encode_bulk_response
+#   - pushdown (encode_pushdown_request);          answer: encode_pushdown_response
+#   - Bloom filters ([number of edges to filter, edges..., edges whose cost is asked...]);
+#                                                  answer: encode_bulk_response of the filters + [costs]
+#   - Bloom screen (encode_bulk_response of the filters + [number of paths, (length, edges...,
+#                   number of filters, filter indexes...)...]);
+#                                                  answer: [(cost of the path's objects, counts...)...]
+#   - interior counts (empty);                     answer: [number of keys, (key, count)...]
+#   - object sketch (empty);                       answer: [k, sorted hashes...]
+#   - Cohen minima (empty);                        answer: the minima of the signatures
+#   - output homopath list (empty);                answer: encode_homopath_list of the whole dictionary,
+#                                                          or _MSG_NO_HOMOPATHS
+#   - shutdown ("[-1]"):    (empty);               no answer
+# The length prefix replaces the old end-of-message guesses (socket closed, text ending with "}"),
+# so large object sets can not be cut, and nothing is parsed from text any more.
+_FRAME_HEADER = struct.Struct("<BBII")
+
+_MSG_PATH = 1
+_MSG_EDGE = 2
+_MSG_HOMOPATH_LIST = 3
+_MSG_OBJECTS = 4
+_MSG_INTEGERS = 5
+_MSG_BULK = 6
+_MSG_PUSHDOWN = 7
+_MSG_BLOOM_FILTERS = 8
+_MSG_BLOOM_SCREEN = 9
+_MSG_INTERIOR_COUNTS = 10
+_MSG_OBJECT_SKETCH = 11
+_MSG_COHEN_MINIMA = 12
+_MSG_OUTPUT_HOMOPATH_LIST = 13
+_MSG_NOT_FOUND = 16
+_MSG_NO_HOMOPATHS = 17
+_MSG_SHUTDOWN = 255
+
+# Element type of a packed integer array (first byte of the array)
+_INT_ARRAY_DTYPES = {b"I": np.dtype("<u4"), b"q": np.dtype("<i8")}
+
+
+def encode_int_array(values):
+    """
+    Packs integers as one type byte + little-endian values:
+    b"I" => uint32 when every value fits, b"q" => int64 otherwise.
+    """
+    values = np.asarray(values, dtype=np.int64) if not isinstance(values, np.ndarray) else values
+    if values.size == 0 or (values.min() >= 0 and values.max() <= 0xFFFFFFFF):
+        return b"I" + values.astype("<u4").tobytes()
+    return b"q" + values.astype("<i8").tobytes()
+
+
+def decode_int_array(payload):
+    """Inverse of encode_int_array, as a list of Python ints."""
+    return np.frombuffer(payload, dtype=_INT_ARRAY_DTYPES[bytes(payload[:1])], offset=1).tolist()
+
+
+def encode_homopath_list(HoMoPaths_Dictionary):
+    """
+    Packs a dictionary {key: [[edges], ...]} as one integer array:
+    [number of keys, (key, number of paths, (length, edges...)...)...]
+    """
+    flat = [len(HoMoPaths_Dictionary)]
+    for key, paths in HoMoPaths_Dictionary.items():
+        flat.append(key)
+        flat.append(len(paths))
+        for path in paths:
+            flat.append(len(path))
+            flat.extend(path)
+    return encode_int_array(flat)
+
+
+def decode_homopath_list(payload):
+    """
+    Inverse of encode_homopath_list. The keys are strings, as in the JSON dictionary
+    the Top Leader used to receive.
+    """
+    flat = decode_int_array(payload)
+    HoMoPaths_Dictionary = {}
+    position = 1
+    for _ in range(flat[0]):
+        key, number_of_paths = flat[position], flat[position + 1]
+        position += 2
+        paths = []
+        for _ in range(number_of_paths):
+            length = flat[position]
+            paths.append(flat[position + 1:position + 1 + length])
+            position += 1 + length
+        HoMoPaths_Dictionary[str(key)] = paths
+    return HoMoPaths_Dictionary
+
+
+# Length of one object set in a bulk answer (-1 => not found)
+_BULK_ENTRY = struct.Struct("<i")
+
+
+def encode_bulk_request(object_requests):
+    """
+    Packs a list of (1 or 2, path or [edge]) requests as one integer array:
+    [number of requests, (1 or 2, length, edges...)...]
+    """
+    flat = [len(object_requests)]
+    for requestPathORedge, path_edge_ID in object_requests:
+        flat.append(requestPathORedge)
+        flat.append(len(path_edge_ID))
+        flat.extend(path_edge_ID)
+    return encode_int_array(flat)
+
+
+def decode_bulk_request(payload):
+    """Inverse of encode_bulk_request: [(1 or 2, [edges]), ...]"""
+    flat = decode_int_array(payload)
+    object_requests = []
+    position = 1
+    for _ in range(flat[0]):
+        requestPathORedge, length = flat[position], flat[position + 1]
+        object_requests.append((requestPathORedge, flat[position + 2:position + 2 + length]))
+        position += 2 + length
+    return object_requests
+
+
+def encode_bulk_response(obj_payloads):
+    """
+    Concatenates the answers of a bulk request: for every request, its length ("<i", -1 when the
+    path/edge was not found) followed by its packed integer array (as kept in the trie).
+    """
+    parts = []
+    for obj_payload in obj_payloads:
+        if obj_payload is None:
+            parts.append(_BULK_ENTRY.pack(-1))
+        else:
+            parts.append(_BULK_ENTRY.pack(len(obj_payload)))
+            parts.append(obj_payload)
+    return b"".join(parts)
+
+
+def decode_bulk_response(payload):
+    """Inverse of encode_bulk_response: the packed arrays (or None), in the order of the requests."""
+    obj_payloads = []
+    position = 0
+    while position < len(payload):
+        length, = _BULK_ENTRY.unpack_from(payload, position)
+        position += _BULK_ENTRY.size
+        if length < 0:
+            obj_payloads.append(None)
+        else:
+            obj_payloads.append(payload[position:position + length])
+            position += length
+    return obj_payloads
+
+
+# Threshold and numberOfObjects at the start of a pushdown request
+_PUSHDOWN_HEADER = struct.Struct("<dq")
+
+
+def encode_pushdown_request(threshold, numberOfObjects, joins):
+    """
+    Packs a compute pushdown request: "<dq" (threshold, numberOfObjects) followed by one integer array
+    [number of paths1, (number of objects, objects..., number of paths2, (length, edges...)...)...]
+    """
+    flat = [len(joins)]
+    for objIDs_ofPath1, paths2 in joins:
+        flat.append(len(objIDs_ofPath1))
+        flat.extend(objIDs_ofPath1)
+        flat.append(len(paths2))
+        for hot_path2 in paths2:
+            flat.append(len(hot_path2))
+            flat.extend(hot_path2)
+    return _PUSHDOWN_HEADER.pack(threshold, numberOfObjects) + encode_int_array(flat)
+
+
+def decode_pushdown_request(payload):
+    """Inverse of encode_pushdown_request: (threshold, numberOfObjects, [(objects, [paths2]), ...])"""
+    threshold, numberOfObjects = _PUSHDOWN_HEADER.unpack_from(payload)
+    flat = decode_int_array(payload[_PUSHDOWN_HEADER.size:])
+    joins = []
+    position = 1
+    for _ in range(flat[0]):
+        number_of_objects = flat[position]
+        objIDs_ofPath1 = flat[position + 1:position + 1 + number_of_objects]
+        position += 1 + number_of_objects
+        paths2 = []
+        for _ in range(flat[position]):
+            length = flat[position + 1]
+            paths2.append(flat[position + 2:position + 2 + length])
+            position += 1 + length
+        position += 1
+        joins.append((objIDs_ofPath1, paths2))
+    return threshold, numberOfObjects, joins
+
+
+def encode_pushdown_response(results):
+    """
+    Packs the results of the joins as one integer array, per pair (in the order of the request):
+    [accepted edges, 1 if a homopath is stored (else 0), number of objects, objects...]
+    """
+    flat = []
+    for accepted_edges, recorded_objs in results:
+        flat.append(accepted_edges)
+        if recorded_objs is None:
+            flat.extend((0, 0))
+        else:
+            flat.extend((1, len(recorded_objs)))
+            flat.extend(recorded_objs)
+    return encode_int_array(flat)
+
+
+def decode_pushdown_response(payload, number_of_paths2):
+    """
+    Inverse of encode_pushdown_response, split per path1 (number_of_paths2: paths2 of every path1).
+    """
+    flat = decode_int_array(payload)
+    answers = []
+    position = 0
+    for count in number_of_paths2:
+        answers_of_path1 = []
+        for _ in range(count):
+            accepted_edges, stored, number_of_objects = flat[position:position + 3]
+            recorded_objs = flat[position + 3:position + 3 + number_of_objects] if stored else None
+            answers_of_path1.append((accepted_edges, recorded_objs))
+            position += 3 + number_of_objects
+        answers.append(answers_of_path1)
+    return answers
+
+
+def _pack_frame(kind, request_id, payload=b""):
+    """Header + payload of one message."""
+    return _FRAME_HEADER.pack(wire_protocol_version, kind, request_id, len(payload)) + payload
+
+
+def _read_frame(stream):
+    """
+    Reads one frame from a buffered stream (socket.makefile('rb')).
+    :return: (kind, request id, payload), or None at the end of the stream
+    """
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None
+    version, kind, request_id, length = _FRAME_HEADER.unpack(header)
+    if version != wire_protocol_version:
+        raise ValueError(f"Wire protocol version {version} is not supported")
+    payload = stream.read(length)
+    if len(payload) < length:
         return None
+    return kind, request_id, payload
+
+
+def _split_frames(received_bytes):
+    """
+    Cuts the complete frames out of the bytes received on a connection.
+    :return: ([(kind, request id, payload), ...], the remaining bytes of an incomplete frame)
+    """
+    frames = []
+    position = 0
+    while len(received_bytes) - position >= _FRAME_HEADER.size:
+        version, kind, request_id, length = _FRAME_HEADER.unpack_from(received_bytes, position)
+        if version != wire_protocol_version:
+            raise ValueError(f"Wire protocol version {version} is not supported")
+        end = position + _FRAME_HEADER.size + length
+        if end > len(received_bytes):
+            break
+        frames.append((kind, request_id, bytes(received_bytes[position + _FRAME_HEADER.size:end])))
+        position = end
+    return frames, received_bytes[position:]
 
 
 ##########   regional leader   ##########
 # 4.3
 def start_regional_leader(region_ID, threshold, ready_event, raw_or_hashed, 
                           permutations, current_compress, length_of_permutations, 
-                          help_for_jaccard, limitN):
+                          help_for_jaccard, limitN, boundary_edges=None):
     """
     Function that initializes a single Regional Leader's logic:
       1. Loads the local graph from a file (map{region_ID}.txt).
@@ -847,54 +2164,44 @@ def start_regional_leader(region_ID, threshold, ready_event, raw_or_hashed,
          - Waits until the Top Leader sends "[-1]" to indicate it can shut down.
       4. Signals to the Top Leader (via shared global counters + condition variable) that this region is ready or has no homopaths.
       5. Exits upon receiving a "close" command from the Top Leader.
+
+    :param boundary_edges:
+        (edges leaving the region, edges entering it) for the boundary-only publication
+        (see homopath_publication), or None to publish the whole homopath dictionary.
     """
 
+    # Global shared structures for multi-thread/ multi-region coordination
+    global regions_ready_counter
+    global regions_without_Homopa_counter
+    global all_regions_counter
+
+    print(f"\tThread for RegionalLeaderID = {region_ID} , just started !")
+
+    if regional_process_pool is not None:
+        # The heavy computation runs in a worker process, so regions do not wait for each other.
+        # This thread only waits for its own result.
+        region_result, worker_removed_sleeps = regional_process_pool.submit(
+            _compute_region_in_worker, region_ID, threshold, raw_or_hashed, permutations, current_compress,
+            length_of_permutations, help_for_jaccard, limitN
+        ).result()
+        regions_hot_paths, Uniqueobjs, only_Homopa_RAW_HASHED, transmission_cost, total_information_integers = region_result
+        for place, seconds in worker_removed_sleeps.items():
+            record_removed_sleep(place, seconds)
+
     # Acquire a global lock to ensure no conflicts with shared data structures
     with function_lock:
-        # Global shared structures for multi-thread/ multi-region coordination
-        global regions_ready_counter
-        global regions_without_Homopa_counter
-        global all_regions_counter
-
-        # The local text file that describes this region's sub-graph, presumably in the format:
-        # [edge_id, node1, node2, x1, y1, x2, y2]
-        picturePath = f"map{region_ID}.txt"
-        print(f"\tThread for RegionalLeaderID = {region_ID} , just started !")
-
-        # Read the edges from the CSV (or TXT) file into a DataFrame
-        df = pd.read_csv(picturePath, header=None, 
-                         names=['edge_id', 'node1', 'node2', 'x1', 'y1', 'x2', 'y2'])
-
-        # Create a graph (NetworkX) for visualization or local computations
-        G = nx.Graph()
-
-        # Populate the graph with nodes and edges
-        for _, row in df.iterrows():
-            G.add_node(row['node1'], pos=(row['x1'], row['y1']))
-            G.add_node(row['node2'], pos=(row['x2'], row['y2']))
-            edge_id = row['edge_id']
-            # Set 'edge_id' as an attribute on the edge
-            G.add_edge(row['node1'], row['node2'], edge_id=edge_id)
-
-        # Retrieve node positions from the graph
-        pos_removed = nx.get_node_attributes(G, 'pos')
-
-        # Create a new plot, draw edges, and save the figure
-        plt.figure(figsize=(10, 10))
-        nx.draw_networkx_edges(G, pos_removed, width=2, edge_color='black')
-        output_file_path = f"depth_{region_ID}.png"
-        plt.savefig(output_file_path)
-        # plt.show() or plt.close() can be used if needed
-
-        # Now, process the region to discover local homopaths, unique objects, etc.
-        # This function presumably does all the heavy-lifting of scanning edges, 
-        # checking data from sensors, etc.
-        regions_hot_paths, Uniqueobjs, only_Homopa_RAW_HASHED, transmission_cost, total_information_integers = (
-            process_region(
-                region_ID, threshold, raw_or_hashed, permutations, current_compress,
-                length_of_permutations, help_for_jaccard, limitN
+        if regional_process_pool is None:
+            regions_hot_paths, Uniqueobjs, only_Homopa_RAW_HASHED, transmission_cost, total_information_integers = (
+                compute_region(
+                    region_ID, threshold, raw_or_hashed, permutations, current_compress,
+                    length_of_permutations, help_for_jaccard, limitN
+                )
             )
-        )
+
+        # The homopaths are kept in a path trie (shared prefixes, compact object arrays),
+        # which answers the path/edge requests of the Top Leader in O(L); the dictionary is
+        # exported from it again when the Top Leader asks for the "Homopath_list".
+        regions_path_trie = build_homopath_trie(regions_hot_paths) if regions_hot_paths else None
 
         # The 'regions_hot_paths' is a dictionary storing discovered homopaths by path length,
         # 'Uniqueobjs' is a set (or list) of the unique objects seen in this region,
@@ -984,12 +2291,12 @@ def start_regional_leader(region_ID, threshold, ready_event, raw_or_hashed,
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         server_socket.bind(('localhost', regional_port))
-        server_socket.listen(1)
+        server_socket.listen(max(connections_per_region, 1))
 
         # Notify the Top Leader (via shared counters + condition variable) 
         # whether this region has found homopaths or not
         with all_regions_ready_condition:
-            if regions_hot_paths:
+            if regions_path_trie:
                 # We found at least one homopath, so mark this region as 'ready'
                 regions_ready_counter.append(region_ID)
                 all_regions_counter.append(region_ID)
@@ -1006,100 +2313,426 @@ def start_regional_leader(region_ID, threshold, ready_event, raw_or_hashed,
         # Also let the calling thread or external manager know we are 'up and running'
         ready_event.set()
 
-    # Outside the 'function_lock', we enter an infinite loop to handle incoming requests
-    # from the Top Leader until it signals a shutdown via "[-1]"
-    while True:
-        # Accept a single client connection (the Top Leader typically)
-        client_socket, client_address = server_socket.accept()
+    # Outside the 'function_lock', we serve the requests of the Top Leader until it signals
+    # a shutdown via "[-1]". The answers that do not depend on the request are encoded once here.
+    # The Top Leader keeps its connections open, so one selector loop accepts new connections
+    # and reads the request frames of all of them.
+    # Hashed data with object_count_mode "sketch": the minima of the signatures of the region
+    cohen_minima = None
+    if raw_or_hashed == 1 and object_count_mode == "sketch":
+        cohen_minima = read_cohen_minima(f"Regional_4_sensors_HASHED{region_ID}.txt")
+
+    regional_responses = prepare_regional_responses(regions_path_trie, Uniqueobjs, total_information_integers,
+                                                    boundary_edges, cohen_minima)
+    if regional_server == "asyncio":
+        asyncio.run(serve_regional_requests_async(server_socket, regional_responses, regions_path_trie))
+    else:
+        serve_regional_requests(server_socket, regional_responses, regions_path_trie)
 
-        # Receive data in small chunks. Data is expected to be JSON-encoded.
-        data = client_socket.recv(1024).decode('utf-8')
-        received_data_check = json.loads(data)
 
-        # If the Top Leader sends "[-1]", it indicates we should shut down
-        if received_data_check == "[-1]":
-            server_socket.close()
-            #print("3. From Reg Leader/Thread To EXIT")
-            break
+# 4.3.2
+def serve_regional_requests(server_socket, regional_responses, regions_path_trie):
+    """
+    Serving loop of a Regional Leader. Every request frame gets one response frame with the
+    same request id (see 4.2.2). Returns (and closes every socket) when the Top Leader sends "[-1]".
+    """
+    selector = selectors.DefaultSelector()
+    selector.register(server_socket, selectors.EVENT_READ)
+    received_bytes = {}  # connection -> bytes received after the last complete frame
+    running = True
+
+    while running:
+        for key, _ in selector.select():
+            if key.fileobj is server_socket:
+                # A new connection of the Top Leader's pool
+                client_socket, client_address = server_socket.accept()
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                selector.register(client_socket, selectors.EVENT_READ)
+                received_bytes[client_socket] = b""
+                continue
+
+            client_socket = key.fileobj
+            try:
+                data = client_socket.recv(65536)
+                frames, received_bytes[client_socket] = _split_frames(received_bytes[client_socket] + data)
+            except (OSError, ValueError) as error:
+                # A broken connection or a frame of another protocol version
+                print(f"Regional Leader: connection closed ({error})")
+                data = b""
+            if not data:
+                # The Top Leader closed this connection
+                selector.unregister(client_socket)
+                del received_bytes[client_socket]
+                client_socket.close()
+                continue
+
+            responses = []
+            for request_kind, request_id, payload in frames:
+                # If the Top Leader sends "[-1]", it indicates we should shut down
+                if request_kind == _MSG_SHUTDOWN:
+                    running = False
+                    break
+                response_kind, response_payload = answer_regional_request(
+                    request_kind, payload, regional_responses, regions_path_trie)
+                responses.append(_pack_frame(response_kind, request_id, response_payload))
+            if responses:
+                try:
+                    client_socket.sendall(b"".join(responses))
+                except OSError:
+                    # The Top Leader closed this connection before reading the answers
+                    selector.unregister(client_socket)
+                    del received_bytes[client_socket]
+                    client_socket.close()
+            if not running:
+                break
+
+    # Close the connections and the server socket after the shutdown command
+    for client_socket in received_bytes:
+        selector.unregister(client_socket)
+        client_socket.close()
+    selector.close()
+    server_socket.close()
 
-        elif (received_data_check == "Homopath_list" or 
-              received_data_check == "Homopath_NumberOfObjs" or
-              received_data_check == "total_information_integers"):
-            # The Top Leader is requesting some specific piece of data.
-
-            if regions_hot_paths:
-                # We have homopaths in this region
-                if received_data_check == "Homopath_list":
-                    # The Top Leader wants the dictionary of homopaths.
-                    # We convert 'regions_hot_paths' into a JSON string,
-                    # but note that each path is itself a list-of-lists, 
-                    # so we grab just the first sub-list (path[0]) for each path entry.
-                    serialized_data = json.dumps({
-                        key: [path[0] for path in paths] 
-                        for key, paths in regions_hot_paths.items()
-                    })
-                    # Send the data in chunks of size=1024 bytes
-                    chunk_size = 1024
-                    for i in range(0, len(serialized_data), chunk_size):
-                        chunk = serialized_data[i:i + chunk_size]
-                        client_socket.send(chunk.encode('utf-8'))
-
-                elif received_data_check == "total_information_integers":
-                    # The Top Leader wants the total sensor data integer count
-                    # that we discovered in this region
-                    chunk = str(total_information_integers)
-                    client_socket.send(chunk.encode('utf-8'))
 
-                else:
-                    # "Homopath_NumberOfObjs" means the Top Leader wants 
-                    # the unique objects from this region
-                    set_str = str(Uniqueobjs)
-                    chunk_size = 1024
-                    for i in range(0, len(set_str), chunk_size):
-                        chunk = set_str[i:i + chunk_size]
-                        client_socket.send(chunk.encode('utf-8'))
-                    # print(f"uniq objs : {chunk}")  # For debugging if needed
-                    # x = input()
-            else:
-                # If no homopaths exist in this region
-                if received_data_check == "Homopath_NumberOfObjs":
-                    # The Top Leader only wants the unique objects (no homopaths here).
-                    set_str = str(Uniqueobjs)
-                    chunk_size = 1024
-                    for i in range(0, len(set_str), chunk_size):
-                        chunk = set_str[i:i + chunk_size]
-                        client_socket.send(chunk.encode('utf-8'))
-                else:
-                    # Otherwise, respond with -1 to indicate 
-                    # we do not have requested homopath data
-                    chunk = "-1"
-                    client_socket.send(chunk.encode('utf-8'))
+# 4.3.3
+# Request kinds whose answer is computed (joins, Bloom filters) rather than looked up: the asyncio
+# server answers them in a worker thread, so they do not block the other connections of the region
+_MSG_COMPUTE_KINDS = frozenset((_MSG_PUSHDOWN, _MSG_BLOOM_FILTERS, _MSG_BLOOM_SCREEN))
 
-        else:
-            # Here, the Top Leader might be requesting specific path or edge data
-            # for intersection checks or for verification of objects within a path.
-            edge_path_id = data
 
-            # Receive until we see a "}" indicating the JSON object ended
-            while data.endswith("}") is False:
-                data = client_socket.recv(1024).decode('utf-8')
-                edge_path_id += data
+async def serve_regional_requests_async(server_socket, regional_responses, regions_path_trie):
+    """
+    asyncio version of serve_regional_requests (regional_server = "asyncio"), run by the
+    regional thread with asyncio.run. Every connection of the Top Leader's pool is read by its
+    own task, and every request frame is answered by a task of its own, so the requests of one
+    connection are answered concurrently (the answers are matched by their request id, and
+    written one at a time under a lock per connection). The homopath data is only read, so the
+    tasks share it without locks.
+    The compute-heavy requests (_MSG_COMPUTE_KINDS) run in the default executor of the loop,
+    the others are answered on the loop directly.
+    On "[-1]" the server stops listening, closes every connection and waits for their tasks,
+    so no socket is left open when the regional thread ends.
+    """
+    shutdown_requested = asyncio.Event()
+    connection_tasks = set()
+    connection_writers = set()
+    loop = asyncio.get_running_loop()
+
+    async def answer_frame(request_kind, request_id, payload, writer, write_lock):
+        if request_kind in _MSG_COMPUTE_KINDS:
+            response_kind, response_payload = await loop.run_in_executor(
+                None, answer_regional_request, request_kind, payload, regional_responses, regions_path_trie)
+        else:
+            response_kind, response_payload = answer_regional_request(
+                request_kind, payload, regional_responses, regions_path_trie)
+        try:
+            # One answer at a time on the connection; it carries the request id, so the answers
+            # may go back in another order than the requests
+            async with write_lock:
+                writer.write(_pack_frame(response_kind, request_id, response_payload))
+                # Only waits while the socket buffer is full (large answers); other requests go on
+                await writer.drain()
+        except ConnectionError:
+            # The Top Leader closed this connection (or we did, on shutdown)
+            pass
+
+    async def serve_connection(reader, writer):
+        connection_tasks.add(asyncio.current_task())
+        connection_writers.add(writer)
+        writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        write_lock = asyncio.Lock()
+        frame_tasks = set()
+        try:
+            while True:
+                header = await reader.readexactly(_FRAME_HEADER.size)
+                version, request_kind, request_id, length = _FRAME_HEADER.unpack(header)
+                if version != wire_protocol_version:
+                    raise ValueError(f"Wire protocol version {version} is not supported")
+                payload = await reader.readexactly(length)
+
+                # If the Top Leader sends "[-1]", it indicates we should shut down
+                if request_kind == _MSG_SHUTDOWN:
+                    shutdown_requested.set()
+                    break
+
+                # Every request is answered by its own task, so a slow answer does not hold up
+                # the next requests of this connection
+                frame_task = asyncio.create_task(answer_frame(request_kind, request_id, payload, writer, write_lock))
+                frame_tasks.add(frame_task)
+                frame_task.add_done_callback(frame_tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # The Top Leader closed this connection (or we did, on shutdown)
+            pass
+        except ValueError as error:
+            # A frame of another protocol version
+            print(f"Regional Leader: connection closed ({error})")
+        finally:
+            # The requests still being answered end before the connection is closed
+            await asyncio.gather(*frame_tasks, return_exceptions=True)
+            connection_writers.discard(writer)
+            connection_tasks.discard(asyncio.current_task())
+            writer.close()
+
+    server = await asyncio.start_server(serve_connection, sock=server_socket)
+    await shutdown_requested.wait()
+
+    # Close the server socket and the connections after the shutdown command
+    server.close()
+    for writer in list(connection_writers):
+        writer.close()
+    await asyncio.gather(*connection_tasks, return_exceptions=True)
+    await server.wait_closed()
+
+
+# 4.3.4
+def prepare_regional_responses(regions_path_trie, Uniqueobjs, total_information_integers, boundary_edges=None,
+                               cohen_minima=None):
+    """
+    Encodes once the answers of a Regional Leader that do not depend on the request.
 
-            # Parse the final JSON object
-            path_edge_ID = received_data_check['path_edge_ID']
-            requestPathORedge = received_data_check['requestPathORedge']
+    :param boundary_edges: (edges leaving the region, edges entering it) for the boundary-only
+                           publication of the homopaths, or None
+    :param cohen_minima:   column-wise minima of the signatures of the region (hashed data), or None
+    :return:
+        {request kind: (response kind, payload)} for Homopath_list, Homopath_NumberOfObjs,
+        total_information_integers, the number of interior homopaths and the whole Homopath_list.
+    """
+    # "Homopath_NumberOfObjs": the unique objects of the region (with or without homopaths)
+    regional_responses = {_MSG_OBJECTS: (_MSG_OBJECTS, encode_int_array(list(Uniqueobjs)))}
+
+    # ... or their KMV sketch (object_count_mode "sketch")
+    if object_count_mode == "sketch":
+        sketch_size = kmv_sketch_size(object_sketch_relative_error)
+        regional_responses[_MSG_OBJECT_SKETCH] = (
+            _MSG_OBJECT_SKETCH,
+            encode_int_array(np.concatenate(([sketch_size], build_kmv_sketch(Uniqueobjs, sketch_size)))))
+    if cohen_minima is not None:
+        regional_responses[_MSG_COHEN_MINIMA] = (_MSG_COHEN_MINIMA, encode_int_array(cohen_minima))
+
+    if regions_path_trie:
+        # The dictionary of homopaths, with only the list of edges for each path entry,
+        # and the total sensor data integer count that we discovered in this region
+        HoMoPaths_Dictionary = homopath_trie_to_dict(regions_path_trie, with_objects=False)
+        homopath_list_payload = encode_homopath_list(HoMoPaths_Dictionary)
+        # The whole dictionary, for the output files of the Top Leader
+        regional_responses[_MSG_OUTPUT_HOMOPATH_LIST] = (_MSG_OUTPUT_HOMOPATH_LIST, homopath_list_payload)
+        interior_counts = {}
+        if homopath_publication == "boundary" and boundary_edges is not None:
+            HoMoPaths_Dictionary, interior_counts = boundary_homopath_view(HoMoPaths_Dictionary, boundary_edges)
+            homopath_list_payload = encode_homopath_list(HoMoPaths_Dictionary)
+        regional_responses[_MSG_HOMOPATH_LIST] = (_MSG_HOMOPATH_LIST, homopath_list_payload)
+        regional_responses[_MSG_INTERIOR_COUNTS] = (
+            _MSG_INTERIOR_COUNTS,
+            encode_int_array([len(interior_counts)] + [value for item in interior_counts.items() for value in item]))
+        regional_responses[_MSG_INTEGERS] = (_MSG_INTEGERS, encode_int_array([total_information_integers]))
+    else:
+        # Respond with "no homopaths" to indicate we do not have requested homopath data
+        regional_responses[_MSG_HOMOPATH_LIST] = (_MSG_NO_HOMOPATHS, b"")
+        regional_responses[_MSG_INTEGERS] = (_MSG_NO_HOMOPATHS, b"")
+        regional_responses[_MSG_INTERIOR_COUNTS] = (_MSG_NO_HOMOPATHS, b"")
+        regional_responses[_MSG_OUTPUT_HOMOPATH_LIST] = (_MSG_NO_HOMOPATHS, b"")
+    return regional_responses
 
-            # This custom function will locate object IDs for either a path or an edge
-            # within this region's discovered homopaths.
-            obj_ids = find_obj_ids_for_edge_path(requestPathORedge, path_edge_ID, regions_hot_paths)
 
-            # Convert to string and send back to the Top Leader
-            client_socket.send(str(obj_ids).encode('utf-8'))
+def boundary_homopath_view(HoMoPaths_Dictionary, boundary_edges):
+    """
+    Boundary-only publication of a homopath dictionary {key: [[edges], ...]}: only the homopaths
+    whose last edge leaves the region or whose first edge enters it can meet a homopath of another
+    region. Every key is kept (possibly with no paths), in the same order.
 
-        client_socket.close()
+    :return: (the published homopaths, {key: number of the other homopaths} for the keys that have some)
+    """
+    leaving_edges, entering_edges = boundary_edges
+    boundary_view = {}
+    interior_counts = {}
+    for key, paths in HoMoPaths_Dictionary.items():
+        boundary_view[key] = [path for path in paths
+                              if path and (path[-1] in leaving_edges or path[0] in entering_edges)]
+        if len(paths) > len(boundary_view[key]):
+            interior_counts[key] = len(paths) - len(boundary_view[key])
+    return boundary_view, interior_counts
+
+
+def answer_regional_request(request_kind, payload, regional_responses, regions_path_trie):
+    """
+    Builds the answer of a Regional Leader to one request frame of the Top Leader.
 
-    # Close the server socket after breaking from loop (shutdown command received)
-    server_socket.close()
+    :return:
+        (response kind, payload)
+    """
+    if request_kind in regional_responses:
+        # Homopath_list, Homopath_NumberOfObjs or total_information_integers (already encoded)
+        return regional_responses[request_kind]
+
+    if request_kind == _MSG_PATH or request_kind == _MSG_EDGE:
+        # The Top Leader is requesting specific path or edge data
+        # for intersection checks or for verification of objects within a path.
+        # The objects are kept encoded in the trie, so they are sent as they are.
+        requestPathORedge = 1 if request_kind == _MSG_PATH else 2
+        obj_payload = find_encoded_obj_ids_for_edge_path(
+            requestPathORedge, decode_int_array(payload), regions_path_trie)
+        if obj_payload is not None:
+            return request_kind, obj_payload
+
+    if request_kind == _MSG_PUSHDOWN:
+        # Compute pushdown: join the paths1 of the Top Leader with our paths2
+        threshold, numberOfObjects, joins = decode_pushdown_request(payload)
+        edge_object_sets = {}
+        results = []
+        for objIDs_ofPath1, paths2 in joins:
+            results.extend(join_candidate_paths(objIDs_ofPath1, paths2, threshold, numberOfObjects,
+                                                regions_path_trie, edge_object_sets))
+        return _MSG_PUSHDOWN, encode_pushdown_response(results)
+
+    if request_kind == _MSG_BLOOM_FILTERS:
+        # Bloom filters of the objects of edges, and the transmission costs of the object sets of edges
+        flat = decode_int_array(payload)
+        filter_edges, cost_edges = flat[1:1 + flat[0]], flat[1 + flat[0]:]
+        filters = []
+        for edge in filter_edges:
+            objs_of_edge = find_obj_ids_for_edge_path(2, [edge], regions_path_trie)
+            filters.append(None if objs_of_edge is None else build_bloom_filter(objs_of_edge))
+        edge_costs = []
+        for edge in cost_edges:
+            objs_of_edge = find_obj_ids_for_edge_path(2, [edge], regions_path_trie)
+            edge_costs.append(-1 if objs_of_edge is None else calculate_transmission_cost(objs_of_edge))
+        return _MSG_BLOOM_FILTERS, encode_bulk_response(filters + [encode_int_array(edge_costs)])
+
+    if request_kind == _MSG_BLOOM_SCREEN:
+        # How many objects of every path pass the Bloom filters of the other region
+        entries = decode_bulk_response(payload)
+        filters, flat = entries[:-1], decode_int_array(entries[-1])
+        answer = []
+        position = 1
+        for _ in range(flat[0]):
+            length = flat[position]
+            path = flat[position + 1:position + 1 + length]
+            position += 1 + length
+            filter_indexes = flat[position + 1:position + 1 + flat[position]]
+            position += 1 + flat[position]
+            objs_of_path = find_obj_ids_for_edge_path(1, path, regions_path_trie)
+            if objs_of_path is None:
+                answer.append(-1)
+                answer.extend(0 for _ in filter_indexes)
+            else:
+                answer.append(calculate_transmission_cost(objs_of_path))
+                answer.extend(bloom_filter_count(filters[filter_index], objs_of_path)
+                              for filter_index in filter_indexes)
+        return _MSG_BLOOM_SCREEN, encode_int_array(answer)
+
+    if request_kind == _MSG_BULK:
+        # Many paths and edges at once: every one is resolved against the trie
+        # and the answers go back in one frame, in the order of the requests
+        return _MSG_BULK, encode_bulk_response(
+            [find_encoded_obj_ids_for_edge_path(requestPathORedge, path_edge_ID, regions_path_trie)
+             for requestPathORedge, path_edge_ID in decode_bulk_request(payload)])
+
+    return _MSG_NOT_FOUND, b""
+
+
+# 4.3.5
+def join_candidate_paths(objIDs_ofPath1, candidate_paths2, threshold, numberOfObjects,
+                         regions_path_trie, edge_object_sets=None):
+    """
+    Compute pushdown of the spanning join of the Top Leader: the same loop over the edges of every
+    path2, run by the Regional Leader that has the objects of the edges. It keeps the exact behaviour
+    of the Top Leader, including that an edge without any common object keeps the intersection of
+    the previous edge, and that the join stops at the first edge equal to the last edge of path2.
+
+    :param objIDs_ofPath1: objects of path1 (from the other region)
+    :param candidate_paths2: paths of this region whose first edge meets the last edge of path1
+    :param edge_object_sets: optional {edge: set of objects}, shared by the joins of one request
+    :return:
+        [(number of accepted edges of path2, objects of the homopath to store or None), ...]
+    """
+    if edge_object_sets is None:
+        edge_object_sets = {}
+
+    results = []
+    for hot_path2 in candidate_paths2:
+        intersected_objs = []
+        for_sure_intersected_objs = []
+        accepted_edges = 0
+        recorded_objs = None
+
+        for position, edge_of_path2 in enumerate(hot_path2):
+            if edge_of_path2 not in edge_object_sets:
+                edge_object_sets[edge_of_path2] = set(
+                    find_obj_ids_for_edge_path(2, [edge_of_path2], regions_path_trie) or ())
+            objs_of_edge2 = edge_object_sets[edge_of_path2]
+
+            # The first edge is intersected with path1, the next ones with the intersection so far
+            if position == 0:
+                ObjIDS_Path1 = objIDs_ofPath1
+            else:
+                ObjIDS_Path1 = intersected_objs
+            new_intersected_objs = [obj for obj in ObjIDS_Path1 if obj in objs_of_edge2]
+            if new_intersected_objs:
+                intersected_objs = new_intersected_objs
+
+            if len(intersected_objs) / numberOfObjects >= threshold:
+                accepted_edges += 1
+                for_sure_intersected_objs = intersected_objs
+                if edge_of_path2 == hot_path2[-1]:
+                    recorded_objs = for_sure_intersected_objs
+                    break
+            else:
+                if for_sure_intersected_objs:
+                    recorded_objs = for_sure_intersected_objs
+                break
+
+        results.append((accepted_edges, recorded_objs))
+    return results
+
+
+# 4.3.1
+def compute_region(region_ID, threshold, raw_or_hashed, permutations, current_compress,
+                   length_of_permutations, help_for_jaccard, limitN):
+    """
+    Computation part of a Regional Leader: draws the local map and runs process_region.
+    Runs either in the regional thread (under function_lock) or in a worker process
+    of 'regional_process_pool', therefore it only uses its arguments and the files.
+
+    :return:
+        The tuple returned by process_region(...).
+    """
+
+    # The local text file that describes this region's sub-graph, presumably in the format:
+    # [edge_id, node1, node2, x1, y1, x2, y2]
+    picturePath = f"map{region_ID}.txt"
+
+    # Read the edges from the CSV (or TXT) file into a DataFrame
+    df = pd.read_csv(picturePath, header=None, 
+                     names=['edge_id', 'node1', 'node2', 'x1', 'y1', 'x2', 'y2'])
+
+    # Create a graph (NetworkX) for visualization or local computations
+    G = nx.Graph()
+
+    # Populate the graph with nodes and edges
+    for _, row in df.iterrows():
+        G.add_node(row['node1'], pos=(row['x1'], row['y1']))
+        G.add_node(row['node2'], pos=(row['x2'], row['y2']))
+        edge_id = row['edge_id']
+        # Set 'edge_id' as an attribute on the edge
+        G.add_edge(row['node1'], row['node2'], edge_id=edge_id)
+
+    # Retrieve node positions from the graph
+    pos_removed = nx.get_node_attributes(G, 'pos')
+
+    # Create a new plot, draw edges, and save the figure
+    plt.figure(figsize=(10, 10))
+    nx.draw_networkx_edges(G, pos_removed, width=2, edge_color='black')
+    output_file_path = f"depth_{region_ID}.png"
+    plt.savefig(output_file_path)
+    # plt.show() or plt.close() can be used if needed
+
+    # Now, process the region to discover local homopaths, unique objects, etc.
+    # This function presumably does all the heavy-lifting of scanning edges, 
+    # checking data from sensors, etc.
+    return process_region(
+        region_ID, threshold, raw_or_hashed, permutations, current_compress,
+        length_of_permutations, help_for_jaccard, limitN
+    )
 
 
 # 4.4
@@ -1168,86 +2801,88 @@ def process_region(region_ID, threshold, raw_or_hashed, permutations,
             Number_of_Homopaths += count
             count_dict[key] = count
 
-        # If the dictionary has found homopaths
-        if HoMoPaths_Dictionary:
-            # Write basic experiment info to "ResultsOfExperiments.txt"
-            with open("ResultsOfExperiments.txt", 'a') as fileofexperiments:
-                threshold_comparison = raw_or_hashed + 1
-
-                # 'formatted_paths_all': a single string combining path edges in 
-                # Homopaths except for the index=0 category if that is single-edge
-                formatted_paths_all = ','.join([
-                    '[{}]'.format(','.join(map(str, sub_paths_list[0])))
-                    for index, complete_data in enumerate(HoMoPaths_Dictionary.values())
-                    if index > 0  # skipping the index=0 group if desired
-                    for sub_paths_list in complete_data
-                ])
-
-                # Similarly, but skip index <= 1 if we don't want single-edge or double-edge
-                formatted_paths_allwithout_single = ','.join([
-                    '[{}]'.format(','.join(map(str, sub_paths_list[0])))
-                    for index, complete_data in enumerate(HoMoPaths_Dictionary.values())
-                    if index > 1
-                    for sub_paths_list in complete_data
-                ])
-
-                # We parse the 'formatted_paths_all' string to a list-of-lists of integers
-                list_strings2_all = formatted_paths_all.strip('][').split('],[')
-                formatted_list_all = [
-                    [int(num) for num in sublist.split(',')]
-                    for sublist in list_strings2_all
-                    if sublist.strip() != ''
-                ]
-
-                # Maintain a dictionary storing either raw or hashed homopath data for this region
-                if raw_or_hashed == 0:  # RAW
-                    if region_ID not in only_Homopa_RAW_HASHED:
-                        only_Homopa_RAW_HASHED[region_ID] = formatted_list_all
-                else:  # HASHED
-                    if region_ID not in only_Homopa_RAW_HASHED:
-                        only_Homopa_RAW_HASHED[region_ID] = formatted_list_all
-
-                # Write a small separator to the file
-                fileofexperiments.write("\n--------------------------------------------------------\n")
-
-            # Log more details about discovered paths in these additional files:
-            with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all.txt", 'a') as fileofexperiments:
-                # If we have any paths, log them, else log [0]
-                if len(formatted_paths_all) > 0:
-                    fileofexperiments.write(
-                        f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_all}\n"
-                    )
-                else:
-                    fileofexperiments.write(
-                        f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
-                    )
+        # The log files are shared by all regions (threads or worker processes)
+        with region_log_lock:
+            # If the dictionary has found homopaths
+            if HoMoPaths_Dictionary:
+                # Write basic experiment info to "ResultsOfExperiments.txt"
+                with open("ResultsOfExperiments.txt", 'a') as fileofexperiments:
+                    threshold_comparison = raw_or_hashed + 1
+
+                    # 'formatted_paths_all': a single string combining path edges in 
+                    # Homopaths except for the index=0 category if that is single-edge
+                    formatted_paths_all = ','.join([
+                        '[{}]'.format(','.join(map(str, sub_paths_list[0])))
+                        for index, complete_data in enumerate(HoMoPaths_Dictionary.values())
+                        if index > 0  # skipping the index=0 group if desired
+                        for sub_paths_list in complete_data
+                    ])
+
+                    # Similarly, but skip index <= 1 if we don't want single-edge or double-edge
+                    formatted_paths_allwithout_single = ','.join([
+                        '[{}]'.format(','.join(map(str, sub_paths_list[0])))
+                        for index, complete_data in enumerate(HoMoPaths_Dictionary.values())
+                        if index > 1
+                        for sub_paths_list in complete_data
+                    ])
+
+                    # We parse the 'formatted_paths_all' string to a list-of-lists of integers
+                    list_strings2_all = formatted_paths_all.strip('][').split('],[')
+                    formatted_list_all = [
+                        [int(num) for num in sublist.split(',')]
+                        for sublist in list_strings2_all
+                        if sublist.strip() != ''
+                    ]
 
-            # Similar logging, but also includes transmission cost and total_bytes
-            with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs.txt", 'a') as fileofexperiments_withcosts:
-                if len(formatted_paths_all) > 0:
-                    fileofexperiments_withcosts.write(
-                        f"{total_bytes},{transmission_cost},{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_all}\n"
-                    )
-                else:
-                    fileofexperiments_withcosts.write(
-                        f"{total_bytes},{transmission_cost},{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
-                    )
+                    # Maintain a dictionary storing either raw or hashed homopath data for this region
+                    if raw_or_hashed == 0:  # RAW
+                        if region_ID not in only_Homopa_RAW_HASHED:
+                            only_Homopa_RAW_HASHED[region_ID] = formatted_list_all
+                    else:  # HASHED
+                        if region_ID not in only_Homopa_RAW_HASHED:
+                            only_Homopa_RAW_HASHED[region_ID] = formatted_list_all
+
+                    # Write a small separator to the file
+                    fileofexperiments.write("\n--------------------------------------------------------\n")
+
+                # Log more details about discovered paths in these additional files:
+                with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all.txt", 'a') as fileofexperiments:
+                    # If we have any paths, log them, else log [0]
+                    if len(formatted_paths_all) > 0:
+                        fileofexperiments.write(
+                            f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_all}\n"
+                        )
+                    else:
+                        fileofexperiments.write(
+                            f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
+                        )
 
-            # Also log paths excluding single-edge or double-edge (if index <=1)
-            with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_allwithout_single.txt", 'a') as fileofexperiments:
-                if len(formatted_paths_allwithout_single) > 0:
-                    fileofexperiments.write(
-                        f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_allwithout_single}\n"
-                    )
-                else:
-                    fileofexperiments.write(
-                        f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
-                    )
+                # Similar logging, but also includes transmission cost and total_bytes
+                with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs.txt", 'a') as fileofexperiments_withcosts:
+                    if len(formatted_paths_all) > 0:
+                        fileofexperiments_withcosts.write(
+                            f"{total_bytes},{transmission_cost},{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_all}\n"
+                        )
+                    else:
+                        fileofexperiments_withcosts.write(
+                            f"{total_bytes},{transmission_cost},{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
+                        )
+
+                # Also log paths excluding single-edge or double-edge (if index <=1)
+                with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_allwithout_single.txt", 'a') as fileofexperiments:
+                    if len(formatted_paths_allwithout_single) > 0:
+                        fileofexperiments.write(
+                            f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_allwithout_single}\n"
+                        )
+                    else:
+                        fileofexperiments.write(
+                            f"{NumOfObjs},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},[0]\n"
+                        )
 
-            # Log additional info to a central file
-            with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
-                ratio_objs_edges = NumOfObjs / NumOfEdges if NumOfEdges != 0 else 0
-                fileofexperiments.write(f"4_1. {NumOfEdges},{NumOfObjs},{ratio_objs_edges},{threshold}\n{HoMoPaths_Dictionary}\n")
+                # Log additional info to a central file
+                with open("Current_Experiment_Info.txt", 'a') as fileofexperiments:
+                    ratio_objs_edges = NumOfObjs / NumOfEdges if NumOfEdges != 0 else 0
+                    fileofexperiments.write(f"4_1. {NumOfEdges},{NumOfObjs},{ratio_objs_edges},{threshold}\n{HoMoPaths_Dictionary}\n")
 
         
 
@@ -1267,7 +2902,7 @@ def process_region(region_ID, threshold, raw_or_hashed, permutations,
 
 
 # 4.5
-def find_obj_ids_for_edge_path(requestPathORedge, request, region_hot_paths):
+def find_obj_ids_for_edge_path(requestPathORedge, request, region_path_trie):
     """
     Looks up the object IDs associated with either:
       - A requested path (if requestPathORedge == 1)
@@ -1278,11 +2913,10 @@ def find_obj_ids_for_edge_path(requestPathORedge, request, region_hot_paths):
     :param request: 
         A list (for a path request) or a single item (for an edge request) 
         that we want to match within the stored homopaths.
-    :param region_hot_paths: 
-        A dictionary where keys are "path lengths" (e.g., 0 for edges, 1 for single-edge paths, 2 for multi-edge paths, etc.),
-        and values are lists of homopath records. Each homopath record is typically a two-element list:
-            [list_of_edges_or_edge, list_of_object_ids].
-        Example:
+    :param region_path_trie: 
+        The path trie of the region (see build_homopath_trie). Paths are stored under
+        the key of their length (1, 2, 3, ...), edges are the homoedges stored under key 0
+        of the homopath dictionary:
             region_hot_paths = {
                 0: [ [ [edge_id], objectIDs ], ...], 
                 2: [ [ [edge_id1, edge_id2], objectIDs ], ...],
@@ -1292,30 +2926,255 @@ def find_obj_ids_for_edge_path(requestPathORedge, request, region_hot_paths):
 
     :return:
         The matching list of object IDs if found, or None if no match exists.
+        A path lookup walks one trie node per edge (O(L)), an edge lookup is one dict access.
+    """
+    return _payload_to_list(find_encoded_obj_ids_for_edge_path(requestPathORedge, request, region_path_trie))
+
+
+def find_encoded_obj_ids_for_edge_path(requestPathORedge, request, region_path_trie):
+    """
+    Same lookup as find_obj_ids_for_edge_path, but returns the objects as they are kept in the
+    trie (the packed integer array of the wire protocol), or None.
     """
 
-    # Iterate through each "path length" key and its list of homopaths
-    for len_hot_paths1, hotpaths in region_hot_paths.items():
+    # A region without homopaths has no trie
+    if region_path_trie is None:
+        return None
 
-        # Decide whether we are looking for a path or an edge:
-        #   - requestPathORedge == 1 => Looking for a PATH whose length matches len(request).
-        #   - requestPathORedge == 2 => Looking for an EDGE, which we assume is stored under len_hot_paths1 == 0.
-        if ((requestPathORedge == 1 and (len(request) == len_hot_paths1))
-            or (requestPathORedge == 2 and (len_hot_paths1 == 0))):
+    if requestPathORedge == 1:
+        # Looking for a PATH, i.e. a node at depth len(request) that stores a homopath
+        node = _find_trie_node(region_path_trie, request)
+        if node is None:
+            return None
+        return node["objs"]
 
-            # Within this list of homopaths, each homopath is something like:
-            #   hot_path1 = [ [edge(s)], [objectIDs] ]
-            # where hot_path1[0] is the list of edge IDs or a single edge,
-            # and hot_path1[1] is the set/list of objects.
-            for hot_path1 in hotpaths:
-                # If the edges match our 'request', return the associated object IDs
-                if hot_path1[0] == request:
-                    return hot_path1[1]
+    if requestPathORedge == 2:
+        # Looking for an EDGE, stored in the edge index (key 0 of the homopath dictionary).
+        # The request is the edge as a list ([edge_id]), like the stored records.
+        if not isinstance(request, list) or len(request) != 1:
+            return None
+        return region_path_trie["edges"].get(request[0])
 
     # If no matching path/edge was found, Python implicitly returns None.
     return None
 
 
+# 4.6
+# Path trie of the discovered homopaths of a region.
+# The homopath dictionary repeats every prefix in every level and keeps one Python list of objects
+# per path; find_obj_ids_for_edge_path used to scan those lists. In the trie:
+#   - a node is a dict {"edge", "parent", "children", "objs"} and the children are keyed by edge ID,
+#     so shared prefixes are stored once and a path of L edges is found in L steps,
+#   - "objs" holds the objects (or hashed values) of the homopath ending at that node as a packed
+#     integer array (encode_int_array, uint32 when possible), None for nodes that are only a prefix;
+#     this is also the payload sent to the Top Leader, so it is encoded once,
+#   - the homoedges of key 0 are kept in a separate edge index,
+#   - "levels" keeps, per key of the dictionary, the stored entries in their original order,
+#     so homopath_trie_to_dict gives back the exact dictionary for the writers and the Top Leader.
+def build_homopath_trie(HoMoPaths_Dictionary):
+    """
+    Builds the path trie of a homopath dictionary.
+
+    :param HoMoPaths_Dictionary:
+        { 0: [[[edge], objs], ...], 1: [[[edge], objs], ...], n: [[[e1, ..., en], objs], ...] }
+    :return:
+        {"root": node, "edges": {edge_id: objs}, "levels": {key: [(node or edge_id, objs), ...]}}
+    """
+    root = {"edge": None, "parent": None, "children": {}, "objs": None}
+    path_trie = {"root": root, "edges": {}, "levels": {}}
+
+    for key, paths in HoMoPaths_Dictionary.items():
+        level_entries = path_trie["levels"].setdefault(key, [])
+        for path, obj_ids in paths:
+            objs = _compact_payload(obj_ids)
+
+            if key == 0:
+                # Homoedge: the first record of an edge answers the requests (as the list scan did)
+                path_trie["edges"].setdefault(path[0], objs)
+                level_entries.append((path[0], objs))
+                continue
+
+            node = root
+            for edge in path:
+                child = node["children"].get(edge)
+                if child is None:
+                    child = {"edge": edge, "parent": node, "children": {}, "objs": None}
+                    node["children"][edge] = child
+                node = child
+            if node["objs"] is None:
+                node["objs"] = objs
+            level_entries.append((node, objs))
+
+    return path_trie
+
+
+def find_homopaths_with_prefix(path_trie, prefix):
+    """
+    Returns every stored homopath (of length >= 1) that starts with 'prefix',
+    as [[edges], [objs]] records. Finding the prefix takes O(L); the rest is the size of the answer.
+    """
+    start_node = _find_trie_node(path_trie, prefix)
+    if start_node is None:
+        return []
+
+    found = []
+    stack = [(start_node, list(prefix))]
+    while stack:
+        node, path = stack.pop()
+        if node["objs"] is not None:
+            found.append([path, _payload_to_list(node["objs"])])
+        for edge, child in node["children"].items():
+            stack.append((child, path + [edge]))
+    return found
+
+
+def homopath_trie_to_dict(path_trie, with_objects=True):
+    """
+    Exports the path trie to the homopath dictionary format (same keys, same order of the records).
+
+    :param with_objects: False => the values are only the lists of edges (used by "Homopath_list").
+    """
+    HoMoPaths_Dictionary = {}
+    for key, level_entries in path_trie["levels"].items():
+        records = []
+        for entry, objs in level_entries:
+            path = [entry] if key == 0 else _trie_node_path(entry)
+            records.append([path, _payload_to_list(objs)] if with_objects else path)
+        HoMoPaths_Dictionary[key] = records
+    return HoMoPaths_Dictionary
+
+
+def _find_trie_node(path_trie, path):
+    """Walks the trie one edge at a time; returns the node of 'path' or None."""
+    node = path_trie["root"]
+    for edge in path:
+        node = node["children"].get(edge)
+        if node is None:
+            return None
+    return node
+
+
+def _trie_node_path(node):
+    """Rebuilds the list of edges of a node by following its parents."""
+    path = []
+    while node["edge"] is not None:
+        path.append(node["edge"])
+        node = node["parent"]
+    path.reverse()
+    return path
+
+
+def _compact_payload(obj_ids):
+    """Objects of a homopath as a packed integer array (order kept, see encode_int_array)."""
+    return encode_int_array(obj_ids)
+
+
+def _payload_to_list(objs):
+    """Back to the list of Python ints used by the dictionary."""
+    if objs is None:
+        return None
+    return decode_int_array(objs)
+
+
+# 4.7
+# Bloom filters of object sets (Bloom-filter semi-join of the Top Leader, see bloom_prescreen).
+# A filter is "<IB" (number of bits, number of hash functions) followed by the bits (np.packbits).
+# The k positions of an object are h1 + i * h2 (mod number of bits), with h1 and h2 two splitmix64
+# mixes of the object ID, so every region finds the same positions.
+_BLOOM_HEADER = struct.Struct("<IB")
+
+
+def build_bloom_filter(obj_ids, bits_per_object=None, number_of_hashes=None):
+    """
+    Bloom filter of a list of object IDs (or hashed values).
+    :return: the filter as bytes (see _BLOOM_HEADER)
+    """
+    if bits_per_object is None:
+        bits_per_object = bloom_filter_bits_per_object
+    if number_of_hashes is None:
+        number_of_hashes = bloom_filter_hashes
+    number_of_bits = max(64, -(-int(bits_per_object * len(obj_ids)) // 64) * 64)
+    bits = np.zeros(number_of_bits, dtype=bool)
+    bits[_bloom_positions(obj_ids, number_of_bits, number_of_hashes).ravel()] = True
+    return _BLOOM_HEADER.pack(number_of_bits, number_of_hashes) + np.packbits(bits, bitorder="little").tobytes()
+
+
+def bloom_filter_count(bloom_filter, obj_ids):
+    """
+    Number of the object IDs (with their repetitions) that may be in the filter.
+    Never lower than the number of those that really are in the filtered set.
+    """
+    number_of_bits, number_of_hashes = _BLOOM_HEADER.unpack_from(bloom_filter)
+    if not obj_ids:
+        return 0
+    bits = np.unpackbits(np.frombuffer(bloom_filter, dtype=np.uint8, offset=_BLOOM_HEADER.size),
+                         bitorder="little")[:number_of_bits].astype(bool)
+    return int(bits[_bloom_positions(obj_ids, number_of_bits, number_of_hashes)].all(axis=1).sum())
+
+
+def _bloom_positions(obj_ids, number_of_bits, number_of_hashes):
+    """Positions (len(obj_ids) x number_of_hashes) of the objects in a filter."""
+    values = np.asarray(obj_ids, dtype=np.int64).view(np.uint64)
+    h1 = _splitmix64(values)
+    h2 = _splitmix64(h1) | np.uint64(1)
+    hash_indexes = np.arange(number_of_hashes, dtype=np.uint64)
+    return (h1[:, None] + hash_indexes[None, :] * h2[:, None]) % np.uint64(number_of_bits)
+
+
+def _splitmix64(values):
+    """splitmix64 finalizer of an uint64 array (wrapping arithmetic)."""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# 4.8
+# KMV ("k minimum values") sketches of the unique objects of a region (object_count_mode "sketch").
+# A sketch is the sorted array of the k smallest distinct 63-bit hashes (splitmix64 >> 1) of the
+# objects. Sketches are mergeable: the sketch of a union is the k smallest values of the sketches.
+_KMV_HASH_RANGE = 2.0 ** 63
+
+
+def kmv_sketch_size(relative_error):
+    """k for a relative standard error of the estimates (about 1 / sqrt(k - 2))."""
+    return int(np.ceil(1.0 / relative_error ** 2)) + 2
+
+
+def build_kmv_sketch(obj_ids, sketch_size):
+    """KMV sketch (sorted int64 array) of a collection of object IDs."""
+    values = np.asarray(list(obj_ids), dtype=np.int64).view(np.uint64)
+    return np.unique(_splitmix64(values) >> np.uint64(1))[:sketch_size].astype(np.int64)
+
+
+def kmv_union(sketches, sketch_size):
+    """Sketch of the union of the sets of several sketches."""
+    if not sketches:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.concatenate(sketches))[:sketch_size]
+
+
+def kmv_cardinality(sketch, sketch_size):
+    """Estimated number of distinct objects of a sketch (exact when the sketch is not full)."""
+    if len(sketch) < sketch_size:
+        return float(len(sketch))
+    return (sketch_size - 1) / ((float(sketch[sketch_size - 1]) + 1.0) / _KMV_HASH_RANGE)
+
+
+def kmv_intersection_cardinality(sketch1, sketch2, sketch_size):
+    """
+    Estimated number of objects common to the sets of two sketches: the share of the k smallest
+    values of the union that are in both sketches, times the size of the union.
+    (A value of the union sketch is at most the k-th value of each sketch, so it is in a set only
+    if it is in its sketch.) Exact when the union sketch is not full.
+    """
+    union = kmv_union([sketch1, sketch2], sketch_size)
+    if len(union) < sketch_size:
+        return float(len(np.intersect1d(sketch1, sketch2)))
+    in_both = np.isin(union, sketch1) & np.isin(union, sketch2)
+    return int(in_both.sum()) / sketch_size * kmv_cardinality(union, sketch_size)
+
+
 
 
 #############################################################
@@ -1415,21 +3274,32 @@ def HOMOPA(region_ID, current_compress, raw_or_hashed, permutations,
     #    (and potentially chaining edges that meet threshold criteria).
     # -------------------------------------------------------------------------
     n = 1  # Possibly a parameter for recursion depth or chaining length
-    HoMoPaths_Dictionary = calculate_obj_id_intersection(
-        region_ID,
-        raw_or_hashed,
-        permutations,
-        edge_connections,
-        objs_in_edge,
-        objs_in_edge,
-        NumOfObjs,
-        threshold,
-        n,
-        length_of_permutations,
-        help_for_jaccard,
-        NumOfEdges,
-        limitN
-    )
+    if 0 < lattice_threshold <= threshold and help_for_jaccard != 1:
+        # Threshold sweep: filter the lattice mined once at the lowest threshold (5.1.1)
+        lattice = _load_or_mine_homopath_lattice(
+            region_ID, raw_or_hashed, permutations, edge_connections, objs_in_edge,
+            NumOfObjs, length_of_permutations, NumOfEdges, limitN,
+            File_2_edgeconnections, sensors_file_path
+        )
+        HoMoPaths_Dictionary = _homopaths_from_lattice(
+            lattice, region_ID, raw_or_hashed, permutations, threshold, NumOfEdges, help_for_jaccard
+        )
+    else:
+        HoMoPaths_Dictionary = calculate_obj_id_intersection(
+            region_ID,
+            raw_or_hashed,
+            permutations,
+            edge_connections,
+            objs_in_edge,
+            objs_in_edge,
+            NumOfObjs,
+            threshold,
+            n,
+            length_of_permutations,
+            help_for_jaccard,
+            NumOfEdges,
+            limitN
+        )
 
     # Return the key information discovered in this function
     return (UniqObjs, 
@@ -1441,6 +3311,135 @@ def HOMOPA(region_ID, current_compress, raw_or_hashed, permutations,
             total_information_integers)
 
 
+# 5.1.1
+def _load_or_mine_homopath_lattice(region_ID, raw_or_hashed, permutations, edge_connections,
+                                   objs_in_edge, NumOfObjs, length_of_permutations, NumOfEdges,
+                                   limitN, File_2_edgeconnections, sensors_file_path):
+    """
+    Returns the homopath lattice of a region, mined at 'lattice_threshold'.
+
+    The lattice keeps every level n as it was found, before the sub-path pruning, with the
+    exact support of every path: [path, support, objects]. The support is the numerator of
+    the threshold test of that level (number of objects, raw counts of hashed edges for n == 1,
+    or agreeing minhashes for hashed paths). It is cached in
+    "Regional_Lattice_<region_ID>_<key>.json", where the key is a digest of the region's
+    input files and of every setting that changes the result.
+    """
+    digest = hashlib.sha1()
+    for file_path in (File_2_edgeconnections, sensors_file_path):
+        with open(file_path, 'rb') as file:
+            digest.update(file.read())
+    digest.update(repr((raw_or_hashed, permutations, lattice_threshold, limitN,
+                        max_homopath_length, signature_agreement)).encode('utf-8'))
+    lattice_key = digest.hexdigest()
+    lattice_file = f"Regional_Lattice_{region_ID}_{lattice_key[:16]}.json"
+
+    if os.path.exists(lattice_file):
+        with open(lattice_file, 'r') as file:
+            lattice = json.load(file)
+        if lattice["key"] == lattice_key:
+            return lattice
+
+    # Numerator of the single edge test: raw counts for hashed data (the first line of an edge wins)
+    raw_counts_on_edge = {}
+    if raw_or_hashed == 1:
+        for edge_data in objs_in_edge:
+            raw_counts_on_edge.setdefault(edge_data[0][0], edge_data[1])
+
+    levels = {}
+    for _, level, paths in homopath_levels(
+            region_ID, raw_or_hashed, permutations, edge_connections, objs_in_edge, objs_in_edge,
+            NumOfObjs, lattice_threshold, 1, length_of_permutations, 0, NumOfEdges, limitN,
+            write_logs=False):
+        # Copy the list now: it is pruned in place once the next level is known
+        if level == 1 and raw_or_hashed == 1:
+            levels[str(level)] = [[path, raw_counts_on_edge[path[0]], objs] for path, objs in paths]
+        elif level == 1:
+            levels[str(level)] = [[path, len(set(objs)), objs] for path, objs in paths]
+        else:
+            levels[str(level)] = [[path, len(objs), objs] for path, objs in paths]
+
+    lattice = {
+        "key": lattice_key,
+        "lattice_threshold": lattice_threshold,
+        "total_obj_count": NumOfObjs,
+        "levels": levels
+    }
+    with open(lattice_file, 'w') as file:
+        json.dump(lattice, file)
+    return lattice
+
+
+# 5.1.2
+def _homopaths_from_lattice(lattice, region_ID, raw_or_hashed, permutations, threshold,
+                            NumOfEdges, help_for_jaccard):
+    """
+    Builds the HoMoPaths_Dictionary of 'threshold' (>= the lattice threshold) from the lattice,
+    exactly as calculate_obj_id_intersection would find it:
+      - level 1: the single edges whose support passes the threshold,
+      - level n: the lattice paths whose support passes the threshold, whose prefix was found
+        at level n-1 and whose last edge is the last edge of a path found at level n-1;
+        in the order of the adjacency engine (prefix order, then column order),
+      - every level n-1 is then pruned by the paths of level n,
+    and writes the single/pair logs of the compare scripts for this threshold.
+    """
+    total_obj_count = lattice["total_obj_count"]
+    levels = lattice["levels"]
+    HoMoPaths_Dictionary = {}
+
+    # Denominator of the threshold test for n >= 2
+    if raw_or_hashed == 1:
+        x = permutations
+    else:
+        x = total_obj_count
+
+    found = [[path, objs] for path, support, objs in levels.get("1", [])
+             if support / total_obj_count >= threshold]
+    if found:
+        HoMoPaths_Dictionary[0] = list(found)
+        HoMoPaths_Dictionary[1] = found
+    _write_level_logs(region_ID, HoMoPaths_Dictionary, 1, help_for_jaccard,
+                      total_obj_count, threshold, NumOfEdges, permutations)
+
+    n = 1
+    while found and str(n + 1) in levels:
+        n += 1
+        # Position of every path of level n-1 (frontier order) and of every tail (column order)
+        prefix_position = {}
+        column_position = {}
+        for position, (path, objs) in enumerate(found):
+            prefix_position.setdefault(tuple(path), position)
+            column_position.setdefault(path[-1], len(column_position))
+
+        next_found = [
+            [path, objs] for path, support, objs in levels[str(n)]
+            if support / x >= threshold
+            and tuple(path[:-1]) in prefix_position
+            and path[-1] in column_position
+        ]
+        next_found.sort(key=lambda entry: (prefix_position[tuple(entry[0][:-1])], column_position[entry[0][-1]]))
+
+        if next_found:
+            HoMoPaths_Dictionary[n] = next_found
+
+            # Prunning all the n (same as _calculate_homopath_level)
+            sub_shingles = set()
+            for path, objs in next_found:
+                for i in range(len(path) - (n - 2)):
+                    sub_shingles.add(tuple(path[i:i + n - 1]))
+            HoMoPaths_Dictionary[n - 1][:] = [
+                path2 for path2 in HoMoPaths_Dictionary[n - 1] if tuple(path2[0]) not in sub_shingles
+            ]
+        if n == 2:
+            _write_level_logs(region_ID, HoMoPaths_Dictionary, 2, help_for_jaccard,
+                              total_obj_count, threshold, NumOfEdges, permutations)
+        found = next_found
+
+    # Same stopping point as homopath_levels: the first empty level, or the last mined level
+    print(f"\tMax length of HoMoPaths for Regional Leader {region_ID} is :  {n - 1}")
+    return HoMoPaths_Dictionary
+
+
 # 5.2
 def Dict_Read_Edge_Connections_from_File(file_path):
     """
@@ -1525,8 +3524,9 @@ def prepare_data_from_file(sensors_file_path):
                 topic_information_integers += 1
                 UniqEdges.add(edge_id)
 
-                # The rest are object IDs
-                obj_ids = list(set(map(int, parts[1:])))  # Convert to int and remove duplicates
+                # The rest are object IDs, kept sorted so that they can be loaded
+                # directly into the sorted object sets of the adjacency engine
+                obj_ids = sorted(set(map(int, parts[1:])))  # Convert to int and remove duplicates
                 for obj in obj_ids:
                     UniqObjs.add(obj)
                     topic_information_integers += 1
@@ -1595,11 +3595,13 @@ def calculate_obj_id_intersection(
     help_for_jaccard,
     NumOfEdges,
     limit,
-    HoMoPaths_Dictionary=None
+    HoMoPaths_Dictionary=None,
+    object_sets=None
 ):
     """
-    Recursively discovers homopaths (i.e., chains of edges that meet a threshold 
-    for object intersection) within a region.
+    Discovers homopaths (i.e., chains of edges that meet a threshold 
+    for object intersection) within a region, one path length at a time.
+    The levels are produced by the homopath_levels(...) generator (5.4.1).
 
     Key Points / Parameters:
     ------------------------
@@ -1640,7 +3642,7 @@ def calculate_obj_id_intersection(
         n=1 => single edges (homoedges). 
         n=2 => pairs of edges, 
         etc. 
-        This increments recursively.
+        This increments by one per level.
     :param length_of_permutations:
         Additional parameter potentially used for advanced logic, not fully demonstrated here.
     :param help_for_jaccard:
@@ -1648,7 +3650,9 @@ def calculate_obj_id_intersection(
     :param NumOfEdges:
         The total number of edges in the region (used in logs or thresholds).
     :param limit:
-        A maximum recursion depth for how far we want to chain edges (avoid infinite recursion).
+        The maximum path length n we want to chain edges to (limitN, also capped by 
+        'max_homopath_length'). There is no recursion, so it can be well beyond 
+        Python's recursion limit.
     :param HoMoPaths_Dictionary:
         A dictionary storing discovered paths keyed by path length:
            { 0: [ [[edge_id], [objects]], ... ],
@@ -1657,6 +3661,9 @@ def calculate_obj_id_intersection(
              ...
            }
         If None, we initialize it in this function.
+    :param object_sets:
+        State of the object-set backend (see 'object_set_backend') carried from one level 
+        to the next by the adjacency engine. If None, it is built when first needed.
 
     Returns:
     --------
@@ -1664,244 +3671,123 @@ def calculate_obj_id_intersection(
         The updated dictionary that includes all discovered homopaths up to path length n.
     """
 
-    # -------------------------------------------------------------------------
-    # 1) Initialize the dictionary that will store discovered homopaths if none is provided.
-    # -------------------------------------------------------------------------
+    # Run all levels; every level is added to the dictionary as soon as it is complete
+    for HoMoPaths_Dictionary, _, _ in homopath_levels(
+            region_ID, raw_or_hashed, permutations, edge_connections, objs_in_edge,
+            Single_Frequent_objs_in_edge, total_obj_count, threshold, n,
+            length_of_permutations, help_for_jaccard, NumOfEdges, limit,
+            HoMoPaths_Dictionary, object_sets):
+        pass
+
+    return HoMoPaths_Dictionary
+
+
+# 5.4.1
+def homopath_levels(region_ID, raw_or_hashed, permutations, edge_connections, objs_in_edge,
+                    Single_Frequent_objs_in_edge, total_obj_count, threshold, n,
+                    length_of_permutations, help_for_jaccard, NumOfEdges, limit,
+                    HoMoPaths_Dictionary=None, object_sets=None, write_logs=True):
+    """
+    Generator version of calculate_obj_id_intersection (same parameters).
+    With write_logs=False, the single/pair logs of the compare scripts and the max length of the
+    homopaths are not written (used when mining the homopath lattice, see 5.1.1: the max length
+    is printed once, by _homopaths_from_lattice, for the threshold actually filtered).
+
+    Homopaths are grown level by level with a loop instead of self-recursion: the frontier
+    (the paths found at level n, i.e. Edge_Object_Mapping) is the only input of level n+1 and
+    is replaced by the new frontier once that level is complete, so only one frontier is alive
+    at a time besides HoMoPaths_Dictionary itself.
+
+    :yield:
+        A tuple (HoMoPaths_Dictionary, n, paths_of_level_n) after every level n. The list of 
+        level n is pruned in place (sub-paths removed) once level n+1 is computed.
+    """
     if HoMoPaths_Dictionary is None:
         HoMoPaths_Dictionary = {}
+    if object_sets is None:
+        object_sets = {}
 
-    # Boolean_HoMoPathway_Matrix will be our 2D "table" to mark intersections >= threshold.
-    Boolean_HoMoPathway_Matrix = []
+    frontier = objs_in_edge
+    while True:
+        HoMoPaths_Dictionary, frontier, Single_Frequent_objs_in_edge, edge_connections = _calculate_homopath_level(
+            region_ID, raw_or_hashed, permutations, edge_connections, frontier,
+            Single_Frequent_objs_in_edge, total_obj_count, threshold, n,
+            length_of_permutations, help_for_jaccard, NumOfEdges,
+            HoMoPaths_Dictionary, object_sets, write_logs
+        )
 
-    # edge_connections_for_next_Lenght accumulates the edges that remain relevant for the
-    # next recursion level (n+1).
-    edge_connections_for_next_Lenght = {}
+        yield HoMoPaths_Dictionary, n, HoMoPaths_Dictionary.get(n, [])
 
-    # Edge_Object_Mapping will store newly discovered (path, object_set) pairs in this recursion step.
-    # Edge_Object_Mapping_Single_Freq_Edges is the single-edge frequent edges (from n=1).
-    Edge_Object_Mapping = []
-    Edge_Object_Mapping_Single_Freq_Edges = []
+        # Stop once no new paths were found or the maximum path length is reached
+        if len(frontier) == 0 or n >= limit or (max_homopath_length is not None and n >= max_homopath_length):
+            if write_logs:
+                print(f"\tMax length of HoMoPaths for Regional Leader {region_ID} is :  {n - 1}")
+            return
+        n = int(n) + 1
 
-    # obj_ids_on_edge: dictionary mapping 'edge_id' => [objIDs]
-    # This helps quick lookup for each edge's object set.
-    obj_ids_on_edge = {}
-    for edge_data in objs_in_edge:
-        edge_id = tuple(edge_data[0])  # We treat [edge_id] as a tuple for dict key
-        if raw_or_hashed == 0:
-            # raw => second element is the list of object IDs
-            obj_ids = edge_data[1]
-        else:
-            # hashed => structure depends on n
-            #   if n == 1 => [ [edge_id], number_of_Raw_ObjIDs, [hashed_objs] ]
-            #   if n > 1  => [ [edge_id], [hashed_objs] ]
-            if n == 1:
-                num_real_obj_ids = edge_data[1]  # not used for intersection, but stored
-                obj_ids = edge_data[2]
-            else:
-                obj_ids = edge_data[1]
-        obj_ids_on_edge[edge_id] = obj_ids
 
-    # obj_ids_on_edge_SingleFrequent: similar dictionary for the Single_Frequent_objs_in_edge list
-    obj_ids_on_edge_SingleFrequent = {}
-    for edge_data in Single_Frequent_objs_in_edge:
-        edge_id = tuple(edge_data[0])
-        if raw_or_hashed == 0:
-            obj_ids = edge_data[1]
-        else:
-            if n == 1:
-                num_real_obj_ids = edge_data[1]
-                obj_ids = edge_data[2]
-            else:
-                obj_ids = edge_data[1]
-        obj_ids_on_edge_SingleFrequent[edge_id] = obj_ids
+# 5.4.2
+def _calculate_homopath_level(
+    region_ID,
+    raw_or_hashed,
+    permutations,
+    edge_connections,
+    objs_in_edge,
+    Single_Frequent_objs_in_edge,
+    total_obj_count,
+    threshold,
+    n,
+    length_of_permutations,
+    help_for_jaccard,
+    NumOfEdges,
+    HoMoPaths_Dictionary,
+    object_sets,
+    write_logs=True
+):
+    """
+    Computes level n of homopath_levels(...): expands objs_in_edge (the paths of level n-1,
+    or the single edges if n == 1) by one edge, prunes level n-1 and writes the logs of
+    this level. Same parameters as calculate_obj_id_intersection.
+
+    :return:
+        A tuple (HoMoPaths_Dictionary, Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges,
+        edge_connections_for_next_Lenght): the paths of level n are the frontier of level n+1.
+    """
 
     # -------------------------------------------------------------------------
-    # 2) Prepare a list of all edge IDs from 'edge_connections' for the horizontal axis.
-    #    We'll build a 2D matrix: 
-    #      rows => items from objs_in_edge (vertical), 
-    #      cols => edge_ids from edge_connections (horizontal).
+    # 2) + 3) Expand the current level: every path (or edge, if n == 1) in
+    #    objs_in_edge is extended with the edges that meet the threshold.
+    #    The expansion engine is selected by 'expansion_engine' (see the top of the file);
+    #    both engines fill HoMoPaths_Dictionary identically.
     # -------------------------------------------------------------------------
-    edge_ids = list(edge_connections.keys())
-
-    # Build a matrix of size ( len(objs_in_edge)+1 ) x ( len(edge_ids)+1 ).
-    # The first row/column are headers storing edge IDs or path IDs for reference.
-    Boolean_HoMoPathway_Matrix = [
-        [0 for _ in range(len(edge_ids) + 1)]
-        for _ in range(len(objs_in_edge) + 1)
-    ]
+    if expansion_engine == "matrix":
+        Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght = _expand_level_matrix(
+            raw_or_hashed, permutations, edge_connections, objs_in_edge,
+            Single_Frequent_objs_in_edge, total_obj_count, threshold, n, HoMoPaths_Dictionary
+        )
+    else:
+        level_counts = {}
+        Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght = _expand_level_adjacency(
+            raw_or_hashed, permutations, edge_connections, objs_in_edge,
+            Single_Frequent_objs_in_edge, total_obj_count, threshold, n, HoMoPaths_Dictionary,
+            object_sets, level_counts
+        )
 
-    # Fill the 2D matrix with appropriate row/column headers.
-    for i in range(len(objs_in_edge) + 1):
-        for j in range(len(edge_ids) + 1):
-            if i == 0 and j != 0:
-                # top row: store each edge_id from edge_ids
-                Boolean_HoMoPathway_Matrix[i][j] = edge_ids[j - 1]
-            if j == 0 and i != 0:
-                # left column: store the "edge/path" from objs_in_edge
-                Boolean_HoMoPathway_Matrix[i][j] = objs_in_edge[i - 1][0]
+        # Pruned-vs-evaluated candidates of this level
+        # (candidates == evaluated + pruned_infrequent_edge + pruned_loop + pruned_suffix)
+        if apriori_pruning:
+            with region_log_lock:
+                with open("Current_Experiment_Pruning_Report.txt", 'a') as pruning_file:
+                    pruning_file.write(
+                        f"{region_ID},{raw_or_hashed},{threshold},{permutations},{n},{level_counts['candidates']},"
+                        f"{level_counts['evaluated']},{level_counts['pruned_infrequent_edge']},"
+                        f"{level_counts['pruned_loop']},{level_counts['pruned_suffix']}\n"
+                    )
 
     # -------------------------------------------------------------------------
-    # 3) Fill in the matrix:  check intersection ratio for each cell (i, j)
-    # -------------------------------------------------------------------------
-    #   - If n < 2 => we are dealing with single edges (i.e., "homoedges").
-    #   - If n >= 2 => we try to chain edges from the vertical axis to the 
-    #     newly considered edges in the horizontal axis.
-    # -------------------------------------------------------------------------
-    for i in range(1, len(objs_in_edge) + 1):    # Rows (vertical)
-        for j in range(1, len(edge_ids) + 1):    # Columns (horizontal)
-            intersected_objs = []
-            paths_for_next_Round = []
-
-            # -------------------------------------------------------------
-            # CASE n < 2 => single-edge scenario (finding edges that meet threshold).
-            # -------------------------------------------------------------
-            if n < 2:
-                # If the "row-edge" ID matches the "column-edge" ID
-                if (Boolean_HoMoPathway_Matrix[i][0][0]
-                        == Boolean_HoMoPathway_Matrix[0][j]):
-
-                    obj_ids_edge_1 = obj_ids_on_edge[
-                        tuple(Boolean_HoMoPathway_Matrix[i][0])
-                    ]
-
-                    # Intersection for single edges is effectively 
-                    # just the number of objects on that edge
-                    intersected_objs.append(obj_ids_edge_1)
-                    intersection = len(set(obj_ids_edge_1))
-
-                    # If hashed data, we might use "number_of_Raw_ObjIDs" 
-                    # that we previously stored for single edges
-                    if raw_or_hashed == 1:
-                        for info_data in objs_in_edge:
-                            if info_data[0][0] == Boolean_HoMoPathway_Matrix[0][j]:
-                                intersection = info_data[1]  
-                                threshold_final = threshold
-                                break
-                    else:
-                        threshold_final = threshold
-
-                    ratio = intersection / total_obj_count
-
-                    # If the ratio >= threshold, we mark matrix cell as "1" (pass)
-                    if ratio >= threshold_final:
-                        Boolean_HoMoPathway_Matrix[i][j] = 1
-
-                        # The path here is just the single edge
-                        for path in Boolean_HoMoPathway_Matrix[i][0]:
-                            paths_for_next_Round.append(path)
-
-                        # Store the discovered "homoedge" in Edge_Object_Mapping
-                        Edge_Object_Mapping.append([paths_for_next_Round, obj_ids_edge_1])
-
-                        # If n==1, also store it under (n-1) => 0 
-                        # so that the dictionary has single edges in the correct slot
-                        if n == 1:
-                            HoMoPaths_Dictionary.setdefault(n - 1, []).append(
-                                [paths_for_next_Round, obj_ids_edge_1]
-                            )
-
-                        # Also store for n => 1
-                        HoMoPaths_Dictionary.setdefault(n, []).append(
-                            [paths_for_next_Round, obj_ids_edge_1]
-                        )
-
-                        # Keep track of single freq edges
-                        Edge_Object_Mapping_Single_Freq_Edges.append(
-                            [paths_for_next_Round, obj_ids_edge_1]
-                        )
-
-                        # Add the current edge to possible expansions 
-                        # for next recursion step
-                        for key in edge_connections:
-                            if paths_for_next_Round[-1] == key:
-                                edge_connections_for_next_Lenght[key] = edge_connections[key]
-
-                        # We break after the match to not re-check the same cell
-                        break
-
-            # -------------------------------------------------------------
-            # CASE n >= 2 => chain edges from path (vertical) to new edge (horizontal).
-            # -------------------------------------------------------------
-            else:
-                # Reuse the single frequent edges from prior steps
-                Edge_Object_Mapping_Single_Freq_Edges = Single_Frequent_objs_in_edge
-
-                # For the path on the vertical axis, get the last edge
-                # (the "tail" of the path) and see if it connects to 
-                # the edge on the horizontal axis
-                for key, values in edge_connections.items():
-                    if key == Boolean_HoMoPathway_Matrix[i][0][-1]:
-                        # 'key' is the last edge in the vertical path
-                        for edgecon in values:
-                            if edgecon == Boolean_HoMoPathway_Matrix[0][j]:
-                                # We found that edgecon (horizontal) connects 
-                                # to the last edge in vertical path
-                                # so let's compute intersection
-                                # Retrieve object sets for the vertical path
-                                for info in objs_in_edge:
-                                    if info[0] == Boolean_HoMoPathway_Matrix[i][0]:
-                                        obj_ids_edge_1 = info[1]  # raw or hashed
-                                        break
-
-                                # object sets for the horizontal edge
-                                for info in Single_Frequent_objs_in_edge:
-                                    if info[0][0] == Boolean_HoMoPathway_Matrix[0][j]:
-                                        obj_ids_edge_2 = info[1]
-                                        break
-
-                                # For raw data => intersect sets directly
-                                # For hashed => we store hashed signature (or partial).
-                                # The code below does direct element-by-element comparison 
-                                # but for hashed minhash, typically you'd do a Jaccard estimate. 
-                                # Here, the user code lumps it as "if raw/hashing => compute differently".
-                                for obj1 in obj_ids_edge_1:
-                                    for obj2 in obj_ids_edge_2:
-                                        if obj1 == obj2:
-                                            intersected_objs.append(obj1)
-                                            break
-
-                                # Decide the denominator for intersection ratio
-                                if raw_or_hashed == 1:
-                                    # For hashed, we treat 'permutations' as denominator
-                                    x = permutations
-                                else:
-                                    # For raw, we treat 'total_obj_count' as denominator
-                                    x = total_obj_count
-
-                                intersection = len(intersected_objs)
-                                if (intersection / x) >= threshold:
-                                    Boolean_HoMoPathway_Matrix[i][j] = 1
-
-                                    # Avoid loops: 
-                                    # if the new edge is already in the path, skip
-                                    if (key != edgecon and
-                                        Boolean_HoMoPathway_Matrix[0][j]
-                                        in Boolean_HoMoPathway_Matrix[i][0]):
-                                        continue
-
-                                    # Build the extended path
-                                    for path in Boolean_HoMoPathway_Matrix[i][0]:
-                                        paths_for_next_Round.append(path)
-                                    paths_for_next_Round.append(Boolean_HoMoPathway_Matrix[0][j])
-
-                                    # Save the new path in the dictionary
-                                    HoMoPaths_Dictionary.setdefault(n, []).append(
-                                        [paths_for_next_Round, intersected_objs]
-                                    )
-
-                                    # Keep track to extend further in next recursion
-                                    Edge_Object_Mapping.append([paths_for_next_Round, intersected_objs])
-
-                                    # Mark the connection relevant for the next round
-                                    for key1 in edge_connections:
-                                        if len(paths_for_next_Round) > 0:
-                                            if paths_for_next_Round[-1] == key1:
-                                                edge_connections_for_next_Lenght[key1] = edge_connections[key1]
-
-    # -------------------------------------------------------------------------
-    # 4) If 'help_for_jaccard == 1' and we have raw vs hashed validations:
-    #    There's code to dump/load JSON from files to reconcile data 
-    #    for certain region IDs. This is mostly debugging or cross-check logic.
+    # 4) If 'help_for_jaccard == 1' and we have raw vs hashed validations:
+    #    There's code to dump/load JSON from files to reconcile data 
+    #    for certain region IDs. This is mostly debugging or cross-check logic.
     # -------------------------------------------------------------------------
     if help_for_jaccard == 1 and raw_or_hashed == 0 and n == 1:
         # If region_ID in {11,21,10,122,222,112,212}, we save certain data structures.
@@ -1968,14 +3854,20 @@ def calculate_obj_id_intersection(
 
     #username = input("\n A:")
     # Prunning all the n
+    # Every (n-1)-edge sub-path (shingle) of a path of length n is removed from level n-1.
+    # The shingles go into one set of tuples, then level n-1 is filtered in a single pass
+    # (in place, since the list may already have been handed out by homopath_levels).
     if int(n) > 1 and int(n) in HoMoPaths_Dictionary:
+        sub_shingles = set()
         for path in HoMoPaths_Dictionary[int(n)]:
-            for i in range(len(path[0]) - (int(n) - 1)):
-                sub_shinglees = [path[0][i:i + int(n) - 1] for i in range(len(path[0]) - (int(n) - 2))]
-                for sub_shingle in sub_shinglees:
-                    for path2 in HoMoPaths_Dictionary[int(n) - 1]:
-                        if sub_shingle == path2[0]:
-                            HoMoPaths_Dictionary[int(n) - 1].remove(path2)
+            for i in range(len(path[0]) - (int(n) - 2)):
+                sub_shingles.add(tuple(path[0][i:i + int(n) - 1]))
+
+        if int(n) - 1 in HoMoPaths_Dictionary:
+            HoMoPaths_Dictionary[int(n) - 1][:] = [
+                path2 for path2 in HoMoPaths_Dictionary[int(n) - 1]
+                if tuple(path2[0]) not in sub_shingles
+            ]
 
     # Similarly, if help_for_jaccard == 1 and raw_or_hashed == 1 and n == 1, 
     # the code attempts to load raw data from JSON and align it with hashed data,
@@ -2219,56 +4111,727 @@ def calculate_obj_id_intersection(
     # 5) Additional formatting for single-edge or pair-of-edges if n==1 or n==2, 
     #    appended to "Current_Experiment_Compare_RAW_HASh_NEW..." logs
     # -------------------------------------------------------------------------
+    if write_logs:
+        _write_level_logs(region_ID, HoMoPaths_Dictionary, n, help_for_jaccard,
+                          total_obj_count, threshold, NumOfEdges, permutations)
+
+    # -------------------------------------------------------------------------
+    # 6) The new paths (Edge_Object_Mapping) are the frontier of the next level,
+    #    computed by homopath_levels(...) (no recursion).
+    # -------------------------------------------------------------------------
+    # (A fixed 1s delay per level used to be here)
+    record_removed_sleep("calculate_obj_id_intersection levels", 1)
+
+    return HoMoPaths_Dictionary, Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght
+
+
+
+
+
+
+
+
+# 5.4.3
+def _write_level_logs(region_ID, HoMoPaths_Dictionary, n, help_for_jaccard,
+                      total_obj_count, threshold, NumOfEdges, permutations):
+    """
+    Appends the single edges (n == 1) or the pairs of edges (n == 2) of HoMoPaths_Dictionary
+    to the "Current_Experiment_Compare_RAW_HASh_NEW..." logs read by the compare scripts.
+    """
     # E.g., writing discovered single edges or pairs to a text file 
     # for offline analysis.
-    if help_for_jaccard != 1 and n ==1 :
-        formatted_paths_single = ','.join(['[{}]'.format(','.join(map(str, sub_paths_list[0]))) for index, complete_data in enumerate(HoMoPaths_Dictionary.values()) if index == 1  for sub_paths_list in complete_data ])
-        #fileofexperiments.write(formatted_paths_single)
+    # The log files are shared by all regions (threads or worker processes)
+    with region_log_lock:
+        if help_for_jaccard != 1 and n ==1 :
+            formatted_paths_single = ','.join(['[{}]'.format(','.join(map(str, sub_paths_list[0]))) for index, complete_data in enumerate(HoMoPaths_Dictionary.values()) if index == 1  for sub_paths_list in complete_data ])
+            #fileofexperiments.write(formatted_paths_single)
         
-        with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_single.txt", 'a') as fileofexperiments:
-            if len(formatted_paths_single)>0:
-                fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_single}\n")
+            with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_single.txt", 'a') as fileofexperiments:
+                if len(formatted_paths_single)>0:
+                    fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_single}\n")
+                else:
+                    fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{[0]}\n")
+        if  n ==2 :    
+            formatted_paths_pairs = ','.join(['[{}]'.format(','.join(map(str, sub_paths_list[0]))) for index, complete_data in enumerate(HoMoPaths_Dictionary.values()) if index == 2  for sub_paths_list in complete_data ])
+            #fileofexperiments.write(formatted_paths_pairs)
+            with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_pairs.txt", 'a') as fileofexperiments:
+                if len(formatted_paths_pairs)>0:
+                    fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_pairs}\n")
+                else: 
+                    fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{[0]}\n")
+
+
+# 5.5
+def _expand_level_matrix(raw_or_hashed, permutations, edge_connections, objs_in_edge,
+                         Single_Frequent_objs_in_edge, total_obj_count, threshold, n,
+                         HoMoPaths_Dictionary):
+    """
+    Original expansion step of calculate_obj_id_intersection, based on the dense 
+    Boolean_HoMoPathway_Matrix (rows = current paths/edges, columns = candidate edges).
+    Kept for comparison runs with expansion_engine = "matrix".
+
+    :return:
+        A tuple (Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght)
+        describing the paths found at level n, the single frequent edges and the
+        connections that stay relevant for level n+1.
+    """
+
+    # Boolean_HoMoPathway_Matrix will be our 2D "table" to mark intersections >= threshold.
+    Boolean_HoMoPathway_Matrix = []
+
+    # edge_connections_for_next_Lenght accumulates the edges that remain relevant for the
+    # next recursion level (n+1).
+    edge_connections_for_next_Lenght = {}
+
+    # Edge_Object_Mapping will store newly discovered (path, object_set) pairs in this recursion step.
+    # Edge_Object_Mapping_Single_Freq_Edges is the single-edge frequent edges (from n=1).
+    Edge_Object_Mapping = []
+    Edge_Object_Mapping_Single_Freq_Edges = []
+
+    # obj_ids_on_edge: dictionary mapping 'edge_id' => [objIDs]
+    # This helps quick lookup for each edge's object set.
+    obj_ids_on_edge = {}
+    for edge_data in objs_in_edge:
+        edge_id = tuple(edge_data[0])  # We treat [edge_id] as a tuple for dict key
+        if raw_or_hashed == 0:
+            # raw => second element is the list of object IDs
+            obj_ids = edge_data[1]
+        else:
+            # hashed => structure depends on n
+            #   if n == 1 => [ [edge_id], number_of_Raw_ObjIDs, [hashed_objs] ]
+            #   if n > 1  => [ [edge_id], [hashed_objs] ]
+            if n == 1:
+                num_real_obj_ids = edge_data[1]  # not used for intersection, but stored
+                obj_ids = edge_data[2]
             else:
-                fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{[0]}\n")
-    if  n ==2 :    
-        formatted_paths_pairs = ','.join(['[{}]'.format(','.join(map(str, sub_paths_list[0]))) for index, complete_data in enumerate(HoMoPaths_Dictionary.values()) if index == 2  for sub_paths_list in complete_data ])
-        #fileofexperiments.write(formatted_paths_pairs)
-        with open("Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_pairs.txt", 'a') as fileofexperiments:
-            if len(formatted_paths_pairs)>0:
-                fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{formatted_paths_pairs}\n")
-            else: 
-                fileofexperiments.write(f"{total_obj_count},{threshold},{NumOfEdges},{permutations},{current_compress},{region_ID},{[0]}\n")
- 
+                obj_ids = edge_data[1]
+        obj_ids_on_edge[edge_id] = obj_ids
 
+    # obj_ids_on_edge_SingleFrequent: similar dictionary for the Single_Frequent_objs_in_edge list
+    obj_ids_on_edge_SingleFrequent = {}
+    for edge_data in Single_Frequent_objs_in_edge:
+        edge_id = tuple(edge_data[0])
+        if raw_or_hashed == 0:
+            obj_ids = edge_data[1]
+        else:
+            if n == 1:
+                num_real_obj_ids = edge_data[1]
+                obj_ids = edge_data[2]
+            else:
+                obj_ids = edge_data[1]
+        obj_ids_on_edge_SingleFrequent[edge_id] = obj_ids
+
+    # -------------------------------------------------------------------------
+    # 2) Prepare a list of all edge IDs from 'edge_connections' for the horizontal axis.
+    #    We'll build a 2D matrix: 
+    #      rows => items from objs_in_edge (vertical), 
+    #      cols => edge_ids from edge_connections (horizontal).
+    # -------------------------------------------------------------------------
+    edge_ids = list(edge_connections.keys())
+
+    # Build a matrix of size ( len(objs_in_edge)+1 ) x ( len(edge_ids)+1 ).
+    # The first row/column are headers storing edge IDs or path IDs for reference.
+    Boolean_HoMoPathway_Matrix = [
+        [0 for _ in range(len(edge_ids) + 1)]
+        for _ in range(len(objs_in_edge) + 1)
+    ]
 
+    # Fill the 2D matrix with appropriate row/column headers.
+    for i in range(len(objs_in_edge) + 1):
+        for j in range(len(edge_ids) + 1):
+            if i == 0 and j != 0:
+                # top row: store each edge_id from edge_ids
+                Boolean_HoMoPathway_Matrix[i][j] = edge_ids[j - 1]
+            if j == 0 and i != 0:
+                # left column: store the "edge/path" from objs_in_edge
+                Boolean_HoMoPathway_Matrix[i][j] = objs_in_edge[i - 1][0]
 
     # -------------------------------------------------------------------------
-    # 6) RECURSION: If we discovered new paths (Edge_Object_Mapping not empty),
-    #    and haven't hit the 'limit', recursively call the function with n+1 
-    #    to attempt to chain edges further.
+    # 3) Fill in the matrix:  check intersection ratio for each cell (i, j)
     # -------------------------------------------------------------------------
-    time.sleep(1)  # Simulate or slow down recursion for debug
-    
-    limit =100
-    if len(Edge_Object_Mapping) > 0 and n < limit:
-        calculate_obj_id_intersection(
-            region_ID, raw_or_hashed, permutations, edge_connections_for_next_Lenght,
-            Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges,
-            total_obj_count, threshold,int(n) + 1, length_of_permutations,
-            help_for_jaccard, NumOfEdges, limit, HoMoPaths_Dictionary
-        )
+    #   - If n < 2 => we are dealing with single edges (i.e., "homoedges").
+    #   - If n >= 2 => we try to chain edges from the vertical axis to the 
+    #     newly considered edges in the horizontal axis.
+    # -------------------------------------------------------------------------
+    for i in range(1, len(objs_in_edge) + 1):    # Rows (vertical)
+        for j in range(1, len(edge_ids) + 1):    # Columns (horizontal)
+            intersected_objs = []
+            paths_for_next_Round = []
+
+            # -------------------------------------------------------------
+            # CASE n < 2 => single-edge scenario (finding edges that meet threshold).
+            # -------------------------------------------------------------
+            if n < 2:
+                # If the "row-edge" ID matches the "column-edge" ID
+                if (Boolean_HoMoPathway_Matrix[i][0][0]
+                        == Boolean_HoMoPathway_Matrix[0][j]):
+
+                    obj_ids_edge_1 = obj_ids_on_edge[
+                        tuple(Boolean_HoMoPathway_Matrix[i][0])
+                    ]
+
+                    # Intersection for single edges is effectively 
+                    # just the number of objects on that edge
+                    intersected_objs.append(obj_ids_edge_1)
+                    intersection = len(set(obj_ids_edge_1))
+
+                    # If hashed data, we might use "number_of_Raw_ObjIDs" 
+                    # that we previously stored for single edges
+                    if raw_or_hashed == 1:
+                        for info_data in objs_in_edge:
+                            if info_data[0][0] == Boolean_HoMoPathway_Matrix[0][j]:
+                                intersection = info_data[1]  
+                                threshold_final = threshold
+                                break
+                    else:
+                        threshold_final = threshold
+
+                    ratio = intersection / total_obj_count
+
+                    # If the ratio >= threshold, we mark matrix cell as "1" (pass)
+                    if ratio >= threshold_final:
+                        Boolean_HoMoPathway_Matrix[i][j] = 1
+
+                        # The path here is just the single edge
+                        for path in Boolean_HoMoPathway_Matrix[i][0]:
+                            paths_for_next_Round.append(path)
+
+                        # Store the discovered "homoedge" in Edge_Object_Mapping
+                        Edge_Object_Mapping.append([paths_for_next_Round, obj_ids_edge_1])
+
+                        # If n==1, also store it under (n-1) => 0 
+                        # so that the dictionary has single edges in the correct slot
+                        if n == 1:
+                            HoMoPaths_Dictionary.setdefault(n - 1, []).append(
+                                [paths_for_next_Round, obj_ids_edge_1]
+                            )
+
+                        # Also store for n => 1
+                        HoMoPaths_Dictionary.setdefault(n, []).append(
+                            [paths_for_next_Round, obj_ids_edge_1]
+                        )
+
+                        # Keep track of single freq edges
+                        Edge_Object_Mapping_Single_Freq_Edges.append(
+                            [paths_for_next_Round, obj_ids_edge_1]
+                        )
+
+                        # Add the current edge to possible expansions 
+                        # for next recursion step
+                        for key in edge_connections:
+                            if paths_for_next_Round[-1] == key:
+                                edge_connections_for_next_Lenght[key] = edge_connections[key]
+
+                        # We break after the match to not re-check the same cell
+                        break
+
+            # -------------------------------------------------------------
+            # CASE n >= 2 => chain edges from path (vertical) to new edge (horizontal).
+            # -------------------------------------------------------------
+            else:
+                # Reuse the single frequent edges from prior steps
+                Edge_Object_Mapping_Single_Freq_Edges = Single_Frequent_objs_in_edge
+
+                # For the path on the vertical axis, get the last edge
+                # (the "tail" of the path) and see if it connects to 
+                # the edge on the horizontal axis
+                for key, values in edge_connections.items():
+                    if key == Boolean_HoMoPathway_Matrix[i][0][-1]:
+                        # 'key' is the last edge in the vertical path
+                        for edgecon in values:
+                            if edgecon == Boolean_HoMoPathway_Matrix[0][j]:
+                                # We found that edgecon (horizontal) connects 
+                                # to the last edge in vertical path
+                                # so let's compute intersection
+                                # Retrieve object sets for the vertical path
+                                for info in objs_in_edge:
+                                    if info[0] == Boolean_HoMoPathway_Matrix[i][0]:
+                                        obj_ids_edge_1 = info[1]  # raw or hashed
+                                        break
+
+                                # object sets for the horizontal edge
+                                for info in Single_Frequent_objs_in_edge:
+                                    if info[0][0] == Boolean_HoMoPathway_Matrix[0][j]:
+                                        obj_ids_edge_2 = info[1]
+                                        break
+
+                                # For raw data => intersect sets directly
+                                # For hashed => we store hashed signature (or partial).
+                                # The code below does direct element-by-element comparison 
+                                # but for hashed minhash, typically you'd do a Jaccard estimate. 
+                                # Here, the user code lumps it as "if raw/hashing => compute differently".
+                                for obj1 in obj_ids_edge_1:
+                                    for obj2 in obj_ids_edge_2:
+                                        if obj1 == obj2:
+                                            intersected_objs.append(obj1)
+                                            break
+
+                                # Decide the denominator for intersection ratio
+                                if raw_or_hashed == 1:
+                                    # For hashed, we treat 'permutations' as denominator
+                                    x = permutations
+                                else:
+                                    # For raw, we treat 'total_obj_count' as denominator
+                                    x = total_obj_count
+
+                                intersection = len(intersected_objs)
+                                if (intersection / x) >= threshold:
+                                    Boolean_HoMoPathway_Matrix[i][j] = 1
+
+                                    # Avoid loops: 
+                                    # if the new edge is already in the path, skip
+                                    if (key != edgecon and
+                                        Boolean_HoMoPathway_Matrix[0][j]
+                                        in Boolean_HoMoPathway_Matrix[i][0]):
+                                        continue
+
+                                    # Build the extended path
+                                    for path in Boolean_HoMoPathway_Matrix[i][0]:
+                                        paths_for_next_Round.append(path)
+                                    paths_for_next_Round.append(Boolean_HoMoPathway_Matrix[0][j])
+
+                                    # Save the new path in the dictionary
+                                    HoMoPaths_Dictionary.setdefault(n, []).append(
+                                        [paths_for_next_Round, intersected_objs]
+                                    )
+
+                                    # Keep track to extend further in next recursion
+                                    Edge_Object_Mapping.append([paths_for_next_Round, intersected_objs])
+
+                                    # Mark the connection relevant for the next round
+                                    for key1 in edge_connections:
+                                        if len(paths_for_next_Round) > 0:
+                                            if paths_for_next_Round[-1] == key1:
+                                                edge_connections_for_next_Lenght[key1] = edge_connections[key1]
+
+    return Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght
+
+
+# 5.6
+def _expand_level_adjacency(raw_or_hashed, permutations, edge_connections, objs_in_edge,
+                            Single_Frequent_objs_in_edge, total_obj_count, threshold, n,
+                            HoMoPaths_Dictionary, object_sets, level_counts):
+    """
+    Adjacency-driven expansion step of calculate_obj_id_intersection.
+
+    Instead of filling a (paths+1) x (edges+1) matrix, every path only looks at the
+    successors of its tail edge. Object lists are indexed once per level by path tuple
+    and by edge ID, so each candidate costs one dictionary lookup plus one intersection.
+    Paths are visited in the same order as the matrix rows/columns, therefore
+    HoMoPaths_Dictionary is filled exactly as with _expand_level_matrix.
+
+    For raw data, the intersections run on the object sets of 'object_set_backend'.
+    For hashed data, all successors of a path are tested at once on the signature
+    matrix selected by 'signature_agreement'.
+    'object_sets' keeps those sets between levels: the single frequent edges
+    (object_sets["edges"]) and the paths of the current level (object_sets["paths"]).
+
+    With 'apriori_pruning', candidates that cannot be frequent are skipped before their
+    intersection is computed. 'level_counts' is filled in place with the number of
+    candidates, of evaluated intersections, of successors skipped because they would
+    close a loop and of candidates pruned by each rule.
+
+    :return:
+        A tuple (Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght).
+    """
+
+    Edge_Object_Mapping = []
+    edge_connections_for_next_Lenght = {}
+
+    level_counts.update(candidates=0, evaluated=0, pruned_infrequent_edge=0,
+                        pruned_loop=0, pruned_suffix=0)
+
+    # -------------------------------------------------------------------------
+    # CASE n < 2 => single edges ("homoedges"), checked row by row.
+    # -------------------------------------------------------------------------
+    if n < 2:
+        Edge_Object_Mapping_Single_Freq_Edges = []
+
+        # edge_id => object list (the last line of an edge wins, as in the matrix engine)
+        # edge_id => number_of_Raw_ObjIDs for hashed data (the first line wins)
+        obj_ids_on_edge = {}
+        raw_counts_on_edge = {}
+        for edge_data in objs_in_edge:
+            edge_id = edge_data[0][0]
+            if raw_or_hashed == 0:
+                obj_ids_on_edge[edge_id] = edge_data[1]
+            else:
+                obj_ids_on_edge[edge_id] = edge_data[2]
+                raw_counts_on_edge.setdefault(edge_id, edge_data[1])
+
+        for edge_data in objs_in_edge:
+            edge_id = edge_data[0][0]
+            if edge_id not in edge_connections:
+                continue
+
+            level_counts["candidates"] += 1
+            level_counts["evaluated"] += 1
+
+            obj_ids_edge_1 = obj_ids_on_edge[edge_id]
+            if raw_or_hashed == 1:
+                intersection = raw_counts_on_edge[edge_id]
+            else:
+                intersection = len(set(obj_ids_edge_1))
+
+            if intersection / total_obj_count >= threshold:
+                paths_for_next_Round = list(edge_data[0])
+                Edge_Object_Mapping.append([paths_for_next_Round, obj_ids_edge_1])
+                if n == 1:
+                    HoMoPaths_Dictionary.setdefault(n - 1, []).append([paths_for_next_Round, obj_ids_edge_1])
+                HoMoPaths_Dictionary.setdefault(n, []).append([paths_for_next_Round, obj_ids_edge_1])
+                Edge_Object_Mapping_Single_Freq_Edges.append([paths_for_next_Round, obj_ids_edge_1])
+                edge_connections_for_next_Lenght[edge_id] = edge_connections[edge_id]
+
+        return Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght
+
+    # -------------------------------------------------------------------------
+    # CASE n >= 2 => extend every path with the successors of its tail edge.
+    # -------------------------------------------------------------------------
+    Edge_Object_Mapping_Single_Freq_Edges = Single_Frequent_objs_in_edge
+
+    # Position of every candidate edge in edge_connections ("column order" of the matrix engine)
+    column_position = {edge_id: position for position, edge_id in enumerate(edge_connections)}
+
+    # Raw object sets are intersected with the NumPy backend (5.7), unless "list" is selected
+    use_object_sets = raw_or_hashed == 0 and object_set_backend != "list"
+    # Hashed signatures are compared on the signature matrix (5.8), unless "list" is selected
+    use_signatures = raw_or_hashed == 1 and signature_agreement != "list"
+
+    if use_object_sets:
+        if "paths" not in object_sets:
+            _init_object_sets(object_sets, objs_in_edge, Single_Frequent_objs_in_edge)
+        universe = object_sets["universe"]
+        obj_ids_on_path = object_sets["paths"]
+        obj_ids_on_single_edge = object_sets["edges"]
+        next_level_sets = {}
+    elif use_signatures:
+        if "paths" not in object_sets:
+            _init_signature_matrix(object_sets, objs_in_edge, Single_Frequent_objs_in_edge)
+        obj_ids_on_path = object_sets["paths"]
+        obj_ids_on_single_edge = object_sets["edge_rows"]
+        next_level_sets = {}
     else:
-        # Once no more new edges or we exceed recursion limit, we finalize.
-        print(f"\tMax length of HoMoPaths for Regional Leader {region_ID} is :  {n - 1}")
+        # path tuple => object list of that path (the first entry wins)
+        obj_ids_on_path = {}
+        for info in objs_in_edge:
+            obj_ids_on_path.setdefault(tuple(info[0]), info[1])
+
+        # edge_id => set of objects on that single frequent edge (the first entry wins)
+        obj_ids_on_single_edge = {}
+        for info in Single_Frequent_objs_in_edge:
+            if info[0][0] not in obj_ids_on_single_edge:
+                obj_ids_on_single_edge[info[0][0]] = set(info[1])
+
+    # Denominator of the intersection ratio
+    if raw_or_hashed == 1:
+        x = permutations
+    else:
+        x = total_obj_count
+
+    # Paths of the previous level, for the (n-1)-suffix rule (exact for raw data only)
+    use_suffix_rule = apriori_pruning and raw_or_hashed == 0 and n > 2
+    if use_suffix_rule:
+        frequent_paths = {tuple(info[0]) for info in objs_in_edge}
+
+    # tail edge => its successors that are candidate edges, in column order
+    successors_of_tail = {}
+
+    for info in objs_in_edge:
+        path = info[0]
+        tail = path[-1]
+        if tail not in edge_connections:
+            continue
+
+        if tail not in successors_of_tail:
+            successors_of_tail[tail] = sorted(
+                (edgecon for edgecon in edge_connections[tail] if edgecon in column_position),
+                key=column_position.__getitem__
+            )
+        level_counts["candidates"] += len(edge_connections[tail])
+        # Successors that are not candidate edges of this level are infrequent
+        level_counts["pruned_infrequent_edge"] += len(edge_connections[tail]) - len(successors_of_tail[tail])
+
+        # Successors that are single frequent edges.
+        # Avoid loops: if the new edge is already in the path, skip
+        candidates = []
+        for edgecon in successors_of_tail[tail]:
+            if edgecon not in obj_ids_on_single_edge:
+                level_counts["pruned_infrequent_edge"] += 1
+            elif tail != edgecon and edgecon in path:
+                level_counts["pruned_loop"] += 1
+            else:
+                candidates.append(edgecon)
+        if not candidates:
+            continue
+
+        obj_ids_edge_1 = obj_ids_on_path[tuple(path)]
+
+        if apriori_pruning:
+            # path[1:] + [edgecon] has at least the objects of path + [edgecon]:
+            # if it was not frequent at level n-1, path + [edgecon] is not frequent either
+            if use_suffix_rule:
+                kept = [edgecon for edgecon in candidates
+                        if tuple(path[1:]) + (edgecon,) in frequent_paths]
+                level_counts["pruned_suffix"] += len(candidates) - len(kept)
+                candidates = kept
+
+            if not candidates:
+                continue
+        level_counts["evaluated"] += len(candidates)
+
+        # One (intersection size, intersected objects) pair per candidate
+        if use_signatures:
+            extensions = _extend_path_signatures(object_sets, obj_ids_edge_1, candidates)
+        elif use_object_sets:
+            extensions = []
+            for edgecon in candidates:
+                intersected_set = _intersect_object_sets(obj_ids_edge_1, obj_ids_on_single_edge[edgecon], len(universe))
+                extensions.append((_object_set_size(intersected_set), intersected_set))
+        else:
+            extensions = []
+            for edgecon in candidates:
+                obj_ids_edge_2 = obj_ids_on_single_edge[edgecon]
+                intersected_objs = [obj1 for obj1 in obj_ids_edge_1 if obj1 in obj_ids_edge_2]
+                extensions.append((len(intersected_objs), intersected_objs))
 
-    return HoMoPaths_Dictionary
+        for edgecon, (intersection, intersected_objs) in zip(candidates, extensions):
+            if intersection / x >= threshold:
+                paths_for_next_Round = path + [edgecon]
+                if use_object_sets:
+                    next_level_sets[tuple(paths_for_next_Round)] = intersected_objs
+                    intersected_objs = _object_set_to_list(intersected_objs, universe)
+                elif use_signatures:
+                    next_level_sets[tuple(paths_for_next_Round)] = intersected_objs
+                    intersected_objs = _signature_state_to_list(intersected_objs)
+
+                HoMoPaths_Dictionary.setdefault(n, []).append([paths_for_next_Round, intersected_objs])
+                Edge_Object_Mapping.append([paths_for_next_Round, intersected_objs])
+                edge_connections_for_next_Lenght[edgecon] = edge_connections[edgecon]
+
+    if use_object_sets or use_signatures:
+        # Only the sets of the new level are needed from now on
+        object_sets["paths"] = next_level_sets
+
+    return Edge_Object_Mapping, Edge_Object_Mapping_Single_Freq_Edges, edge_connections_for_next_Lenght
+
+
+# 5.7
+# Object sets used by the adjacency engine for raw data. Raw object IDs are mapped to dense
+# IDs 0..U-1 (their position in the sorted 'universe'), then every set is stored either as
+#   - a sorted uint32 array of dense IDs (sparse sets), or
+#   - a packed uint8 bitset of U bits (dense sets),
+# depending on 'object_set_backend'. The dtype tells the two representations apart.
 
+# Number of 1-bits of every byte value, used to count the members of a packed bitset
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
 
 
+def _init_object_sets(object_sets, objs_in_edge, Single_Frequent_objs_in_edge):
+    """
+    Builds the object-set state of the adjacency engine from the object lists of the
+    current paths (objs_in_edge) and of the single frequent edges.
+
+    :param object_sets:
+        Dictionary filled in place with:
+          "universe" => sorted array of all raw object IDs (dense ID = position),
+          "edges"    => { edge_id: object set },
+          "paths"    => { path tuple: object set }.
+    """
+    all_objs = [obj for info in objs_in_edge for obj in info[1]]
+    all_objs += [obj for info in Single_Frequent_objs_in_edge for obj in info[1]]
+    universe = np.unique(np.array(all_objs, dtype=np.int64))
+
+    object_sets["universe"] = universe
+    object_sets["edges"] = {}
+    object_sets["paths"] = {}
+    for info in Single_Frequent_objs_in_edge:
+        if info[0][0] not in object_sets["edges"]:
+            object_sets["edges"][info[0][0]] = _make_object_set(info[1], universe)
+    for info in objs_in_edge:
+        if tuple(info[0]) not in object_sets["paths"]:
+            object_sets["paths"][tuple(info[0])] = _make_object_set(info[1], universe)
+
+
+def _make_object_set(obj_ids, universe):
+    """
+    Converts a list of raw object IDs into an object set over 'universe'.
+    """
+    dense_ids = np.searchsorted(universe, np.array(obj_ids, dtype=np.int64))
+    dense_ids = np.unique(dense_ids).astype(np.uint32)
+    return _compact_object_set(dense_ids, len(universe))
 
 
+def _compact_object_set(dense_ids, universe_size):
+    """
+    Chooses the representation of a set of (sorted, unique) dense object IDs.
+    With "auto", a bitset is used when it is not larger than the array, i.e. when
+    at least one object in 32 belongs to the set.
+    """
+    if object_set_backend == "bitset" or (
+            object_set_backend == "auto" and dense_ids.size * 32 >= universe_size):
+        bits = np.zeros(universe_size, dtype=bool)
+        bits[dense_ids] = True
+        return np.packbits(bits)
+    return dense_ids
 
 
+def _object_set_size(object_set):
+    """
+    Number of objects in an object set (popcount for bitsets).
+    """
+    if object_set.dtype == np.uint8:
+        return int(_POPCOUNT_TABLE[object_set].sum(dtype=np.int64))
+    return int(object_set.size)
+
+
+def _bitset_contains(bitset, dense_ids):
+    """
+    Boolean mask telling which of 'dense_ids' are members of 'bitset' (np.packbits bit order).
+    """
+    return ((bitset[dense_ids >> 3] >> (7 - (dense_ids & 7)).astype(np.uint8)) & 1).astype(bool)
+
+
+def _intersect_object_sets(set_1, set_2, universe_size):
+    """
+    Intersection of two object sets:
+      - bitset & bitset => bitwise AND
+      - array  & bitset => the array entries whose bit is set
+      - array  & array  => galloping search of the smaller array into the larger one
+                           when their sizes are far apart, np.intersect1d otherwise
+    """
+    is_bitset_1 = set_1.dtype == np.uint8
+    is_bitset_2 = set_2.dtype == np.uint8
+
+    if is_bitset_1 and is_bitset_2:
+        result = np.bitwise_and(set_1, set_2)
+        if object_set_backend == "auto" and _object_set_size(result) * 32 < universe_size:
+            # The intersection became sparse: switch to the array representation
+            result = np.flatnonzero(np.unpackbits(result, count=universe_size)).astype(np.uint32)
+        return result
+
+    if is_bitset_1 or is_bitset_2:
+        bitset, dense_ids = (set_1, set_2) if is_bitset_1 else (set_2, set_1)
+        return dense_ids[_bitset_contains(bitset, dense_ids)]
+
+    small, large = (set_1, set_2) if set_1.size <= set_2.size else (set_2, set_1)
+    if small.size == 0:
+        return small
+    if small.size * 16 < large.size:
+        positions = np.searchsorted(large, small)
+        positions[positions == large.size] = 0
+        return small[large[positions] == small]
+    return np.intersect1d(small, large, assume_unique=True)
+
+
+def _object_set_to_list(object_set, universe):
+    """
+    Converts an object set back to a sorted list of raw object IDs (the format of HoMoPaths_Dictionary).
+    """
+    if object_set.dtype == np.uint8:
+        dense_ids = np.flatnonzero(np.unpackbits(object_set, count=len(universe)))
+    else:
+        dense_ids = object_set
+    return universe[dense_ids].tolist()
+
+
+# 5.8
+# Signature matrix used by the adjacency engine for hashed data.
+# Every single frequent edge gets a row of an (edges x permutations) uint32 matrix. A path is
+# kept as (base signature, packed bitmask over the positions of the base signature):
+#   - "membership": base = object list of the path when the state was created; a position
+#                   survives while its minhash appears in the signature of every new edge
+#   - "positional": base = signature row of the first edge; a position survives while every
+#                   new edge has the same minhash at that position
+
+
+def _init_signature_matrix(object_sets, objs_in_edge, Single_Frequent_objs_in_edge):
+    """
+    Builds the signature matrix of the single frequent edges and the states of the
+    current paths (objs_in_edge).
+
+    :param object_sets:
+        Dictionary filled in place with:
+          "edge_rows"         => { edge_id: row of the edge in the matrix } (the first entry wins),
+          "signature_matrix"  => (edges x permutations) uint32 matrix (used by "positional"),
+          "signature_lengths" => real length of every row (shorter rows are padded),
+          "signature_keys"    => sorted (row << 32 | minhash) keys (used by "membership"),
+          "paths"             => { path tuple: (base signature, packed bitmask) }.
+    """
+    edge_rows = {}
+    signatures = []
+    for info in Single_Frequent_objs_in_edge:
+        if info[0][0] not in edge_rows:
+            edge_rows[info[0][0]] = len(signatures)
+            signatures.append(np.array(info[1], dtype=np.uint32))
+
+    width = max((signature.size for signature in signatures), default=0)
+    signature_matrix = np.zeros((len(signatures), width), dtype=np.uint32)
+    signature_lengths = np.zeros(len(signatures), dtype=np.int64)
+    for row, signature in enumerate(signatures):
+        signature_matrix[row, :signature.size] = signature
+        signature_lengths[row] = signature.size
+
+    rows = np.repeat(np.arange(len(signatures), dtype=np.int64), signature_lengths)
+    values = np.concatenate(signatures).astype(np.int64) if signatures else np.zeros(0, dtype=np.int64)
+
+    object_sets["edge_rows"] = edge_rows
+    object_sets["signature_matrix"] = signature_matrix
+    object_sets["signature_lengths"] = signature_lengths
+    object_sets["signature_keys"] = np.unique((rows << 32) | values)
+    object_sets["paths"] = {}
+
+    for info in objs_in_edge:
+        path = tuple(info[0])
+        if path in object_sets["paths"]:
+            continue
+
+        if signature_agreement == "positional" and all(edge in edge_rows for edge in path):
+            head_row = edge_rows[path[0]]
+            base = signature_matrix[head_row]
+            agreement = np.arange(width) < signature_lengths[head_row]
+            for edge in path[1:]:
+                agreement &= signature_matrix[edge_rows[edge]] == base
+                agreement &= np.arange(width) < signature_lengths[edge_rows[edge]]
+        else:
+            base = np.array(info[1], dtype=np.uint32)
+            agreement = np.ones(base.size, dtype=bool)
+        object_sets["paths"][path] = (base, np.packbits(agreement))
+
+
+def _extend_path_signatures(object_sets, path_state, candidates):
+    """
+    Extends one path with all its candidate edges at once: one vectorized compare
+    (candidates x positions), one AND with the bitmask of the path and one popcount.
+
+    :return:
+        A list with one (agreeing positions, new path state) pair per candidate.
+    """
+    base, path_mask = path_state
+    candidate_rows = np.array([object_sets["edge_rows"][edgecon] for edgecon in candidates], dtype=np.int64)
+
+    if signature_agreement == "positional" and base.size == object_sets["signature_matrix"].shape[1]:
+        agreement = object_sets["signature_matrix"][candidate_rows] == base[None, :]
+        agreement &= np.arange(base.size)[None, :] < object_sets["signature_lengths"][candidate_rows, None]
+    else:
+        # Is base[p] in the signature of the candidate? => look up (row << 32 | base[p])
+        signature_keys = object_sets["signature_keys"]
+        queries = (candidate_rows[:, None] << 32) | base.astype(np.int64)[None, :]
+        positions = np.searchsorted(signature_keys, queries)
+        positions[positions == signature_keys.size] = 0
+        agreement = signature_keys[positions] == queries if signature_keys.size else np.zeros(queries.shape, dtype=bool)
+
+    masks = np.packbits(agreement, axis=1) & path_mask[None, :]
+    counts = _POPCOUNT_TABLE[masks].sum(axis=1, dtype=np.int64)
+    return [(int(counts[i]), (base, masks[i])) for i in range(len(candidates))]
+
+
+def _signature_state_to_list(path_state):
+    """
+    Converts a path state back to its list of minhashes (the format of HoMoPaths_Dictionary).
+    """
+    base, path_mask = path_state
+    return base[np.unpackbits(path_mask, count=base.size).astype(bool)].tolist()
+
 
 #   C O H E N    2  #
 
@@ -2294,6 +4857,19 @@ def _Find_Cardinality_Cohen(combined_data, num_perm, remove_extra_Integ):
         across all items in 'combined_data'.
     """
 
+    # The minhash signatures of the items, as a (items x permutations) matrix,
+    # and Cohen's estimate from its column-wise minima
+    listOfMinhash_sign = _cohen_signatures(combined_data, remove_extra_Integ)
+    cardinality = cohen_cardinality(cohen_column_minima(listOfMinhash_sign), num_perm)
+
+    # Return as an integer (coerced from float if needed)
+    return int(cardinality)
+
+
+def _cohen_signatures(combined_data, remove_extra_Integ):
+    """
+    Extracts the minhash signatures of the items of 'combined_data' (see _Find_Cardinality_Cohen).
+    """
     listOfMinhash_sign = []
 
     # Iterate over each item in 'combined_data' to extract its minhash signature
@@ -2310,12 +4886,7 @@ def _Find_Cardinality_Cohen(combined_data, num_perm, remove_extra_Integ):
             if len(item) == 3:  # Safety check
                 minHashSignatures = item[2]
                 listOfMinhash_sign.append(minHashSignatures)
-
-    # Once we accumulate all minhash signatures, we call _Cohen to compute the cardinality
-    cardinality = _Cohen(listOfMinhash_sign, num_perm)
-
-    # Return as an integer (coerced from float if needed)
-    return int(cardinality)
+    return listOfMinhash_sign
 
 
 def _Cohen(listOfMinhash_sign, num_perm):
@@ -2336,17 +4907,49 @@ def _Cohen(listOfMinhash_sign, num_perm):
         A float approximating the cardinality of the union of all sets from which the minhash signatures 
         were derived. (Typically, you'll cast or convert to int.)
     """
+    return cohen_cardinality(cohen_column_minima(listOfMinhash_sign), num_perm)
 
-    # First, we transpose the list so each column of 'listOfMinhash_sign' becomes a row in 'transposed_matrix'.
-    # That is, we regroup the Nth hash values from each signature into one column.
-    transposed_matrix = list(zip(*listOfMinhash_sign))
 
-    # For each column in the transposed matrix, find the minimum value.
-    # (In Cohen's method, we use these column-minimums as a basis for the estimate.)
-    min_values = [min(column) for column in transposed_matrix]
+def cohen_column_minima(listOfMinhash_sign):
+    """
+    Column-wise minima of the minhash signatures: the Nth value is the minimum of the Nth hash
+    values of all the signatures (as the transposed list + min of every column used to be).
+    The signatures are one (signatures x permutations) matrix, uint32 when the values fit.
+    As with zip(*...), the columns beyond the shortest signature are ignored.
 
-    # Sum those minimum values
-    total_sum = sum(min_values)
+    :return: a NumPy array of length 'permutations'. Minima are mergeable: the minima of the union
+             of several groups of signatures are merge_cohen_minima of the minima of every group.
+    """
+    if len(listOfMinhash_sign) == 0:
+        return np.zeros(0, dtype=np.uint32)
+    length = min(len(signature) for signature in listOfMinhash_sign)
+    try:
+        matrix = np.array([signature[:length] for signature in listOfMinhash_sign], dtype=np.int64)
+    except OverflowError:
+        # Values beyond 64 bits: Python integers, column by column
+        return np.array([min(column) for column in zip(*listOfMinhash_sign)], dtype=object)
+    if matrix.size and matrix.min() >= 0 and matrix.max() <= 0xFFFFFFFF:
+        matrix = matrix.astype(np.uint32)
+    return matrix.min(axis=0)
+
+
+def merge_cohen_minima(minima_list):
+    """
+    Merges the column-wise minima of several groups of signatures (e.g. of several regions)
+    into the minima of all of them.
+    """
+    if not minima_list:
+        return np.zeros(0, dtype=np.uint32)
+    length = min(len(minima) for minima in minima_list)
+    return np.min(np.vstack([np.asarray(minima)[:length] for minima in minima_list]), axis=0)
+
+
+def cohen_cardinality(min_values, num_perm):
+    """
+    Cohen's estimate of the number of objects from the column-wise minima of the signatures.
+    """
+    # Sum those minimum values (as Python integers, exactly)
+    total_sum = sum(np.asarray(min_values).tolist())
 
     # `_max_hash` is presumably a global or previously defined constant indicating
     # the maximum possible 32-bit integer (e.g., 2^32 - 1). 
@@ -2359,6 +4962,21 @@ def _Cohen(listOfMinhash_sign, num_perm):
     return cardinality
 
 
+def read_cohen_minima(sensors_file_path):
+    """
+    Column-wise minima of the signatures of a hashed sensors file
+    (lines: edge_id, number_of_Raw_ObjIDs, hashed_obj_1, ...), for the Top Leader (request 12).
+    """
+    listOfMinhash_sign = []
+    if os.path.exists(sensors_file_path):
+        with open(sensors_file_path, 'r') as file:
+            for line in file:
+                parts = line.strip().split(',')
+                if len(parts) > 2:
+                    listOfMinhash_sign.append(list(map(int, parts[2:])))
+    return cohen_column_minima(listOfMinhash_sign)
+
+
 
 
 
@@ -2577,12 +5195,21 @@ def main(raw_or_hashed, seed, current_compress, permutations, num_objs, length_o
         # This dictionary describes how each region connects to others at a higher scale
         all_connections = create_RegionConnections_for_Top_Leader()
 
+        # Boundary edges of every region, given to the Regional Leaders at startup (see homopath_publication)
+        regional_boundary_edges = find_regional_boundary_edges(all_connections)
+
         # Convert raw_or_hashed to a human-readable string if needed
         if raw_or_hashed == 0:
             raw_or_hashed_string = "RAW"
         else:
             raw_or_hashed_string = "HASHED"
 
+        # Clear any shared global lists or counters before starting the Top Leader,
+        # which waits on them
+        clear_lists()
+        removed_sleep_seconds.clear()
+        run_start_time = time.time()
+
         # 4) Launch the Top Leader in its own thread
         result_queue = queue.Queue()
         top_leader_thread = threading.Thread(
@@ -2594,49 +5221,66 @@ def main(raw_or_hashed, seed, current_compress, permutations, num_objs, length_o
 
     
 
-        # Clear any shared global lists or counters before starting regional threads
-        clear_lists()
+        # Worker processes for the regional computation (see 'use_process_pool')
+        global regional_process_pool
+        if use_process_pool:
+            pool_context = multiprocessing.get_context(pool_start_method)
+            workers = regional_workers or min(len(clean_regionids), os.cpu_count() or 1)
+            regional_process_pool = ProcessPoolExecutor(
+                max_workers=max(workers, 1),
+                mp_context=pool_context,
+                initializer=_init_region_worker,
+                initargs=(raw_or_hashed, current_compress, pool_context.Lock(), _region_worker_settings())
+            )
 
         # 5) Create a thread for each Regional Leader
         regional_threads = []
+        regional_ready_events = []
         for regionID in clean_regionids:
             # Each region thread runs start_regional_leader(...) 
             # which sets up a server socket and processes local homopaths.
+            # Its event is set once the region's server socket is listening.
+            ready_event = threading.Event()
             regional_thread = threading.Thread(
                 target=start_regional_leader,
-                args=(regionID, threshold, threading.Event(), raw_or_hashed,
+                args=(regionID, threshold, ready_event, raw_or_hashed,
                       permutations, current_compress, length_of_permutations,
-                      help_for_jaccard, limitN)
+                      help_for_jaccard, limitN,
+                      regional_boundary_edges.get(regionID, (set(), set())))
             )
             regional_thread.start()
             regional_threads.append(regional_thread)
+            regional_ready_events.append((ready_event, regional_thread))
 
-        # Some sleeps to ensure the threads fully start, or to let them proceed 
-        # in the correct order
-        if raw_or_hashed == 0:
-            time.sleep(10)
-        else:
-            time.sleep(5)
+        # Wait until every region is up and running (instead of a fixed 10s/5s sleep).
+        # A thread that ended without setting its event (e.g. an exception) is not waited for.
+        for ready_event, regional_thread in regional_ready_events:
+            while not ready_event.wait(timeout=1) and regional_thread.is_alive():
+                pass
+        record_removed_sleep("main start of regional leaders", 10 if raw_or_hashed == 0 else 5)
 
         # 6) Wait for all regional threads to finish
         for thread in regional_threads:
             thread_complete()    # Possibly a method that signals "thread done"
-            time.sleep(1)
             thread.join()
-            time.sleep(1)
+            record_removed_sleep("main joins", 2)
 
         # 7) Now wait for the Top Leader thread to finish
         top_leader_thread.join()
         thread_complete()
 
+        # All regions have returned their results => stop the worker processes
+        if regional_process_pool is not None:
+            regional_process_pool.shutdown()
+            regional_process_pool = None
+
         # 8) Retrieve the result from the Top Leader
         resultttt = result_queue.get()
         thread_init()  # Possibly re-initialize any global counters after threads
+        record_removed_sleep("main end of run", 2)
 
-        if raw_or_hashed == 0:
-            time.sleep(2)
-        else:
-            time.sleep(2)
+        write_timing_report(time.time() - run_start_time, raw_or_hashed, threshold,
+                            current_compress, permutations)
 
         #print(f"Result in main in homopa : {resultttt}")
 
@@ -2666,6 +5310,9 @@ if __name__ == "__main__":
     repeat_experiment = int(sys.argv[12])
     limitN = int(sys.argv[13])
     folderOfRepeatExperiment = str(sys.argv[14])
+    # Optional: lowest threshold of the sweep, to mine the homopath lattice once
+    if len(sys.argv) > 15:
+        lattice_threshold = float(sys.argv[15])
 
     resultttt = main(raw_or_hashed, seed, current_compress, num_of_permutations, 
                      num_objs, length_of_path, threshold, depth, help_for_jaccard, 
@@ -1023,7 +1023,7 @@ def delete_files_except(run_once, History7z , threshold, f1, f2, f3, f4, f5, f6,
     files = [f for f in os.listdir('.') if f.startswith("map") and f.endswith(".txt")]
 
     for file in os.listdir():
-        if (run_once == 1 and file=="4_sensors.txt")or file=="Current_Experiment_Info.txt" or file.startswith("Regional_4_sensors") or file.startswith("4_sensors_HASHED_") or file.startswith("Regional_4_sensors_HASHED") or file =="ResultsOfExperiments.txt"  or (file.startswith("depth_") and file.endswith(".png")) or file =="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs.txt" or file == "RESULTS.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_pairs.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_single.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all.txt"  or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_allwithout_single.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs" or file =="correcthomoedges111.json"or file =="correcthomoedges112.json"or file =="correcthomoedges113.json"or file =="correcthomoedges211.json"or file =="correcthomoedges212.json"or file =="correcthomoedges213.json" or file =="correcthomoedges2.json"or file =="correcthomoedges3.json"or file =="correcthomoedges103.json" or file =="correcthomoedges102.json"or file =="correcthomoedges101.json"or file =="correcthomoedges2222.json"or file =="correcthomoedges2223.json"or file =="correcthomoedges2221.json" or file =="correcthomoedges1122.json"or file =="correcthomoedges1123.json"or file =="correcthomoedges1121.json" or file =="correcthomoedges1222.json"or file =="correcthomoedges1223.json"or file =="correcthomoedges1221.json" or file =="correcthomoedges2122.json"or file =="correcthomoedges2123.json"or file =="correcthomoedges2121.json"  or  file=="Current_Experiment_Top_Leader_flat_visualization_all_together.txt" or file =="Current_Experiment_Top_Leader_Reg_Leader_edges_costs.txt" or file =="Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt"  or file=="all_with_costs.txt" or file=="seeds.txt" or file=="Current_Experiment_Top_Leader_flat_visualization_per_Region_brackets.txt" or file == History7z or file == f1 or file ==f2 or file == f3 or file == f4 or file == f5 or file == f6 or file == f7 or file == f8 or  file == f9  or file in files or file == "analysis.py" or file=="seeds.txt" or file =="preparation.py":
+        if (run_once == 1 and file=="4_sensors.txt")or file=="Current_Experiment_Info.txt" or file.startswith("Regional_4_sensors") or file.startswith("Regional_Lattice") or file.startswith("4_sensors_HASHED_") or file.startswith("Regional_4_sensors_HASHED") or file =="ResultsOfExperiments.txt"  or (file.startswith("depth_") and file.endswith(".png")) or file =="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs.txt" or file == "RESULTS.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_pairs.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_single.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all.txt"  or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_allwithout_single.txt" or file=="Current_Experiment_Compare_RAW_HASh_NEW_formatted_paths_all_with_costs" or file =="correcthomoedges111.json"or file =="correcthomoedges112.json"or file =="correcthomoedges113.json"or file =="correcthomoedges211.json"or file =="correcthomoedges212.json"or file =="correcthomoedges213.json" or file =="correcthomoedges2.json"or file =="correcthomoedges3.json"or file =="correcthomoedges103.json" or file =="correcthomoedges102.json"or file =="correcthomoedges101.json"or file =="correcthomoedges2222.json"or file =="correcthomoedges2223.json"or file =="correcthomoedges2221.json" or file =="correcthomoedges1122.json"or file =="correcthomoedges1123.json"or file =="correcthomoedges1121.json" or file =="correcthomoedges1222.json"or file =="correcthomoedges1223.json"or file =="correcthomoedges1221.json" or file =="correcthomoedges2122.json"or file =="correcthomoedges2123.json"or file =="correcthomoedges2121.json"  or  file=="Current_Experiment_Top_Leader_flat_visualization_all_together.txt" or file =="Current_Experiment_Top_Leader_Reg_Leader_edges_costs.txt" or file =="Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt"  or file=="all_with_costs.txt" or file=="seeds.txt" or file=="Current_Experiment_Timing_Report.txt" or file=="Current_Experiment_Pruning_Report.txt" or file=="Current_Experiment_Top_Leader_flat_visualization_per_Region_brackets.txt" or file == History7z or file == f1 or file ==f2 or file == f3 or file == f4 or file == f5 or file == f6 or file == f7 or file == f8 or  file == f9  or file in files or file == "analysis.py" or file=="seeds.txt" or file =="preparation.py":
             #print(f"File: {file} remained untouched")
             continue
         else:
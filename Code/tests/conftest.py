@@ -0,0 +1,198 @@
+import copy
+import os
+import queue
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# The modules of the project are plain scripts in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import experiment_creator  # noqa: E402
+import homopa  # noqa: E402
+
+
+def make_region(seed, number_of_edges=25, number_of_objects=400, walk_length=6):
+    """
+    A raw region: every edge leads to 3 other edges, every object walks a few edges from one
+    of the first 5 edges, so the object sets of consecutive edges overlap and long paths exist.
+
+    :return: (edge_connections, objs_in_edge as read by prepare_data_from_file, number of objects)
+    """
+    rng = random.Random(seed)
+    edges = list(range(101, 101 + number_of_edges))
+    edge_connections = {edge: sorted(rng.sample([other for other in edges if other != edge], 3))
+                        for edge in edges}
+    objs = {edge: set() for edge in edges}
+    for obj in range(1, number_of_objects + 1):
+        edge = rng.choice(edges[:5])
+        for _ in range(rng.randint(1, walk_length)):
+            objs[edge].add(obj)
+            edge = rng.choice(edge_connections[edge])
+    objs_in_edge = [[[edge], sorted(objs[edge])] for edge in edges if objs[edge]]
+    return edge_connections, objs_in_edge, number_of_objects
+
+
+def hash_region(objs_in_edge, permutations, seed):
+    """The hashed lines of a raw region: [[edge], number of raw objects, minhash signature]."""
+    rng = np.random.default_rng(seed)
+    prime = (1 << 31) - 1
+    a = rng.integers(1, prime, permutations)
+    b = rng.integers(0, prime, permutations)
+    hashed = []
+    for path, obj_ids in objs_in_edge:
+        values = np.array(obj_ids, dtype=np.int64)
+        signature = ((a[None, :] * values[:, None] + b[None, :]) % prime).min(axis=0)
+        hashed.append([path, len(obj_ids), signature.tolist()])
+    return hashed
+
+
+def make_map(seed, number_of_regions=2, edges_per_region=15, number_of_objects=400, walk_length=8,
+             leaving_edges=None):
+    """
+    Raw regions of one map: every edge leads to 2 edges of its region and to 1 edge of another
+    region, every object walks a few edges from one of the first 5 edges of a region, so homopaths
+    of neighbouring regions meet across their boundary. With leaving_edges, only the last
+    leaving_edges edges of a region lead to another region (the others to 3 edges of their region),
+    so the regions also have interior homopaths.
+
+    :return: ({region: (edge_connections, objs_in_edge)}, all_connections as built by
+              create_RegionConnections_for_Top_Leader, number of objects)
+    """
+    rng = random.Random(seed)
+    regions = {region: list(range(100 * region + 1, 100 * region + 1 + edges_per_region))
+               for region in range(1, number_of_regions + 1)}
+    region_of_edge = {edge: region for region, edges in regions.items() for edge in edges}
+    successors = {}
+    for region, edges in regions.items():
+        other_edges = [edge for other, other_edges in regions.items() if other != region for edge in other_edges]
+        for position, edge in enumerate(edges):
+            if leaving_edges is None or position >= len(edges) - leaving_edges:
+                successors[edge] = rng.sample([other for other in edges if other != edge], 2) + [rng.choice(other_edges)]
+            else:
+                successors[edge] = rng.sample([other for other in edges if other != edge], 3)
+
+    objs = {edge: set() for edge in region_of_edge}
+    for obj in range(1, number_of_objects + 1):
+        edge = rng.choice(regions[rng.choice(list(regions))][:5])
+        for _ in range(rng.randint(1, walk_length)):
+            objs[edge].add(obj)
+            edge = rng.choice(successors[edge])
+
+    region_data = {}
+    all_connections = {}
+    for region, edges in regions.items():
+        edge_connections = {edge: sorted(next_edge for next_edge in successors[edge] if next_edge in edges)
+                            for edge in edges}
+        region_data[region] = (edge_connections, [[[edge], sorted(objs[edge])] for edge in edges if objs[edge]])
+        for edge in edges:
+            for next_edge in successors[edge]:
+                if region_of_edge[next_edge] != region:
+                    all_connections.setdefault(region, {}).setdefault(
+                        region_of_edge[next_edge], {}).setdefault(edge, []).append(next_edge)
+    return region_data, all_connections, number_of_objects
+
+
+@pytest.fixture
+def sensor_file(tmp_path):
+    """A raw sensor file: edge_id, obj1, obj2, ... (objects repeat over edges and within lines)."""
+    rng = random.Random(5)
+    lines = []
+    for edge in rng.sample(range(1, 500), 60):
+        objects = [rng.randint(1, 3000) for _ in range(rng.randint(1, 80))]
+        lines.append(f"{edge},{','.join(map(str, objects))}\n")
+    path = tmp_path / "4_sensors.txt"
+    path.write_text("".join(lines))
+    experiment_creator._signature_prefix_cache.clear()
+    return str(path)
+
+
+@pytest.fixture
+def raw_region():
+    return make_region(1)
+
+
+@pytest.fixture
+def hashed_region(raw_region):
+    edge_connections, objs_in_edge, number_of_objects = raw_region
+    return edge_connections, hash_region(objs_in_edge, 32, 3), number_of_objects
+
+
+@pytest.fixture
+def mine(monkeypatch, tmp_path):
+    """
+    Runs calculate_obj_id_intersection on a region with the given module settings
+    (e.g. expansion_engine="matrix"); the logs of the levels go to tmp_path.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(homopa, "current_compress", 1, raising=False)
+
+    def run(region, raw_or_hashed, threshold, permutations=32, limit=10, **settings):
+        edge_connections, objs_in_edge, number_of_objects = copy.deepcopy(region)
+        monkeypatch.setattr(homopa, "raw_or_hashed", raw_or_hashed, raising=False)
+        for name, value in settings.items():
+            monkeypatch.setattr(homopa, name, value)
+        return homopa.calculate_obj_id_intersection(
+            1, raw_or_hashed, permutations, edge_connections, objs_in_edge, objs_in_edge,
+            number_of_objects, threshold, 1, 0, 0, len(edge_connections), limit)
+
+    return run
+
+
+@pytest.fixture
+def top_leader(monkeypatch, tmp_path):
+    """
+    Runs start_Top_leader against Regional Leaders answered in the test process: every request
+    goes through answer_regional_request with the responses of the region (prepare_regional_responses).
+
+    run(regions, all_connections, threshold, **settings), regions = {region: homopath dictionary
+    (with objects) or None, ...}, returns:
+        (ResultsOfExperiments.txt without the execution time, C2Base_Total_Bytes,
+         [(region, request kind), ...] in the order they were sent)
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def run(regions, all_connections, threshold, raw_or_hashed=0, num_of_permutations=0, **settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(homopa, name, value)
+        boundary_edges = homopa.find_regional_boundary_edges(all_connections)
+        tries = {}
+        responses = {}
+        for region, homopaths in regions.items():
+            tries[region] = homopa.build_homopath_trie(homopaths) if homopaths else None
+            unique_objects = {obj for records in (homopaths or {}).values() for _, obj_ids in records
+                              for obj in obj_ids}
+            # Hashed data: the minima of the signatures of the edges, as read from the sensors file
+            cohen_minima = None
+            if raw_or_hashed == 1 and homopa.object_count_mode == "sketch" and homopaths:
+                cohen_minima = homopa.cohen_column_minima([obj_ids for _, obj_ids in homopaths[0]])
+            responses[region] = homopa.prepare_regional_responses(
+                tries[region], unique_objects, 0, boundary_edges.get(region, (set(), set())), cohen_minima)
+
+        sent = []
+
+        def send(region, request_kind, payload=b"", wait_for_response=True):
+            sent.append((region, request_kind))
+            if request_kind == homopa._MSG_SHUTDOWN:
+                return None, b""
+            return homopa.answer_regional_request(request_kind, payload, responses[region], tries[region])
+
+        monkeypatch.setattr(homopa, "_send_regional_message", send)
+        monkeypatch.setattr(homopa, "all_regions_counter", list(regions))
+        monkeypatch.setattr(homopa, "regions_ready_counter", [region for region in regions if regions[region]])
+        monkeypatch.setattr(homopa, "regions_without_Homopa_counter",
+                            [region for region in regions if not regions[region]])
+        for name in ("ResultsOfExperiments.txt", "Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt"):
+            (tmp_path / name).unlink(missing_ok=True)
+
+        homopa.start_Top_leader(list(regions), all_connections, threshold, 0, 1, num_of_permutations,
+                                raw_or_hashed, 0, queue.Queue())
+
+        results = [line for line in (tmp_path / "ResultsOfExperiments.txt").read_text().splitlines()
+                   if not line.startswith("Exec Time")]
+        costs = (tmp_path / "Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt").read_text()
+        return "\n".join(results), int(costs.split(",")[1]), sent
+
+    return run
@@ -0,0 +1,44 @@
+"""Apriori pruning of the adjacency engine: fewer candidates evaluated, the same homopaths."""
+import pytest
+
+
+def pruning_report(tmp_path):
+    with open(tmp_path / "Current_Experiment_Pruning_Report.txt") as report:
+        return [list(map(float, line.split(","))) for line in report]
+
+
+@pytest.mark.parametrize("backend", ["list", "auto"])
+@pytest.mark.parametrize("threshold", [0.02, 0.04, 0.08])
+def test_raw_apriori_finds_the_same_homopaths(raw_region, mine, backend, threshold):
+    without = mine(raw_region, 0, threshold, apriori_pruning=False, object_set_backend=backend)
+    assert mine(raw_region, 0, threshold, apriori_pruning=True, object_set_backend=backend) == without
+    # ... and the same as the matrix engine, which never prunes
+    assert mine(raw_region, 0, threshold, expansion_engine="matrix", object_set_backend="list") == without
+
+
+@pytest.mark.parametrize("agreement", ["list", "membership", "positional"])
+def test_hashed_apriori_finds_the_same_homopaths(hashed_region, mine, agreement):
+    for threshold in (0.1, 0.2):
+        without = mine(hashed_region, 1, threshold, apriori_pruning=False, signature_agreement=agreement)
+        assert mine(hashed_region, 1, threshold, apriori_pruning=True, signature_agreement=agreement) == without
+
+
+def test_suffix_rule_prunes_and_counts_add_up(raw_region, mine, tmp_path):
+    mine(raw_region, 0, 0.02, apriori_pruning=True)
+    rows = pruning_report(tmp_path)
+    assert rows
+    for region_ID, raw_or_hashed, threshold, permutations, n, candidates, evaluated, infrequent, loop, suffix in rows:
+        assert candidates == evaluated + infrequent + loop + suffix
+        if n <= 2:
+            assert suffix == 0
+    assert sum(row[9] for row in rows) > 0
+
+
+def test_suffix_rule_is_not_used_on_hashed_paths(hashed_region, mine, tmp_path):
+    mine(hashed_region, 1, 0.1, apriori_pruning=True)
+    assert all(row[9] == 0 for row in pruning_report(tmp_path))
+
+
+def test_no_report_without_apriori(raw_region, mine, tmp_path):
+    mine(raw_region, 0, 0.02, apriori_pruning=False)
+    assert not (tmp_path / "Current_Experiment_Pruning_Report.txt").exists()
@@ -0,0 +1,43 @@
+"""Bloom filters (requests 8 and 9) and the Bloom-filter semi-join of the Top Leader."""
+import numpy as np
+import pytest
+
+import homopa
+from conftest import make_map
+
+
+def test_bloom_filter_has_no_false_negatives():
+    rng = np.random.default_rng(1)
+    members = rng.choice(1 << 40, 500, replace=False).tolist()
+    bloom_filter = homopa.build_bloom_filter(members, bits_per_object=10, number_of_hashes=7)
+    assert homopa.bloom_filter_count(bloom_filter, members) == len(members)
+    # Repetitions are counted
+    assert homopa.bloom_filter_count(bloom_filter, members[:3] * 2) == 6
+    assert homopa.bloom_filter_count(bloom_filter, []) == 0
+
+    others = rng.choice(np.arange(1 << 41, (1 << 41) + 20000), 10000, replace=False).tolist()
+    false_positive_rate = homopa.bloom_filter_count(bloom_filter, others) / len(others)
+    assert false_positive_rate < 0.03
+
+
+def test_bloom_filter_header():
+    bloom_filter = homopa.build_bloom_filter([1, 2, 3], bits_per_object=10, number_of_hashes=4)
+    number_of_bits, number_of_hashes = homopa._BLOOM_HEADER.unpack_from(bloom_filter)
+    assert (number_of_bits, number_of_hashes) == (64, 4)
+    assert len(bloom_filter) == homopa._BLOOM_HEADER.size + number_of_bits // 8
+
+
+@pytest.mark.parametrize("compute_pushdown", [False, True])
+def test_semi_join_keeps_the_homopaths(mine, top_leader, compute_pushdown):
+    threshold = 0.04
+    region_data, all_connections, number_of_objects = make_map(2, number_of_regions=3)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+
+    results, _, _ = top_leader(regions, all_connections, threshold,
+                               compute_pushdown=compute_pushdown, bloom_prescreen=False)
+    screened_results, _, screened_sent = top_leader(regions, all_connections, threshold,
+                                                    compute_pushdown=compute_pushdown, bloom_prescreen=True)
+    assert "Total number of Span-HoMoPaths: 0" not in results
+    assert screened_results == results
+    assert {homopa._MSG_BLOOM_FILTERS, homopa._MSG_BLOOM_SCREEN} <= {kind for _, kind in screened_sent}
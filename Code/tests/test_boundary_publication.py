@@ -0,0 +1,125 @@
+"""Boundary-only publication of the homopaths (homopath_publication = "boundary", request 10)."""
+import re
+
+import numpy as np
+import pytest
+
+import homopa
+from conftest import make_map
+from test_wire_codec import HOMOPATHS, UNIQUE_OBJECTS
+
+
+def objects(*ranges):
+    return sorted(obj for first, last in ranges for obj in range(first, last + 1))
+
+
+# Region 1: path [1, 2] leaves through edge 2 to edge 10 of region 2.
+# Region 2: path [10, 11, 12] enters it; the join appends edge 10 only (edge 11 has 3 of the 10
+# objects of path1) and stores the rest (11, 12), which is also an interior homopath of region 2,
+# as are the homoedge [12] (the rest after [10, 11]) and [13, 14], recorded twice.
+COLLIDING_REGIONS = {
+    1: {0: [[[1], objects((1, 10))], [[2], objects((1, 10))]],
+        1: [[[1], objects((1, 10))], [[2], objects((1, 10))]],
+        2: [[[1, 2], objects((1, 10))]]},
+    2: {0: [[[10], objects((1, 10))], [[11], objects((1, 3), (11, 20))], [[12], objects((11, 20))],
+            [[13], objects((11, 20))], [[14], objects((11, 20))]],
+        1: [[[10], objects((1, 10))], [[12], objects((11, 20))], [[13], objects((11, 20))]],
+        2: [[[11, 12], objects((11, 20))], [[13, 14], objects((11, 20))], [[13, 14], objects((11, 20))]],
+        3: [[[10, 11, 12], objects((1, 3))]]},
+}
+COLLIDING_CONNECTIONS = {1: {2: {2: [10]}}}
+
+
+def listed_homopaths(results):
+    """The totals of ResultsOfExperiments.txt and {(region, region2): {listed paths}}."""
+    lines = results.splitlines()
+    listed = {}
+    for line in lines:
+        if re.fullmatch(r"\d+", line):
+            region_id = int(line)
+        match = re.fullmatch(r" {4}(\d+): (.*)", line)
+        if match:
+            listed[(region_id, int(match.group(1)))] = set(re.findall(r"\[[^\]]*\]", match.group(2)))
+    return lines[:3], listed
+
+
+def assert_same_results(top_leader, regions, all_connections, threshold):
+    full = top_leader(regions, all_connections, threshold, homopath_publication="full")
+    boundary = top_leader(regions, all_connections, threshold, homopath_publication="boundary")
+    full_totals, full_listed = listed_homopaths(full[0])
+    boundary_totals, boundary_listed = listed_homopaths(boundary[0])
+    assert boundary_totals == full_totals
+    assert boundary[1] < full[1]
+    # The interior homopaths are stored after the join: the same homopaths are listed
+    assert boundary_listed == full_listed
+    return full_totals
+
+
+def test_boundary_view_keeps_every_key():
+    dictionary = {0: [[1], [2]], 2: [[1, 2], [2, 3]], 3: [[1, 2, 3]]}
+    view, interior = homopa.boundary_homopath_view(dictionary, ({3}, {9}))
+    assert view == {0: [], 2: [[2, 3]], 3: [[1, 2, 3]]}
+    assert interior == {0: 2, 2: 1}
+
+
+def test_boundary_view_only_publishes_the_boundary_homopaths():
+    dictionary = {key: [path for path, _ in records] for key, records in COLLIDING_REGIONS[2].items()}
+    view, interior = homopa.boundary_homopath_view(dictionary, (set(), {10}))
+    # The rests of [10, 11, 12] and the path recorded twice are interior homopaths too
+    assert view == {0: [[10]], 1: [[10]], 2: [], 3: [[10, 11, 12]]}
+    assert interior == {0: 4, 1: 2, 2: 3}
+
+
+def test_interior_counts_with_boundary_publication(monkeypatch):
+    monkeypatch.setattr(homopa, "homopath_publication", "boundary")
+    trie = homopa.build_homopath_trie(HOMOPATHS)
+    # Only edge 5 leaves the region, nothing enters it
+    responses = homopa.prepare_regional_responses(trie, UNIQUE_OBJECTS, 42, boundary_edges=({5}, set()))
+    monkeypatch.setattr(homopa, "_send_regional_message",
+                        lambda region, kind, payload=b"", wait_for_response=True:
+                        homopa.answer_regional_request(kind, payload, responses, trie))
+    assert homopa.send_request_to_regional_leader(3, 10, None) == {
+        "0": [[5]], "1": [[5]], "2": [[2, 5]], "3": [[1, 2, 5]]}
+    assert homopa.send_request_to_regional_leader(10, 10, None) == {0: 2, 1: 2, 2: 1}
+    # The whole dictionary, for the output files
+    assert homopa.send_request_to_regional_leader(13, 10, None) == {
+        str(key): [path for path, _ in records] for key, records in HOMOPATHS.items()}
+    np.testing.assert_equal(homopa.send_request_to_regional_leader(2, 10, [1]), [10, 11, 12])
+
+
+def test_colliding_interior_homopaths_are_counted_once(top_leader):
+    totals = assert_same_results(top_leader, COLLIDING_REGIONS, COLLIDING_CONNECTIONS, 0.5)
+    # Counting every interior homopath of region 2 would give 14
+    assert totals[1:] == ["Total number of Span-HoMoPaths: 4", "Total number of HoMoPaths : 11"]
+
+
+def test_output_files_keep_interior_homopaths(top_leader, tmp_path):
+    output_files = ("Current_Experiment_Top_Leader_flat_visualization_per_Region_brackets.txt",
+                    "Current_Experiment_Top_Leader_flat_visualization_all_together.txt",
+                    "Current_Experiment_Top_Leader_Reg_Leader_edges_costs.txt")
+    written = {}
+    for publication in ("full", "boundary"):
+        top_leader(COLLIDING_REGIONS, COLLIDING_CONNECTIONS, 0.5, homopath_publication=publication)
+        written[publication] = [(tmp_path / name).read_text() for name in output_files]
+        for name in output_files:
+            (tmp_path / name).unlink()
+
+    # The per-region files list the interior homopaths of region 2 as well
+    brackets, all_together, edges_costs = written["boundary"]
+    assert brackets == written["full"][0]
+    assert brackets.splitlines()[1].endswith(",2,[10],[12],[13],[11,12],[13,14],[13,14],[10,11,12]")
+    assert all_together == written["full"][1]
+    # Only the bytes sent for the spanning detection (second column) differ
+    full_edges_costs = written["full"][2]
+    assert edges_costs.split(",", 2)[2] == full_edges_costs.split(",", 2)[2]
+    assert int(edges_costs.split(",")[1]) < int(full_edges_costs.split(",")[1])
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_total_number_of_homopaths_is_the_same(mine, top_leader, seed):
+    threshold = 0.02
+    region_data, all_connections, number_of_objects = make_map(seed, number_of_regions=3, leaving_edges=3)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+    totals = assert_same_results(top_leader, regions, all_connections, threshold)
+    assert totals[1] != "Total number of Span-HoMoPaths: 0"
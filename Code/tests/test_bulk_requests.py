@@ -0,0 +1,35 @@
+"""Bulk requests of object sets (request 6) in the spanning join of the Top Leader."""
+import pytest
+
+import homopa
+from conftest import make_map
+
+
+def test_bulk_round_trip():
+    requests = [(1, [1, 2, 5]), (2, [7]), (1, [])]
+    assert homopa.decode_bulk_request(homopa.encode_bulk_request(requests)) == requests
+
+    payloads = [homopa.encode_int_array([1, 2]), None, homopa.encode_int_array([]), None]
+    assert homopa.decode_bulk_response(homopa.encode_bulk_response(payloads)) == payloads
+    assert homopa.decode_bulk_response(homopa.encode_bulk_response([])) == []
+
+
+@pytest.mark.parametrize("threshold", [0.02, 0.04])
+def test_bulk_requests_send_the_object_sets_of_the_join(mine, top_leader, threshold):
+    region_data, all_connections, number_of_objects = make_map(1, number_of_regions=3)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+
+    results, costs, sent = top_leader(regions, all_connections, threshold,
+                                      bulk_object_requests=False, compute_pushdown=False)
+    bulk_results, bulk_costs, bulk_sent = top_leader(regions, all_connections, threshold,
+                                                     bulk_object_requests=True, compute_pushdown=False)
+    assert "Total number of Span-HoMoPaths: 0" not in results
+    assert bulk_results == results
+    # The same object sets are sent: the edges after a failed threshold are not fetched
+    assert bulk_costs == costs
+
+    # One bulk exchange per side and pair of regions, whatever the lengths of the paths
+    pairs_of_regions = len(regions) * (len(regions) - 1)
+    assert 0 < sum(kind == homopa._MSG_BULK for _, kind in bulk_sent) <= 2 * pairs_of_regions
+    assert len(bulk_sent) < len(sent)
@@ -0,0 +1,39 @@
+"""Cohen minima of homopa.py."""
+import numpy as np
+
+import homopa
+
+
+def test_cohen_minima_merge():
+    rng = np.random.default_rng(2)
+    signatures = rng.integers(0, 1 << 32, (40, 16), dtype=np.uint64).tolist()
+    minima = homopa.cohen_column_minima(signatures)
+    assert minima.tolist() == [min(column) for column in zip(*signatures)]
+    merged = homopa.merge_cohen_minima([homopa.cohen_column_minima(signatures[:15]),
+                                        homopa.cohen_column_minima(signatures[15:])])
+    assert merged.tolist() == minima.tolist()
+    # Same formula as before: num_perm / (sum of the minima / _max_hash) - 1
+    expected = 16 / (sum(minima.tolist()) / homopa._max_hash) - 1
+    assert homopa.cohen_cardinality(minima, 16) == expected
+
+
+def cohen_like_the_original(listOfMinhash_sign, num_perm):
+    """The original loop: the minimum of every column, then num_perm / (sum / _max_hash) - 1."""
+    min_values = [min(column) for column in zip(*listOfMinhash_sign)]
+    return num_perm / (sum(min_values) / homopa._max_hash) - 1
+
+
+def test_region_estimate_matches_the_original_loop(hashed_region):
+    _, hashed_lines, _ = hashed_region
+    signatures = [signature for _, _, signature in hashed_lines]
+    assert homopa._Find_Cardinality_Cohen(hashed_lines, 32, 0) == int(cohen_like_the_original(signatures, 32))
+    assert homopa._Cohen(signatures, 32) == cohen_like_the_original(signatures, 32)
+
+
+def test_minima_of_the_sensors_file(hashed_region, tmp_path):
+    _, hashed_lines, _ = hashed_region
+    sensors_file = tmp_path / "Regional_4_sensors_HASHED1.txt"
+    sensors_file.write_text("".join(",".join(map(str, [path[0], count] + signature)) + "\n"
+                                    for path, count, signature in hashed_lines))
+    minima = homopa.read_cohen_minima(str(sensors_file))
+    assert minima.tolist() == [min(column) for column in zip(*(signature for _, _, signature in hashed_lines))]
@@ -0,0 +1,31 @@
+"""Compute pushdown (request 7): the Regional Leader runs the spanning join of the Top Leader."""
+import pytest
+
+import homopa
+from conftest import make_map
+
+
+def test_pushdown_round_trip():
+    joins = [([10, 11, 12], [[1, 2], [5]]), ([], []), ([1 << 35], [[3, 4, 5]])]
+    threshold, numberOfObjects, decoded = homopa.decode_pushdown_request(
+        homopa.encode_pushdown_request(0.25, 1234, joins))
+    assert (threshold, numberOfObjects, decoded) == (0.25, 1234, joins)
+
+    results = [(2, [11, 12]), (0, None), (1, []), (3, [12])]
+    decoded = homopa.decode_pushdown_response(homopa.encode_pushdown_response(results), [2, 0, 2])
+    assert decoded == [results[:2], [], results[2:]]
+
+
+@pytest.mark.parametrize("threshold", [0.02, 0.04])
+def test_pushdown_finds_the_homopaths_of_the_top_leader(mine, top_leader, threshold):
+    region_data, all_connections, number_of_objects = make_map(2, number_of_regions=3)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+
+    results, _, _ = top_leader(regions, all_connections, threshold, compute_pushdown=False)
+    pushdown_results, _, pushdown_sent = top_leader(regions, all_connections, threshold, compute_pushdown=True)
+    assert "Total number of Span-HoMoPaths: 0" not in results
+    assert pushdown_results == results
+    # The objects of the edges are never asked for
+    assert homopa._MSG_PUSHDOWN in {kind for _, kind in pushdown_sent}
+    assert homopa._MSG_EDGE not in {kind for _, kind in pushdown_sent}
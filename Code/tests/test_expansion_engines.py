@@ -0,0 +1,42 @@
+"""The adjacency engine finds the homopaths of the dense Boolean_HoMoPathway_Matrix engine."""
+import pytest
+
+import homopa
+
+
+# Plain lists on both sides, so that only the expansion engine differs
+LISTS = {"object_set_backend": "list", "signature_agreement": "list", "apriori_pruning": False}
+
+
+@pytest.mark.parametrize("threshold", [0.02, 0.04, 0.08])
+def test_raw_engines_find_the_same_homopaths(raw_region, mine, threshold):
+    matrix = mine(raw_region, 0, threshold, expansion_engine="matrix", **LISTS)
+    adjacency = mine(raw_region, 0, threshold, expansion_engine="adjacency", **LISTS)
+    assert adjacency == matrix
+    assert max(matrix) >= 2
+
+
+@pytest.mark.parametrize("threshold", [0.1, 0.2])
+def test_hashed_engines_find_the_same_homopaths(hashed_region, mine, threshold):
+    matrix = mine(hashed_region, 1, threshold, expansion_engine="matrix", **LISTS)
+    adjacency = mine(hashed_region, 1, threshold, expansion_engine="adjacency", **LISTS)
+    assert adjacency == matrix
+    assert max(matrix) >= 2
+
+
+def test_level_outputs_match(raw_region):
+    # One level on its own: the new paths, the single frequent edges and the connections of level n+1
+    edge_connections, objs_in_edge, number_of_objects = raw_region
+    frontier, single_edges, connections = homopa._expand_level_matrix(
+        0, 0, edge_connections, objs_in_edge, objs_in_edge, number_of_objects, 0.02, 1, {})
+    for n in (2, 3):
+        dictionary = {}
+        matrix_level = homopa._expand_level_matrix(
+            0, 0, connections, frontier, single_edges, number_of_objects, 0.02, n, dictionary)
+        adjacency_dictionary = {}
+        adjacency_level = homopa._expand_level_adjacency(
+            0, 0, connections, frontier, single_edges, number_of_objects, 0.02, n,
+            adjacency_dictionary, {}, {})
+        assert adjacency_level == matrix_level
+        assert adjacency_dictionary == dictionary
+        frontier, single_edges, connections = matrix_level
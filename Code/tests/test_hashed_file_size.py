@@ -0,0 +1,35 @@
+"""The size model of the hashed sensor file and the search of the permutations of a compress ratio."""
+import os
+
+import pytest
+
+import experiment_creator as ec
+
+
+@pytest.mark.parametrize("scheme", ["prefix32", "affine32"])
+def test_hashed_file_size_is_exact(sensor_file, tmp_path, scheme):
+    hashed_file = str(tmp_path / "4_sensors_HASHED.txt")
+    edges = ec.read_sensor_edges(sensor_file)
+    for num_perm in (1, 2, 9, 50):
+        ec.hash_data(sensor_file, num_perm, 12345, hashed_file, 0, "numpy", scheme)
+        signatures = ec.minhash_signatures([obj_ids for _, _, obj_ids in edges], num_perm, 12345, scheme)
+        assert ec.hashed_file_size(edges, signatures) == os.path.getsize(hashed_file)
+
+
+def test_search_finds_the_permutation_of_the_linear_search(sensor_file, tmp_path):
+    hashed_file = str(tmp_path / "4_sensors_HASHED.txt")
+    raw_file_size = os.path.getsize(sensor_file)
+    for first_permutation in (1, 4):
+        for target in (16, 8, 4, 2, 1.5):
+            maximum = target * 1.1
+            permutation, evaluations = ec.search_permutation_for_compress(
+                sensor_file, raw_file_size, first_permutation, maximum, 12345, "prefix32")
+
+            linear = first_permutation
+            while True:
+                ec.hash_data(sensor_file, linear, 12345, hashed_file, 0, "numpy", "prefix32")
+                if raw_file_size / os.path.getsize(hashed_file) <= maximum:
+                    break
+                linear += 1
+            assert permutation == linear
+            assert evaluations <= 2 * max(1, (linear - first_permutation + 1)).bit_length() + 1
@@ -0,0 +1,37 @@
+"""The homopath lattice of a threshold sweep (lattice_threshold)."""
+import copy
+
+import homopa
+
+
+def test_lattice_gives_the_homopaths_of_every_threshold(raw_region, mine, monkeypatch, tmp_path, capsys):
+    edge_connections, objs_in_edge, number_of_objects = copy.deepcopy(raw_region)
+    for name in ("edges.txt", "sensors.txt"):
+        (tmp_path / name).write_text(name)
+    monkeypatch.setattr(homopa, "lattice_threshold", 0.02)
+
+    mine(raw_region, 0, 0.02)
+    lattice = homopa._load_or_mine_homopath_lattice(
+        1, 0, 0, edge_connections, objs_in_edge, number_of_objects, 0, len(edge_connections), 10,
+        str(tmp_path / "edges.txt"), str(tmp_path / "sensors.txt"))
+    capsys.readouterr()
+
+    for threshold in (0.02, 0.04, 0.08):
+        expected = mine(raw_region, 0, threshold)
+        mined_output = capsys.readouterr().out
+        assert homopa._homopaths_from_lattice(lattice, 1, 0, 0, threshold, len(edge_connections), 0) == expected
+
+        # The max length line is printed once, for the filtered threshold, as by a run without lattice
+        lattice_output = capsys.readouterr().out
+        assert lattice_output.count("Max length of HoMoPaths") == 1
+        assert lattice_output == mined_output
+
+
+def test_lattice_mining_prints_no_max_length(raw_region, monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(homopa, "raw_or_hashed", 0, raising=False)
+    edge_connections, objs_in_edge, number_of_objects = copy.deepcopy(raw_region)
+    for _ in homopa.homopath_levels(1, 0, 0, edge_connections, objs_in_edge, objs_in_edge, number_of_objects,
+                                    0.02, 1, 0, 0, len(edge_connections), 10, write_logs=False):
+        pass
+    assert "Max length" not in capsys.readouterr().out
@@ -0,0 +1,35 @@
+"""The level generator of the homopath mining (homopath_levels): one loop iteration per path length."""
+import sys
+
+import homopa
+
+
+def test_levels_beyond_the_recursion_limit(monkeypatch, tmp_path):
+    # A chain of edges 1 -> 2 -> ... -> N carrying the same objects: one homopath of every length
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(homopa, "raw_or_hashed", 0, raising=False)
+    monkeypatch.setattr(homopa, "max_homopath_length", None)
+    recursion_limit = sys.getrecursionlimit()
+    # A low recursion limit, so that a level needing a stack frame of its own would fail
+    sys.setrecursionlimit(200)
+    try:
+        number_of_edges = sys.getrecursionlimit() + 100
+        edge_connections = {edge: [edge + 1] if edge < number_of_edges else []
+                            for edge in range(1, number_of_edges + 1)}
+        objs_in_edge = [[[edge], [1, 2, 3]] for edge in edge_connections]
+        limit = number_of_edges
+        assert limit > sys.getrecursionlimit()
+
+        levels = []
+        for dictionary, n, paths in homopa.homopath_levels(
+                1, 0, 32, edge_connections, objs_in_edge, objs_in_edge, 3, 0.5, 1, 0, 0,
+                number_of_edges, limit, write_logs=False):
+            levels.append(n)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    # Every level is produced, up to limit (the whole chain)
+    assert levels == list(range(1, number_of_edges + 1))
+    assert dictionary[number_of_edges] == [[list(range(1, number_of_edges + 1)), [1, 2, 3]]]
+    # Every shorter path is a sub-path of the next level, so it was pruned
+    assert all(not dictionary[n] for n in range(2, number_of_edges))
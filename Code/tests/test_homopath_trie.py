@@ -0,0 +1,69 @@
+"""The path trie of a region gives back its homopath dictionary unchanged."""
+import random
+
+import homopa
+
+
+def random_homopaths(seed):
+    rng = random.Random(seed)
+    edges = list(range(1, 30))
+    homoedges = [[[edge], sorted(rng.sample(range(1000), rng.randint(1, 8)))] for edge in rng.sample(edges, 12)]
+    dictionary = {0: homoedges, 1: [list(record) for record in homoedges]}
+    for length in range(2, 6):
+        dictionary[length] = [[rng.sample(edges, length), rng.sample(range(1 << 34), rng.randint(0, 6))]
+                              for _ in range(rng.randint(0, 15))]
+    return dictionary
+
+
+def test_trie_round_trip():
+    for seed in range(20):
+        dictionary = random_homopaths(seed)
+        trie = homopa.build_homopath_trie(dictionary)
+        assert homopa.homopath_trie_to_dict(trie) == dictionary
+        assert homopa.homopath_trie_to_dict(trie, with_objects=False) == {
+            key: [path for path, _ in records] for key, records in dictionary.items()}
+
+
+def test_trie_keeps_duplicate_records():
+    # The same path twice: both records stay, the first one answers the requests
+    dictionary = {0: [[[1], [5]], [[1], [6]]], 2: [[[1, 2], [5]], [[1, 2], [7]]]}
+    trie = homopa.build_homopath_trie(dictionary)
+    assert homopa.homopath_trie_to_dict(trie) == dictionary
+    assert homopa.find_obj_ids_for_edge_path(2, [1], trie) == [5]
+    assert homopa.find_obj_ids_for_edge_path(1, [1, 2], trie) == [5]
+
+
+def test_prefix_search():
+    dictionary = {2: [[[1, 2], [5]], [[3, 4], [6]]], 3: [[[1, 2, 3], [5]], [[1, 4, 5], [8]]]}
+    trie = homopa.build_homopath_trie(dictionary)
+    found = homopa.find_homopaths_with_prefix(trie, [1])
+    assert sorted(map(tuple, (path for path, _ in found))) == [(1, 2), (1, 2, 3), (1, 4, 5)]
+    assert homopa.find_homopaths_with_prefix(trie, [9]) == []
+
+
+def scan_like_the_original(requestPathORedge, request, dictionary):
+    """The original lookup: a scan of the records of the matching key."""
+    for key, records in dictionary.items():
+        if (requestPathORedge == 1 and len(request) == key) or (requestPathORedge == 2 and key == 0):
+            for path, obj_ids in records:
+                if path == request:
+                    return obj_ids
+    return None
+
+
+def test_lookups_match_the_list_scan():
+    for seed in range(20):
+        dictionary = random_homopaths(seed)
+        trie = homopa.build_homopath_trie(dictionary)
+        requests = [(1, path) for records in dictionary.values() for path, _ in records]
+        requests += [(1, path[:-1]) for _, path in requests if len(path) > 1]
+        requests += [(1, [edge, 99]) for edge in range(1, 30)] + [(1, [])]
+        requests += [(2, [edge]) for edge in range(0, 32)] + [(2, [1, 2])]
+        for requestPathORedge, request in requests:
+            expected = scan_like_the_original(requestPathORedge, request, dictionary)
+            assert homopa.find_obj_ids_for_edge_path(requestPathORedge, request, trie) == expected
+            encoded = homopa.find_encoded_obj_ids_for_edge_path(requestPathORedge, request, trie)
+            assert (encoded is None) == (expected is None)
+            if encoded is not None:
+                assert encoded == homopa.encode_int_array(expected)
+    assert homopa.find_obj_ids_for_edge_path(1, [1], None) is None
@@ -0,0 +1,105 @@
+"""KMV sketches and the object count modes of the Top Leader (object_count_mode)."""
+import pytest
+
+import homopa
+from conftest import hash_region, make_map
+
+
+COSTS_FILE = "Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt"
+
+
+def test_kmv_exact_below_sketch_size():
+    k = homopa.kmv_sketch_size(0.1)
+    assert k == 102
+    objects = list(range(50)) * 2
+    sketch = homopa.build_kmv_sketch(objects, k)
+    assert homopa.kmv_cardinality(sketch, k) == 50
+    assert homopa.kmv_intersection_cardinality(sketch, homopa.build_kmv_sketch(range(25, 75), k), k) == 25
+
+
+def test_kmv_union_is_sketch_of_union():
+    k = homopa.kmv_sketch_size(0.05)
+    set1, set2 = range(0, 30000), range(20000, 60000)
+    union = homopa.kmv_union([homopa.build_kmv_sketch(set1, k), homopa.build_kmv_sketch(set2, k)], k)
+    assert union.tolist() == homopa.build_kmv_sketch(range(0, 60000), k).tolist()
+    assert abs(homopa.kmv_cardinality(union, k) / 60000 - 1) < 0.2
+    intersection = homopa.kmv_intersection_cardinality(
+        homopa.build_kmv_sketch(set1, k), homopa.build_kmv_sketch(set2, k), k)
+    assert abs(intersection / 10000 - 1) < 0.35
+
+
+def test_raw_sketches_keep_the_homopaths(mine, top_leader, tmp_path):
+    threshold = 0.04
+    region_data, all_connections, number_of_objects = make_map(2, number_of_regions=3)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+
+    results, _, _ = top_leader(regions, all_connections, threshold, object_count_mode="exact")
+    exact_costs = (tmp_path / COSTS_FILE).read_text().split(",")
+    sketch_results, _, sketch_sent = top_leader(regions, all_connections, threshold, object_count_mode="sketch")
+    sketch_costs = (tmp_path / COSTS_FILE).read_text().split(",")
+    # The regions have fewer objects than k: the overlaps and the number of objects are exact
+    assert sketch_results == results
+    assert sketch_costs[0] == exact_costs[0]
+    assert homopa._MSG_OBJECTS not in {kind for _, kind in sketch_sent}
+
+
+def test_hashed_sketches_replace_the_unique_objects(mine, top_leader, tmp_path):
+    threshold, permutations = 0.1, 32
+    region_data, all_connections, number_of_objects = make_map(2, number_of_regions=3)
+    regions = {region: mine((edge_connections, hash_region(objs_in_edge, permutations, 3), number_of_objects),
+                            1, threshold, permutations)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+
+    results, costs, _ = top_leader(regions, all_connections, threshold, raw_or_hashed=1,
+                                   num_of_permutations=permutations, object_count_mode="exact")
+    sketch_results, sketch_costs, sketch_sent = top_leader(regions, all_connections, threshold, raw_or_hashed=1,
+                                                           num_of_permutations=permutations,
+                                                           object_count_mode="sketch")
+    assert sketch_results == results
+    # The minima are sent instead of the signature values, and counted (4 bytes per permutation)
+    kinds = [kind for _, kind in sketch_sent]
+    assert homopa._MSG_OBJECTS not in kinds
+    assert kinds.count(homopa._MSG_COHEN_MINIMA) == len(regions)
+    assert sketch_costs == costs + len(regions) * 4 * permutations
+
+    # The number of unique objects of the costs files is Cohen's estimate
+    minima = homopa.merge_cohen_minima([homopa.cohen_column_minima([obj_ids for _, obj_ids in homopaths[0]])
+                                        for homopaths in regions.values()])
+    number_of_unique_objects = int((tmp_path / COSTS_FILE).read_text().split(",")[0])
+    assert number_of_unique_objects == int(homopa.cohen_cardinality(minima, permutations))
+
+
+@pytest.mark.parametrize("raw_or_hashed", [0, 1])
+def test_lost_sketch_leaves_the_region_out(mine, top_leader, tmp_path, monkeypatch, capsys, raw_or_hashed):
+    threshold, permutations = (0.04, 0) if raw_or_hashed == 0 else (0.1, 32)
+    region_data, all_connections, number_of_objects = make_map(2, number_of_regions=3)
+    regions = {}
+    for region, (edge_connections, objs_in_edge) in region_data.items():
+        if raw_or_hashed == 1:
+            objs_in_edge = hash_region(objs_in_edge, permutations, 3)
+        regions[region] = mine((edge_connections, objs_in_edge, number_of_objects), raw_or_hashed, threshold,
+                               permutations or 32)
+
+    # Region 3 without homopaths: no sketch of its own (hashed), nothing to join
+    expected, _, _ = top_leader({**regions, 3: None}, all_connections, threshold, raw_or_hashed, permutations,
+                                object_count_mode="sketch")
+    expected_objects = (tmp_path / COSTS_FILE).read_text().split(",")[0]
+
+    # The connection to region 3 is lost when its sketch (or the minima) is asked for
+    prepare = homopa.prepare_regional_responses
+    prepared = []
+
+    def lose_the_sketch_of_region_3(*args):
+        responses = prepare(*args)
+        prepared.append(responses)
+        if len(prepared) == 3:
+            responses[homopa._MSG_OBJECT_SKETCH] = responses[homopa._MSG_COHEN_MINIMA] = (None, b"")
+        return responses
+
+    monkeypatch.setattr(homopa, "prepare_regional_responses", lose_the_sketch_of_region_3)
+    results, _, _ = top_leader(regions, all_connections, threshold, raw_or_hashed, permutations,
+                               object_count_mode="sketch")
+    assert "no objects received from Regional Leader 3" in capsys.readouterr().out
+    assert results == expected
+    assert (tmp_path / COSTS_FILE).read_text().split(",")[0] == expected_objects
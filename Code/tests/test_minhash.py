@@ -0,0 +1,19 @@
+"""The MinHash engines of experiment_creator.py (numpy and datasketch)."""
+import numpy as np
+import pytest
+
+import experiment_creator as ec
+
+
+@pytest.mark.parametrize("scheme", [None, "legacy", "affine32", "prefix32"])
+def test_numpy_engine_matches_datasketch(sensor_file, tmp_path, scheme):
+    for num_perm in (1, 7, 64):
+        ec.hash_data(sensor_file, num_perm, 12345, str(tmp_path / "np.txt"), 0, "numpy", scheme)
+        ec.hash_data(sensor_file, num_perm, 12345, str(tmp_path / "ds.txt"), 0, "datasketch", scheme)
+        assert (tmp_path / "np.txt").read_bytes() == (tmp_path / "ds.txt").read_bytes()
+
+
+def test_signatures_of_small_blocks(sensor_file):
+    object_lists = [obj_ids for _, _, obj_ids in ec.read_sensor_edges(sensor_file)]
+    whole = ec.minhash_signatures(object_lists, 16, 3, "affine32")
+    assert np.array_equal(ec.minhash_signatures(object_lists, 16, 3, "affine32", block_cells=16), whole)
@@ -0,0 +1,92 @@
+"""The object-set cache of the Top Leader: hits, misses, coalesced requests and the LRU bound."""
+import threading
+
+import pytest
+
+import homopa
+
+
+@pytest.fixture
+def region_answers(monkeypatch):
+    """Answers every path/edge request with [region, edges...] and records the requests sent."""
+    sent = []
+
+    def answer(requestPathORedge, region, path_edge_ID):
+        sent.append((requestPathORedge, region, tuple(path_edge_ID)))
+        if requestPathORedge == 6:
+            return [[region] + list(ids) for _, ids in path_edge_ID]
+        return [region] + list(path_edge_ID)
+
+    monkeypatch.setattr(homopa, "send_request_to_regional_leader", answer)
+    homopa.clear_object_set_cache()
+    yield sent
+    homopa.clear_object_set_cache()
+
+
+def test_hits_and_misses(region_answers, monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_cache_entries", 10)
+    assert homopa.fetch_object_set(1, 2, [5, 6]) == ([2, 5, 6], True)
+    assert homopa.fetch_object_set(1, 2, [5, 6]) == ([2, 5, 6], False)
+    # Same edges, other region or other request kind: other keys
+    assert homopa.fetch_object_set(1, 3, [5, 6]) == ([3, 5, 6], True)
+    assert homopa.fetch_object_set(2, 2, [5]) == ([2, 5], True)
+    assert homopa.object_set_cache_stats == {"hits": 1, "misses": 3, "coalesced": 0}
+    assert len(region_answers) == 3
+
+
+def test_disabled_cache_sends_every_request(region_answers, monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_cache_entries", 0)
+    for _ in range(3):
+        assert homopa.fetch_object_set(2, 1, [7]) == ([1, 7], True)
+    assert len(region_answers) == 3
+    assert homopa.object_set_cache_stats == {"hits": 0, "misses": 0, "coalesced": 0}
+
+
+def test_least_recently_used_set_is_evicted(region_answers, monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_cache_entries", 2)
+    homopa.fetch_object_set(2, 1, [1])
+    homopa.fetch_object_set(2, 1, [2])
+    homopa.fetch_object_set(2, 1, [1])   # [1] becomes the most recent
+    homopa.fetch_object_set(2, 1, [3])   # evicts [2]
+    assert list(homopa.object_set_cache) == [(2, 1, (1,)), (2, 1, (3,))]
+    assert homopa.fetch_object_set(2, 1, [2]) == ([1, 2], True)
+
+
+def test_requests_in_flight_are_coalesced(monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_cache_entries", 10)
+    homopa.clear_object_set_cache()
+    release = threading.Event()
+    sent = []
+
+    def slow_answer(requestPathORedge, region, path_edge_ID):
+        sent.append(tuple(path_edge_ID))
+        release.wait(5)
+        return [42]
+
+    monkeypatch.setattr(homopa, "send_request_to_regional_leader", slow_answer)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(homopa.fetch_object_set(1, 1, [8, 9])))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Wait until the first request is sent and the others are waiting for it
+    while homopa.object_set_cache_stats["coalesced"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sent == [(8, 9)]
+    # Only the thread that sent the request counts its transmission
+    assert sorted(results) == [([42], False)] * 3 + [([42], True)]
+    homopa.clear_object_set_cache()
+
+
+def test_bulk_requests_use_the_cache(region_answers, monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_cache_entries", 10)
+    homopa.fetch_object_set(2, 4, [1])
+    results = homopa.fetch_object_sets(4, [(2, [1]), (2, [2]), (1, [1, 2]), (2, [2])])
+    assert results == {(2, (1,)): ([4, 1], False), (2, (2,)): ([4, 2], True), (1, (1, 2)): ([4, 1, 2], True)}
+    # One bulk frame, with the sets that were not in the cache, each once
+    assert region_answers[-1] == (6, 4, ([2, [2]], [1, [1, 2]]))
+    assert homopa.fetch_object_set(1, 4, [1, 2]) == ([4, 1, 2], False)
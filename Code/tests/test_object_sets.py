@@ -0,0 +1,67 @@
+"""Array and bitset object sets of the adjacency engine (object_set_backend)."""
+import numpy as np
+import pytest
+
+import homopa
+
+
+@pytest.mark.parametrize("backend", ["array", "bitset", "auto"])
+def test_backends_find_the_homopaths_of_lists(raw_region, mine, backend):
+    for threshold in (0.02, 0.04, 0.08):
+        lists = mine(raw_region, 0, threshold, object_set_backend="list")
+        assert mine(raw_region, 0, threshold, object_set_backend=backend) == lists
+
+
+def test_compact_switches_at_one_object_in_32(monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_backend", "auto")
+    sparse = homopa._compact_object_set(np.arange(0, 320, 32, dtype=np.uint32)[:9], 320)
+    assert sparse.dtype == np.uint32
+    dense = homopa._compact_object_set(np.arange(0, 320, 32, dtype=np.uint32), 320)
+    assert dense.dtype == np.uint8 and dense.size == 40
+    assert homopa._object_set_size(dense) == 10
+
+    monkeypatch.setattr(homopa, "object_set_backend", "array")
+    assert homopa._compact_object_set(np.arange(320, dtype=np.uint32), 320).dtype == np.uint32
+    monkeypatch.setattr(homopa, "object_set_backend", "bitset")
+    assert homopa._compact_object_set(np.array([5], dtype=np.uint32), 320).dtype == np.uint8
+
+
+@pytest.mark.parametrize("backend", ["array", "bitset", "auto"])
+def test_intersections_match_python_sets(monkeypatch, backend):
+    monkeypatch.setattr(homopa, "object_set_backend", backend)
+    rng = np.random.default_rng(4)
+    universe = np.arange(0, 20000, 7, dtype=np.int64)
+    # Sizes far apart (galloping search), close (np.intersect1d), empty, dense and sparse
+    for size_1, size_2 in ((5, 2000), (2000, 5), (300, 400), (0, 50), (2800, 2500), (2800, 20), (1, 1)):
+        ids_1 = rng.choice(universe, size_1, replace=False).tolist()
+        ids_2 = rng.choice(universe, size_2, replace=False).tolist()
+        set_1 = homopa._make_object_set(ids_1, universe)
+        set_2 = homopa._make_object_set(ids_2, universe)
+        intersected = homopa._intersect_object_sets(set_1, set_2, len(universe))
+        expected = sorted(set(ids_1) & set(ids_2))
+        assert homopa._object_set_to_list(intersected, universe) == expected
+        assert homopa._object_set_size(intersected) == len(expected)
+
+
+def test_sparse_intersection_of_bitsets_becomes_an_array(monkeypatch):
+    monkeypatch.setattr(homopa, "object_set_backend", "auto")
+    universe = np.arange(640, dtype=np.int64)
+    set_1 = homopa._make_object_set(range(0, 640, 2), universe)
+    set_2 = homopa._make_object_set(list(range(1, 640, 2)) + [10, 20], universe)
+    assert set_1.dtype == set_2.dtype == np.uint8
+    intersected = homopa._intersect_object_sets(set_1, set_2, len(universe))
+    assert intersected.dtype == np.uint32
+    assert intersected.tolist() == [10, 20]
+
+    # ... and stays a bitset with "bitset"
+    monkeypatch.setattr(homopa, "object_set_backend", "bitset")
+    intersected = homopa._intersect_object_sets(set_1, set_2, len(universe))
+    assert intersected.dtype == np.uint8
+    assert homopa._object_set_to_list(intersected, universe) == [10, 20]
+
+
+def test_galloping_search_at_the_end_of_the_large_array():
+    large = np.arange(0, 3400, 2, dtype=np.uint32)
+    small = np.array([1, 3398, 3399, 4000], dtype=np.uint32)
+    assert homopa._intersect_object_sets(small, large, 5000).tolist() == [3398]
+    assert homopa._intersect_object_sets(large, small, 5000).tolist() == [3398]
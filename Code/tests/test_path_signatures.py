@@ -0,0 +1,76 @@
+"""Extension of hashed paths on the signature matrix (signature_agreement)."""
+import numpy as np
+import pytest
+
+import homopa
+
+
+def signature_lines(seed, number_of_edges=12, permutations=16):
+    """[[edge], signature] lines that share many minhashes, some of them shorter than the others."""
+    rng = np.random.default_rng(seed)
+    shared = rng.integers(0, 50, permutations)
+    lines = []
+    for edge in range(1, number_of_edges + 1):
+        signature = np.where(rng.random(permutations) < 0.6, shared, rng.integers(0, 50, permutations))
+        if edge % 5 == 0:
+            signature = signature[:permutations - 3]
+        lines.append([[edge], signature.tolist()])
+    return lines
+
+
+def test_membership_is_the_element_loop(monkeypatch):
+    monkeypatch.setattr(homopa, "signature_agreement", "membership")
+    lines = signature_lines(1)
+    paths = [[[1, 2], lines[0][1]], [[3], lines[2][1]], [[5, 6, 7], lines[4][1] + lines[4][1][:2]]]
+    object_sets = {}
+    homopa._init_signature_matrix(object_sets, paths, lines)
+    candidates = [edge for edge in range(1, 13)]
+    for path, signature in paths:
+        extensions = homopa._extend_path_signatures(object_sets, object_sets["paths"][tuple(path)], candidates)
+        for edgecon, (count, state) in zip(candidates, extensions):
+            # The loop of the "list" test: every minhash of the path found in the signature of the edge
+            expected = [value for value in signature if value in lines[edgecon - 1][1]]
+            assert count == len(expected)
+            assert homopa._signature_state_to_list(state) == expected
+
+            # One more edge on the new state: the positions found in both edges
+            count2, state2 = homopa._extend_path_signatures(object_sets, state, [3])[0]
+            assert homopa._signature_state_to_list(state2) == [value for value in expected if value in lines[2][1]]
+            assert count2 == len(homopa._signature_state_to_list(state2))
+
+
+def test_positional_counts_positions_where_every_edge_agrees(monkeypatch):
+    monkeypatch.setattr(homopa, "signature_agreement", "positional")
+    lines = signature_lines(2)
+    object_sets = {}
+    homopa._init_signature_matrix(object_sets, [[[1, 2], []]], lines)
+    signatures = [line[1] + [None] * (16 - len(line[1])) for line in lines]
+
+    state = object_sets["paths"][(1, 2)]
+    path = [1, 2]
+    for edgecon in (3, 5, 4):
+        count, state = homopa._extend_path_signatures(object_sets, state, [edgecon])[0]
+        path.append(edgecon)
+        expected = [position for position in range(16)
+                    if len({signatures[edge - 1][position] for edge in path}) == 1
+                    and signatures[path[0] - 1][position] is not None]
+        assert count == len(expected)
+        assert homopa._signature_state_to_list(state) == [signatures[0][position] for position in expected]
+
+
+@pytest.mark.parametrize("threshold", [0.1, 0.2])
+def test_membership_finds_the_homopaths_of_the_list_test(hashed_region, mine, threshold):
+    lists = mine(hashed_region, 1, threshold, signature_agreement="list")
+    assert mine(hashed_region, 1, threshold, signature_agreement="membership") == lists
+
+
+def test_positional_is_never_above_membership(hashed_region, mine):
+    # A position where every edge agrees is also found by the membership test
+    membership = mine(hashed_region, 1, 0.1, signature_agreement="membership")
+    positional = mine(hashed_region, 1, 0.1, signature_agreement="positional")
+    found = {tuple(path) for key, records in membership.items() if key > 1 for path, _ in records}
+    for key, records in positional.items():
+        if key > 1:
+            for path, _ in records:
+                assert any(tuple(path) == found_path[i:i + len(path)]
+                           for found_path in found for i in range(len(found_path) - len(path) + 1))
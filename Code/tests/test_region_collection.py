@@ -0,0 +1,28 @@
+"""Stage 1 of the Top Leader: the requests of collect_region_data for one region."""
+import homopa
+
+
+def requests_of(monkeypatch, *args):
+    sent = []
+
+    def send(requestPathORedge, region, path_edge_ID):
+        sent.append(requestPathORedge)
+        return None
+
+    monkeypatch.setattr(homopa, "send_request_to_regional_leader", send)
+    homopa.collect_region_data(7, *args)
+    return sent
+
+
+def test_requests_follow_the_settings_of_the_top_leader(monkeypatch):
+    # The module globals say otherwise: only the arguments count
+    monkeypatch.setattr(homopa, "object_count_mode", "exact")
+    monkeypatch.setattr(homopa, "homopath_publication", "full")
+    assert requests_of(monkeypatch, True, 0, "exact", "full") == [3, 4, 5]
+    assert requests_of(monkeypatch, True, 0, "sketch", "full") == [3, 11, 5]
+    assert requests_of(monkeypatch, True, 0, "exact", "boundary") == [3, 4, 5, 10, 13]
+    assert requests_of(monkeypatch, False, 0, "sketch", "boundary") == [11, "[-1]"]
+    # Hashed data: the minima of the signatures replace the unique objects
+    assert requests_of(monkeypatch, True, 1, "exact", "full") == [3, 4, 5]
+    assert requests_of(monkeypatch, True, 1, "sketch", "full") == [3, 12, 5]
+    assert requests_of(monkeypatch, False, 1, "sketch", "full") == [12, "[-1]"]
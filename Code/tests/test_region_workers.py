@@ -0,0 +1,17 @@
+"""The worker processes of the regional computation (use_process_pool)."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import homopa
+
+
+def test_spawned_workers_get_the_runtime_settings(monkeypatch):
+    overrides = {"expansion_engine": "matrix", "object_set_backend": "bitset", "signature_agreement": "positional",
+                 "max_homopath_length": 7, "apriori_pruning": False, "lattice_threshold": 0.05}
+    for name, value in overrides.items():
+        monkeypatch.setattr(homopa, name, value)
+
+    pool_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=pool_context, initializer=homopa._init_region_worker,
+                             initargs=(1, 4, pool_context.Lock(), homopa._region_worker_settings())) as pool:
+        assert pool.submit(homopa._region_worker_settings).result() == overrides
@@ -0,0 +1,139 @@
+"""The pooled, multiplexed connections of the Top Leader to a Regional Leader, over real sockets."""
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import homopa
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def listening_socket():
+    """A server socket on a free port, and the region whose port it is (see _open_regional_connection)."""
+    server_socket = socket.socket()
+    server_socket.bind(("localhost", 0))
+    server_socket.listen()
+    return server_socket, server_socket.getsockname()[1] - 5011
+
+
+def requests_in_flight(region):
+    return [len(connection["pending"]) for connection in homopa.regional_connection_pool.get(region, [])]
+
+
+@pytest.fixture(autouse=True)
+def connection_pool(monkeypatch):
+    monkeypatch.setattr(homopa, "regional_connection_pool", {})
+    monkeypatch.setattr(homopa, "connections_per_region", 2)
+    yield
+    homopa.close_regional_connections()
+
+
+@pytest.fixture
+def regional_server(monkeypatch):
+    """
+    The asyncio server of a Regional Leader on a free port. A pushdown request is held until
+    'release' is set and is then answered with its own payload.
+
+    :return: (region, release, the thread of the server)
+    """
+    release = threading.Event()
+    answer = homopa.answer_regional_request
+
+    def held_answer(request_kind, payload, regional_responses, regions_path_trie):
+        if request_kind == homopa._MSG_PUSHDOWN:
+            release.wait(10)
+            return request_kind, payload
+        return answer(request_kind, payload, regional_responses, regions_path_trie)
+
+    monkeypatch.setattr(homopa, "answer_regional_request", held_answer)
+    trie = homopa.build_homopath_trie({0: [[[1], [5, 6]]], 1: [[[1], [5, 6]]]})
+    responses = homopa.prepare_regional_responses(trie, {5, 6}, 2)
+    server_socket, region = listening_socket()
+    server = threading.Thread(target=asyncio.run, daemon=True, args=(
+        homopa.serve_regional_requests_async(server_socket, responses, trie),))
+    server.start()
+    yield region, release, server
+
+    release.set()
+    if server.is_alive():
+        with socket.create_connection(("localhost", region + 5011)) as control:
+            control.sendall(homopa._pack_frame(homopa._MSG_SHUTDOWN, 0))
+    server.join(5)
+    assert not server.is_alive()
+
+
+def test_concurrent_requests_share_the_pooled_connections(regional_server):
+    region, release, _ = regional_server
+    with ThreadPoolExecutor(max_workers=8) as senders:
+        answers = []
+        for number in range(8):
+            answers.append(senders.submit(homopa._send_regional_message, region, homopa._MSG_PUSHDOWN,
+                                          b"request %d" % number))
+            wait_until(lambda: sum(requests_in_flight(region)) == number + 1)
+
+        # connections_per_region connections, every one with several requests in flight
+        assert requests_in_flight(region) == [4, 4]
+
+        release.set()
+        assert [answer.result(10) for answer in answers] == [
+            (homopa._MSG_PUSHDOWN, b"request %d" % number) for number in range(8)]
+    assert requests_in_flight(region) == [0, 0]
+
+
+def test_waiting_requests_wake_up_on_shutdown(regional_server):
+    region, release, server = regional_server
+    with ThreadPoolExecutor(max_workers=3) as senders:
+        answers = [senders.submit(homopa._send_regional_message, region, homopa._MSG_PUSHDOWN, b"held")
+                   for _ in range(3)]
+        wait_until(lambda: sum(requests_in_flight(region)) == 3)
+
+        # The region shuts down (a shutdown sent on another connection) while they wait
+        with socket.create_connection(("localhost", region + 5011)) as control:
+            control.sendall(homopa._pack_frame(homopa._MSG_SHUTDOWN, 0))
+        assert [answer.result(10) for answer in answers] == [(None, b"")] * 3
+    assert not any(connection["alive"] for connection in homopa.regional_connection_pool[region])
+    assert requests_in_flight(region) == [0, 0]
+    release.set()
+    server.join(5)
+    assert not server.is_alive()
+
+
+def test_waiting_request_wakes_up_when_the_peer_closes():
+    server_socket, region = listening_socket()
+
+    def close_after_the_request():
+        connection, _ = server_socket.accept()
+        with connection:
+            homopa._read_frame(connection.makefile("rb"))
+
+    peer = threading.Thread(target=close_after_the_request, daemon=True)
+    peer.start()
+    try:
+        assert homopa._send_regional_message(region, homopa._MSG_EDGE, homopa.encode_int_array([1])) == (None, b"")
+        [lost] = homopa.regional_connection_pool[region]
+        assert not lost["alive"] and not lost["pending"]
+        # The lost connection is not handed out again
+        assert homopa._get_regional_connection(region) is not lost
+    finally:
+        peer.join(5)
+        server_socket.close()
+
+
+def test_request_without_answer_times_out(monkeypatch):
+    monkeypatch.setattr(homopa, "regional_response_timeout", 0.2)
+    server_socket, region = listening_socket()
+    try:
+        assert homopa._send_regional_message(region, homopa._MSG_EDGE, homopa.encode_int_array([1])) == (None, b"")
+        # The request is given up: nothing is left waiting on the connection
+        assert requests_in_flight(region) == [0]
+    finally:
+        server_socket.close()
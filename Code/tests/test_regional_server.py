@@ -0,0 +1,88 @@
+"""The asyncio server of a Regional Leader (regional_server = "asyncio")."""
+import asyncio
+import socket
+import threading
+
+import pytest
+
+import homopa
+
+
+def request(connection, kind, request_id, payload=b""):
+    connection.sendall(homopa._pack_frame(kind, request_id, payload))
+
+
+@pytest.fixture
+def regional_server(monkeypatch):
+    """
+    The asyncio server of a region with one homoedge, whose pushdown answers are held until
+    'release' is set (instead of a slow join).
+
+    :return: (address of the server, release)
+    """
+    release = threading.Event()
+    answer = homopa.answer_regional_request
+
+    def held_answer(request_kind, payload, regional_responses, regions_path_trie):
+        if request_kind == homopa._MSG_PUSHDOWN:
+            release.wait(10)
+        return answer(request_kind, payload, regional_responses, regions_path_trie)
+
+    monkeypatch.setattr(homopa, "answer_regional_request", held_answer)
+    trie = homopa.build_homopath_trie({0: [[[1], [5, 6]]], 1: [[[1], [5, 6]]]})
+    responses = homopa.prepare_regional_responses(trie, {5, 6}, 2)
+
+    server_socket = socket.socket()
+    server_socket.bind(("localhost", 0))
+    server_socket.listen()
+    server = threading.Thread(target=asyncio.run, daemon=True, args=(
+        homopa.serve_regional_requests_async(server_socket, responses, trie),))
+    server.start()
+
+    address = server_socket.getsockname()
+    yield address, release
+
+    release.set()
+    with socket.create_connection(address) as control:
+        request(control, homopa._MSG_SHUTDOWN, 0)
+    server.join(5)
+    assert not server.is_alive()
+
+
+def connect(address):
+    # A request that is held by mistake fails the test instead of hanging it
+    return socket.create_connection(address, timeout=10)
+
+
+def test_pushdown_does_not_block_other_connections(regional_server):
+    address, release = regional_server
+    with connect(address) as slow, connect(address) as fast:
+        request(slow, homopa._MSG_PUSHDOWN, 1, homopa.encode_pushdown_request(0.1, 2, [([5], [[1]])]))
+        # Answered while the pushdown is still held
+        request(fast, homopa._MSG_EDGE, 2, homopa.encode_int_array([1]))
+        kind, request_id, payload = homopa._read_frame(fast.makefile("rb"))
+        assert (kind, request_id, homopa.decode_int_array(payload)) == (homopa._MSG_EDGE, 2, [5, 6])
+        assert not release.is_set()
+
+        release.set()
+        kind, request_id, _ = homopa._read_frame(slow.makefile("rb"))
+        assert (kind, request_id) == (homopa._MSG_PUSHDOWN, 1)
+
+
+def test_pushdown_does_not_block_the_next_requests_of_its_connection(regional_server):
+    address, release = regional_server
+    with connect(address) as connection:
+        responses = connection.makefile("rb")
+        request(connection, homopa._MSG_PUSHDOWN, 1, homopa.encode_pushdown_request(0.1, 2, [([5], [[1]])]))
+        request(connection, homopa._MSG_EDGE, 2, homopa.encode_int_array([1]))
+        request(connection, homopa._MSG_PATH, 3, homopa.encode_int_array([7]))
+
+        # The later requests are answered first, each under its own request id
+        assert homopa._read_frame(responses)[:2] == (homopa._MSG_EDGE, 2)
+        assert homopa._read_frame(responses)[:2] == (homopa._MSG_NOT_FOUND, 3)
+        assert not release.is_set()
+
+        release.set()
+        kind, request_id, payload = homopa._read_frame(responses)
+        assert (kind, request_id) == (homopa._MSG_PUSHDOWN, 1)
+        assert homopa.decode_pushdown_response(payload, [1]) == [[(1, [5])]]
@@ -0,0 +1,32 @@
+"""The truncatable signature families of experiment_creator.py (minhash_scheme) and their record."""
+import numpy as np
+import pytest
+
+import experiment_creator as ec
+
+
+@pytest.mark.parametrize("scheme", ["legacy", "prefix32"])
+def test_truncatable_schemes_are_prefixes(sensor_file, scheme):
+    object_lists = [obj_ids for _, _, obj_ids in ec.read_sensor_edges(sensor_file)]
+    longest = ec.minhash_signatures(object_lists, 40, 99, scheme)
+    for num_perm in (1, 2, 13, 40):
+        assert np.array_equal(ec.minhash_signatures(object_lists, num_perm, 99, scheme), longest[:, :num_perm])
+    # ... and the cached table gives the same columns whatever the order of the requests
+    for num_perm in (3, 1, 25, 40, 8):
+        _, signatures = ec.cached_minhash_signatures(sensor_file, num_perm, 99, scheme)
+        assert np.array_equal(signatures, longest[:, :num_perm])
+
+
+def test_affine32_is_not_a_prefix_family(sensor_file):
+    object_lists = [obj_ids for _, _, obj_ids in ec.read_sensor_edges(sensor_file)]
+    assert not np.array_equal(ec.minhash_signatures(object_lists, 4, 99, "affine32"),
+                              ec.minhash_signatures(object_lists, 8, 99, "affine32")[:, :4])
+
+
+def test_scheme_recorded_in_experiment_folder(tmp_path):
+    # Folders of earlier experiments have no record: the default scheme of datasketch
+    assert ec.read_minhash_scheme(str(tmp_path)) is None
+    ec.write_minhash_scheme(str(tmp_path), "prefix32")
+    assert ec.read_minhash_scheme(str(tmp_path)) == "prefix32"
+    ec.write_minhash_scheme(str(tmp_path), None)
+    assert ec.read_minhash_scheme(str(tmp_path)) == ec.minhash_default_scheme()
@@ -0,0 +1,186 @@
+"""The boundary-indexed spanning join of the Top Leader against the original nested loops."""
+import pytest
+
+import homopa
+from conftest import hash_region, make_map
+
+
+def join_like_the_original(regions, all_connections, threshold, raw_or_hashed, num_of_permutations):
+    """
+    The original spanning detection of start_Top_leader: region x length x region2 x length2 x
+    path1 x path2, all_connections probed for every pair, the objects of path1 and of every edge of
+    path2 asked for again for every pair (find_obj_ids_for_edge_path of the original: the first
+    record of the path under the key of its length, of the edge under key 0).
+
+    :param regions: {region: homopath dictionary with objects, or None}
+    :return: (all_HOMOPATHS, list_of_span_homopaths, C2Base_Total_Bytes), with the costs of the
+             homopath lists and (raw data) of the unique objects collected before the join
+    """
+    def find_obj_ids(region_id, requestPathORedge, request):
+        for length, records in regions[region_id].items():
+            if (requestPathORedge == 1 and len(request) == length) or (requestPathORedge == 2 and length == 0):
+                for edges, obj_ids in records:
+                    if edges == list(request):
+                        return obj_ids
+        return None
+
+    C2Base_Total_Bytes = 0
+    all_hot_paths = {}
+    objOfRegion = {}
+    for region_id, homopaths in regions.items():
+        if homopaths:
+            received = {str(key): [edges for edges, _ in records] for key, records in homopaths.items()}
+            C2Base_Total_Bytes += homopa.calculate_transmission_cost(received)
+            all_hot_paths[region_id] = {int(key): paths for key, paths in received.items()}
+            objOfRegion[region_id] = {obj for records in homopaths.values() for _, obj_ids in records
+                                      for obj in obj_ids}
+            if raw_or_hashed == 0:
+                C2Base_Total_Bytes += homopa.calculate_transmission_cost(str(objOfRegion[region_id]))
+
+    all_HOMOPATHS = {}
+    list_of_span_homopaths = []
+    for region_id, c_hot_paths1 in all_hot_paths.items():
+        all_HOMOPATHS.setdefault(region_id, {}).setdefault(region_id, {})
+        for length, hot_paths1 in c_hot_paths1.items():
+            if length > 0 and hot_paths1:
+                for region_id2, c_hot_paths2 in all_hot_paths.items():
+                    if raw_or_hashed == 0:
+                        numberOfObjects = len(objOfRegion[region_id] & objOfRegion[region_id2])
+                    else:
+                        numberOfObjects = num_of_permutations
+                    all_HOMOPATHS.setdefault(region_id2, {})
+                    all_HOMOPATHS[region_id].setdefault(region_id2, {})
+                    all_HOMOPATHS[region_id2].setdefault(region_id2, {})
+                    if region_id2 == region_id:
+                        continue
+                    for length2, hot_paths2 in c_hot_paths2.items():
+                        if length2 == 0 or not hot_paths2:
+                            continue
+                        for hot_path__1 in hot_paths1:
+                            hot_path1 = tuple(hot_path__1)
+                            for hot_path2 in hot_paths2:
+                                hot_path_2 = tuple(hot_path2)
+                                for_sure_intersected_objs = []
+                                if hot_path2[0] in all_connections.get(region_id, {}).get(region_id2, {}).get(
+                                        hot_path1[-1], []):
+                                    objIDs_ofPath1 = find_obj_ids(region_id, 1, hot_path1)
+                                    C2Base_Total_Bytes += homopa.calculate_transmission_cost(objIDs_ofPath1)
+                                    intersected_objs = []
+                                    edges_to_append = []
+                                    count = 0
+                                    for edge_of_path2 in hot_path2:
+                                        new_intersected_objs = []
+                                        objIDs_ofEdge2 = find_obj_ids(region_id2, 2, [edge_of_path2])
+                                        C2Base_Total_Bytes += homopa.calculate_transmission_cost(objIDs_ofEdge2)
+                                        ObjIDS_Path1 = objIDs_ofPath1 if count < 1 else intersected_objs
+                                        for obj_of_path1 in ObjIDS_Path1:
+                                            for obj_of_edge2 in objIDs_ofEdge2:
+                                                if obj_of_path1 == obj_of_edge2:
+                                                    new_intersected_objs.append(obj_of_path1)
+                                                    intersected_objs = new_intersected_objs
+                                                    break
+                                        if len(intersected_objs) / numberOfObjects >= threshold:
+                                            all_HOMOPATHS[region_id2][region_id2][hot_path_2] = -1
+                                            edges_to_append.append(edge_of_path2)
+                                            for_sure_intersected_objs = intersected_objs
+                                            if edge_of_path2 == hot_path2[-1]:
+                                                key_hot_path1 = tuple(list(hot_path1) + edges_to_append)
+                                                all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
+                                                list_of_span_homopaths.append(key_hot_path1)
+                                                break
+                                            count = 1
+                                        else:
+                                            if for_sure_intersected_objs:
+                                                key_hot_path1 = tuple(list(hot_path1) + edges_to_append)
+                                                all_HOMOPATHS[region_id][region_id2][key_hot_path1] = for_sure_intersected_objs
+                                                list_of_span_homopaths.append(key_hot_path1)
+                                            break
+                                    if edges_to_append:
+                                        not_appendedEdges2 = [edge_2 for edge_2 in hot_path2 if edge_2 not in edges_to_append]
+                                        if not_appendedEdges2:
+                                            all_HOMOPATHS[region_id2][region_id2][tuple(not_appendedEdges2)] = 0
+                                else:
+                                    if hot_path1 not in all_HOMOPATHS[region_id][region_id]:
+                                        all_HOMOPATHS[region_id][region_id][hot_path1] = list(hot_path1)
+    return all_HOMOPATHS, list_of_span_homopaths, C2Base_Total_Bytes
+
+
+def ordered(dictionary):
+    """The items of a nested dictionary in their insertion order, so that == also compares the order."""
+    return [(key, ordered(value) if isinstance(value, dict) else value) for key, value in dictionary.items()]
+
+
+@pytest.fixture
+def joined(top_leader, monkeypatch):
+    """
+    Runs the Top Leader on regions and returns (all_HOMOPATHS, the spanning homopaths of the costs
+    file, C2Base_Total_Bytes).
+    """
+    write_results = homopa.write_results_to_file_ResultsOfExperiments
+    written = {}
+
+    def keep_all_homopaths(filename, number_of_HoMoPaths, total_sum, all_HOMOPATHS, *args):
+        written["all_HOMOPATHS"] = all_HOMOPATHS
+        return write_results(filename, number_of_HoMoPaths, total_sum, all_HOMOPATHS, *args)
+
+    monkeypatch.setattr(homopa, "write_results_to_file_ResultsOfExperiments", keep_all_homopaths)
+
+    def run(regions, all_connections, threshold, raw_or_hashed, num_of_permutations, **settings):
+        _, costs, _ = top_leader(regions, all_connections, threshold, raw_or_hashed, num_of_permutations, **settings)
+        with open("Current_Experiment_Top_Leader_Reg_Leader_span_HoMoPaths_costs.txt") as costs_file:
+            span_homopaths = costs_file.read().splitlines()[-1].split(",", 8)[8:]
+        return written.pop("all_HOMOPATHS"), span_homopaths, costs
+
+    return run
+
+
+def span_homopaths_line(list_of_span_homopaths):
+    """The spanning homopaths as the costs file lists them."""
+    line = ",".join("[" + ",".join(map(str, path)) + "]" for path in list_of_span_homopaths)
+    return [line] if line else []
+
+
+# The join of the original: one request per path and edge, every object set sent again
+ORIGINAL_REQUESTS = {"object_set_cache_entries": 0, "bulk_object_requests": False, "compute_pushdown": False,
+                     "bloom_prescreen": False}
+
+
+@pytest.mark.parametrize("seed, leaving_edges", [(1, None), (2, None), (3, 3), (4, 5)])
+@pytest.mark.parametrize("threshold", [0.02, 0.04])
+def test_raw_join_matches_the_original(mine, joined, seed, leaving_edges, threshold):
+    region_data, all_connections, number_of_objects = make_map(seed, number_of_regions=3,
+                                                               leaving_edges=leaving_edges)
+    regions = {region: mine((edge_connections, objs_in_edge, number_of_objects), 0, threshold)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+    all_HOMOPATHS, list_of_span_homopaths, costs = join_like_the_original(regions, all_connections, threshold, 0, 0)
+    assert list_of_span_homopaths
+
+    new_all_HOMOPATHS, span_homopaths, new_costs = joined(regions, all_connections, threshold, 0, 0,
+                                                          **ORIGINAL_REQUESTS)
+    assert ordered(new_all_HOMOPATHS) == ordered(all_HOMOPATHS)
+    assert span_homopaths == span_homopaths_line(list_of_span_homopaths)
+    assert new_costs == costs
+
+    # The object-set cache, the bulk requests and the compute pushdown only change the costs
+    new_all_HOMOPATHS, span_homopaths, new_costs = joined(regions, all_connections, threshold, 0, 0)
+    assert ordered(new_all_HOMOPATHS) == ordered(all_HOMOPATHS)
+    assert span_homopaths == span_homopaths_line(list_of_span_homopaths)
+    assert new_costs <= costs
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_hashed_join_matches_the_original(mine, joined, seed):
+    threshold, permutations = 0.1, 32
+    region_data, all_connections, number_of_objects = make_map(seed, number_of_regions=3)
+    regions = {region: mine((edge_connections, hash_region(objs_in_edge, permutations, seed), number_of_objects),
+                            1, threshold, permutations)
+               for region, (edge_connections, objs_in_edge) in region_data.items()}
+    all_HOMOPATHS, list_of_span_homopaths, costs = join_like_the_original(
+        regions, all_connections, threshold, 1, permutations)
+    assert list_of_span_homopaths
+
+    new_all_HOMOPATHS, span_homopaths, new_costs = joined(regions, all_connections, threshold, 1, permutations,
+                                                          **ORIGINAL_REQUESTS)
+    assert ordered(new_all_HOMOPATHS) == ordered(all_HOMOPATHS)
+    assert span_homopaths == span_homopaths_line(list_of_span_homopaths)
+    assert new_costs == costs
@@ -0,0 +1,60 @@
+"""Sub-path pruning of HoMoPaths_Dictionary: every (n-1)-edge sub-path of a path of level n is removed."""
+import copy
+
+import pytest
+
+import homopa
+
+
+def prune_like_the_original(levels):
+    """The original pruning: a list.remove(...) for every shingle of every path of level n."""
+    dictionary = copy.deepcopy(levels)
+    for n in sorted(dictionary):
+        if n > 1 and n - 1 in dictionary:
+            for path in dictionary[n]:
+                for i in range(len(path[0]) - (n - 1)):
+                    sub_shinglees = [path[0][i:i + n - 1] for i in range(len(path[0]) - (n - 2))]
+                    for sub_shingle in sub_shinglees:
+                        for path2 in dictionary[n - 1]:
+                            if sub_shingle == path2[0]:
+                                dictionary[n - 1].remove(path2)
+    return dictionary
+
+
+def mine_levels(region, raw_or_hashed, threshold):
+    """The final dictionary and a copy of every level as it was found, before its pruning."""
+    edge_connections, objs_in_edge, number_of_objects = copy.deepcopy(region)
+    unpruned = {}
+    for dictionary, n, paths in homopa.homopath_levels(
+            1, raw_or_hashed, 32, edge_connections, objs_in_edge, objs_in_edge, number_of_objects,
+            threshold, 1, 0, 0, len(edge_connections), 10, write_logs=False):
+        unpruned[n] = copy.deepcopy(paths)
+        if n == 1:
+            unpruned[0] = copy.deepcopy(dictionary.get(0, []))
+    return dictionary, {n: paths for n, paths in unpruned.items() if n in dictionary}
+
+
+@pytest.mark.parametrize("raw_or_hashed, threshold", [(0, 0.02), (0, 0.04), (1, 0.1), (1, 0.2)])
+def test_pruning_matches_the_original(raw_region, hashed_region, monkeypatch, tmp_path,
+                                      raw_or_hashed, threshold):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(homopa, "raw_or_hashed", raw_or_hashed, raising=False)
+    region = raw_region if raw_or_hashed == 0 else hashed_region
+    dictionary, unpruned = mine_levels(region, raw_or_hashed, threshold)
+
+    assert dictionary == prune_like_the_original(unpruned)
+    # Something was actually pruned
+    assert sum(map(len, unpruned.values())) > sum(map(len, dictionary.values()))
+
+
+def test_no_kept_path_is_a_sub_path_of_the_next_level(raw_region, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(homopa, "raw_or_hashed", 0, raising=False)
+    dictionary, unpruned = mine_levels(raw_region, 0, 0.02)
+    for n in dictionary:
+        if n > 1 and n - 1 in dictionary:
+            # Level n-1 is pruned by level n as it was found (before level n was pruned in turn)
+            shingles = {tuple(path[i:i + n - 1]) for path, _ in unpruned[n] for i in range(2)}
+            assert not any(tuple(path) in shingles for path, _ in dictionary[n - 1])
+            # ... and every path of level n-1 that is not a shingle is kept
+            assert [record for record in unpruned[n - 1] if tuple(record[0]) not in shingles] == dictionary[n - 1]
@@ -0,0 +1,131 @@
+"""Round trips of the wire protocol of homopa.py (frames and every request kind)."""
+import io
+
+import pytest
+
+import homopa
+
+
+# A small region: homoedges (keys 0 and 1) and homopaths of length 2 and 3
+HOMOPATHS = {
+    0: [[[1], [10, 11, 12]], [[2], [11, 12, 13]], [[5], [12, 13]]],
+    1: [[[1], [10, 11, 12]], [[2], [11, 12, 13]], [[5], [12, 13]]],
+    2: [[[1, 2], [11, 12]], [[2, 5], [12, 13]]],
+    3: [[[1, 2, 5], [12]]],
+}
+UNIQUE_OBJECTS = {10, 11, 12, 13}
+
+
+def test_int_array_round_trip():
+    for values in ([], [0, 1, 0xFFFFFFFF], [-1, 5], [1 << 40, 3]):
+        assert homopa.decode_int_array(homopa.encode_int_array(values)) == values
+    # uint32 when every value fits, int64 otherwise
+    assert homopa.encode_int_array([1, 2])[:1] == b"I"
+    assert homopa.encode_int_array([-1])[:1] == b"q"
+    assert homopa.encode_int_array([1 << 32])[:1] == b"q"
+
+
+def test_homopath_list_round_trip():
+    paths = {key: [path for path, _ in records] for key, records in HOMOPATHS.items()}
+    decoded = homopa.decode_homopath_list(homopa.encode_homopath_list(paths))
+    # The keys come back as strings, as in the JSON dictionary of the original protocol
+    assert decoded == {str(key): value for key, value in paths.items()}
+    assert homopa.decode_homopath_list(homopa.encode_homopath_list({})) == {}
+
+
+def test_frame_round_trip():
+    frames = [(homopa._MSG_PATH, 0, homopa.encode_int_array([1, 2])),
+              (homopa._MSG_SHUTDOWN, 0xFFFFFFFF, b""),
+              (homopa._MSG_BULK, 7, bytes(range(256)) * 10)]
+    stream = io.BytesIO(b"".join(homopa._pack_frame(*frame) for frame in frames))
+    assert [homopa._read_frame(stream) for _ in frames] == frames
+    assert homopa._read_frame(stream) is None
+
+    # _split_frames keeps an incomplete frame for the next bytes received
+    data = b"".join(homopa._pack_frame(*frame) for frame in frames)
+    complete, rest = homopa._split_frames(data[:-5])
+    assert complete == frames[:2]
+    assert homopa._split_frames(rest + data[-5:]) == ([frames[2]], b"")
+
+
+def test_frame_of_another_version_is_refused():
+    frame = bytearray(homopa._pack_frame(homopa._MSG_PATH, 1, b""))
+    frame[0] = homopa.wire_protocol_version + 1
+    with pytest.raises(ValueError):
+        homopa._read_frame(io.BytesIO(bytes(frame)))
+    with pytest.raises(ValueError):
+        homopa._split_frames(bytes(frame))
+
+
+@pytest.fixture
+def loopback(monkeypatch):
+    """
+    Replaces the connections to the regional leaders by a direct call of answer_regional_request,
+    with both the request and the answer going through _pack_frame / _read_frame.
+    """
+    monkeypatch.setattr(homopa, "object_count_mode", "sketch")
+    trie = homopa.build_homopath_trie(HOMOPATHS)
+    minima = homopa.cohen_column_minima([[5, 9, 3], [4, 10, 8]])
+    responses = homopa.prepare_regional_responses(trie, UNIQUE_OBJECTS, 42, cohen_minima=minima)
+
+    def send(region, request_kind, payload=b"", wait_for_response=True):
+        kind, request_id, request_payload = homopa._read_frame(
+            io.BytesIO(homopa._pack_frame(request_kind, 3, payload)))
+        response = homopa.answer_regional_request(kind, request_payload, responses, trie)
+        response_kind, _, response_payload = homopa._read_frame(
+            io.BytesIO(homopa._pack_frame(*response[:1], request_id, response[1])))
+        return response_kind, response_payload
+
+    monkeypatch.setattr(homopa, "_send_regional_message", send)
+    return trie, minima
+
+
+def test_every_request_kind_round_trip(loopback):
+    trie, minima = loopback
+    send = homopa.send_request_to_regional_leader
+
+    # 1, 2: objects of a path / an edge (None if not stored)
+    assert send(1, 10, [1, 2, 5]) == [12]
+    assert send(1, 10, [5, 1]) is None
+    assert send(2, 10, [2]) == [11, 12, 13]
+    # 3, 4, 5: homopath list, unique objects, total information integers
+    assert send(3, 10, None) == {str(key): [path for path, _ in records] for key, records in HOMOPATHS.items()}
+    assert send(4, 10, None) == UNIQUE_OBJECTS
+    assert send(5, 10, None) == 42
+    # 6: bulk
+    assert send(6, 10, [(1, [1, 2]), (2, [9]), (2, [5])]) == [[11, 12], None, [12, 13]]
+    # 7: compute pushdown, the same answers as the join on the region
+    joins = [([11, 12, 13], [[2, 5], [2]]), ([12], [[1, 2, 5]])]
+    expected = [homopa.join_candidate_paths(objs, paths2, 0.25, 4, trie) for objs, paths2 in joins]
+    assert send(7, 10, (0.25, 4, joins)) == expected
+    # 8: Bloom filters of edges and transmission costs of edges
+    filters, costs = send(8, 10, ([1, 9], [2, 9]))
+    assert filters[1] is None
+    assert homopa.bloom_filter_count(filters[0], [10, 11, 12]) == 3
+    assert costs == [homopa.calculate_transmission_cost([11, 12, 13]), -1]
+    # 9: Bloom screen of paths
+    answer = send(9, 10, (filters[:1], [([1, 2], [0]), ([7], [0])]))
+    assert answer[0] == (homopa.calculate_transmission_cost([11, 12]), [2])
+    assert answer[1] == (-1, [0])
+    # 10: interior homopaths (full publication => none)
+    assert send(10, 10, None) == {}
+    # 11: KMV sketch of the unique objects
+    k, sketch = send(11, 10, None)
+    assert k == homopa.kmv_sketch_size(homopa.object_sketch_relative_error)
+    assert sketch.tolist() == homopa.build_kmv_sketch(UNIQUE_OBJECTS, k).tolist()
+    # 12: Cohen minima
+    assert send(12, 10, None).tolist() == minima.tolist() == [4, 9, 3]
+    # 13: the whole homopath list (the same as 3 with the full publication)
+    assert send(13, 10, None) == send(3, 10, None)
+
+
+def test_region_without_homopaths(monkeypatch):
+    responses = homopa.prepare_regional_responses(None, {1, 2}, 0)
+    monkeypatch.setattr(homopa, "_send_regional_message",
+                        lambda region, kind, payload=b"", wait_for_response=True:
+                        homopa.answer_regional_request(kind, payload, responses, None))
+    assert homopa.send_request_to_regional_leader(3, 10, None) == -1
+    assert homopa.send_request_to_regional_leader(5, 10, None) == -1
+    assert homopa.send_request_to_regional_leader(13, 10, None) == -1
+    assert homopa.send_request_to_regional_leader(1, 10, [1]) is None
+    assert homopa.send_request_to_regional_leader(4, 10, None) == {1, 2}